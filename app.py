@@ -3,13 +3,22 @@ import plotly.graph_objects as go
 import pandas as pd
 import json
 import io
+import os
+import sqlite3
 
-from src.evaluator import evaluate_code
+from src.evaluator import STATIC_ANALYSIS_TIME_BUDGET, evaluate_code
+from src.analyzer import analyze_code
+from src.surrogate import SurrogateScorer
 from src.scoring import DIMENSION_LABELS, WEIGHTS
 from src.github_fetcher import fetch_github_code
 from src.utils import detect_language
 from src.report_generator import generate_single_report
-from src.plagiarism import detect_plagiarism
+from src.similarity_session import SimilaritySession, unique_names
+from src.clustering import cluster_result
+from src.clones import shared_subtrees
+from src.plagiarism import gst_matches
+from src.corpus_index import CorpusIndex
+from src.incremental import IncrementalAnalyzer
 
 
 # ── Helper Functions ──
@@ -27,6 +36,34 @@ def get_score_color(score: int) -> str:
         return "#FF3B5C"  # Poor - Red
 
 
+# Session files and archive databases named in the UI live only in this directory
+DATA_DIR = os.path.abspath(os.getenv("ECHELON_DATA_DIR", "echelon_data"))
+
+
+def data_file(name: str) -> str | None:
+    """Path of the file `name` in DATA_DIR, or None if it names none.
+
+    Visitors type these names, so only the base name is used: no input can
+    read or overwrite a file outside DATA_DIR.
+    """
+    name = os.path.basename(name.strip())
+    if name in ("", ".", ".."):
+        return None
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, name)
+
+
+@st.cache_resource
+def load_surrogate(path: str) -> SurrogateScorer | None:
+    """Trained surrogate scorer saved at `path` (ECHELON_SURROGATE), or None."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return SurrogateScorer.load(path)
+    except (OSError, ValueError):
+        return None
+
+
 # ── Page Configuration ──
 st.set_page_config(
     page_title="Echelon - AI Code Evaluator",
@@ -573,6 +610,44 @@ with tab_paste:
         code = pasted_code
         language = language_select
 
+        # ── Live metrics (incremental: only edited functions are re-analyzed) ──
+        paste_analyzer = st.session_state.get("paste_analyzer")
+        if paste_analyzer is None or paste_analyzer.language != language_select:
+            paste_analyzer = IncrementalAnalyzer(language_select, time_budget=1.0)
+            st.session_state.paste_analyzer = paste_analyzer
+        live = paste_analyzer.update(pasted_code)
+        if live is not None:
+            syntax_color = "#00D26A" if live["is_valid_syntax"] else "#FF3B5C"
+            syntax_label = "VALID" if live["is_valid_syntax"] else "ERRORS"
+            if live["partial"]:
+                syntax_color, syntax_label = "#FFB800", "PARTIAL"
+            st.markdown(f"""
+            <div class="glass-card fade-in">
+                <div style="display: grid; grid-template-columns: repeat(auto-fill, minmax(120px, 1fr)); gap: 12px;">
+                    <div class="metric-pill">
+                        <div class="pill-value">{live['total_lines']}</div>
+                        <div class="pill-label">LINES</div>
+                    </div>
+                    <div class="metric-pill">
+                        <div class="pill-value">{len(live['functions'])}</div>
+                        <div class="pill-label">FUNCTIONS</div>
+                    </div>
+                    <div class="metric-pill">
+                        <div class="pill-value">{live['max_nesting_depth']}</div>
+                        <div class="pill-label">MAX NESTING</div>
+                    </div>
+                    <div class="metric-pill">
+                        <div class="pill-value">{live['comment_ratio']}</div>
+                        <div class="pill-label">COMMENT RATIO</div>
+                    </div>
+                    <div class="metric-pill">
+                        <div class="pill-value" style="color: {syntax_color};">{syntax_label}</div>
+                        <div class="pill-label">SYNTAX</div>
+                    </div>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+
 with tab_similarity:
     st.markdown("""
     <div style="margin-bottom: 16px;">
@@ -595,29 +670,115 @@ with tab_similarity:
         help="Pairs with similarity above this threshold are flagged.",
     )
 
+    with st.expander("Historical archive (earlier semesters)"):
+        archive_path = st.text_input(
+            "Archive database",
+            value=os.getenv("ECHELON_ARCHIVE", ""),
+            placeholder="archive.db",
+            help="SQLite fingerprint index of earlier submissions, stored under the server's "
+                 "ECHELON_DATA_DIR. Leave empty to skip.",
+            key="archive_path",
+        )
+        archive_label = st.text_input("Semester label", placeholder="2025-fall", key="archive_label")
+        archive_add = st.checkbox("Add these files to the archive after checking", key="archive_add")
+
+    with st.expander("Intake session"):
+        session_path = st.text_input(
+            "Session file",
+            placeholder="intake.json",
+            help="Keep files and pair scores on disk between visits; only new files are compared. "
+                 "Stored under the server's ECHELON_DATA_DIR. "
+                 "Leave empty to keep the session for this browser tab only.",
+            key="session_path",
+        )
+    # A session file already holds earlier files, so one new upload is enough
+    sim_min_files = 1 if session_path.strip() else 2
+
     sim_btn = st.button(
         "Check Similarity",
         type="primary",
         use_container_width=True,
-        disabled=len(sim_files) < 2 if sim_files else True,
+        disabled=len(sim_files) < sim_min_files if sim_files else True,
         key="sim_btn",
     )
 
-    if sim_files and len(sim_files) < 2:
+    if sim_files and len(sim_files) < sim_min_files:
         st.info("Upload at least 2 files to compare.")
 
-    if sim_btn and sim_files and len(sim_files) >= 2:
+    if sim_btn and sim_files and len(sim_files) >= sim_min_files:
         submissions = []
         for f in sim_files:
             file_code = f.read().decode("utf-8", errors="replace")
             file_lang = detect_language(f.name)
             submissions.append({"name": f.name, "code": file_code, "language": file_lang})
 
+        # Pair scores persist across reruns: only added or changed files are compared
+        session_path = data_file(session_path)
+        sim_session = st.session_state.get("sim_session")
+        if sim_session is None or st.session_state.get("sim_session_path") != session_path:
+            sim_session = SimilaritySession()
+            if session_path and os.path.exists(session_path):
+                try:
+                    sim_session = SimilaritySession.load(session_path)
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    st.error(f"Could not load session file {os.path.basename(session_path)}: {e}")
+                    st.stop()
+            st.session_state.sim_session = sim_session
+            st.session_state.sim_session_path = session_path
+
         with st.spinner("Analyzing similarity..."):
-            sim_result = detect_plagiarism(submissions, threshold=float(sim_threshold))
+            uploaded_names = [sub["name"] for sub in submissions]
+            if session_path:
+                # Intake window: uploads accumulate across visits, never replacing another file
+                for sub in submissions:
+                    sub["name"] = sim_session.intake(sub["name"], sub["code"], sub["language"])
+            else:
+                for sub, name in zip(submissions, unique_names(uploaded_names)):
+                    sub["name"] = name
+                sim_session.sync(submissions)
+            renamed = [f"{old} → {sub['name']}" for old, sub in zip(uploaded_names, submissions)
+                       if sub["name"] != old]
+            if renamed:
+                st.info("Files with the same name are kept apart: " + ", ".join(renamed))
+            sim_result = sim_session.result(threshold=float(sim_threshold))
+        if session_path:
+            try:
+                sim_session.save(session_path)
+            except OSError as e:
+                st.warning(f"Could not save session file {os.path.basename(session_path)}: {e}")
+
+        archive_matches = {}
+        archive_file = data_file(archive_path)
+        if archive_file:
+            try:
+                with st.spinner("Searching archive..."), CorpusIndex(archive_file) as archive:
+                    for sub in submissions:
+                        matches = archive.query(sub["code"], sub["language"], k=3,
+                                                min_similarity=float(sim_threshold))
+                        if matches:
+                            archive_matches[sub["name"]] = matches
+                    if archive_add:
+                        archive.add_many(submissions, label=archive_label.strip())
+            except (sqlite3.Error, OSError) as e:
+                st.error(f"Could not use archive {os.path.basename(archive_file)}: {e}")
+                archive_file = None
+
+        # Results outlive this run, so the widgets below can rerun the page without losing them
+        st.session_state.sim_view = {
+            "result": sim_result,
+            "threshold": sim_threshold,
+            "archive_file": archive_file,
+            "archive_matches": archive_matches,
+        }
+
+    sim_view = st.session_state.get("sim_view")
+    if sim_view:
+        sim_result, sim_threshold = sim_view["result"], sim_view["threshold"]
+        archive_file, archive_matches = sim_view["archive_file"], sim_view["archive_matches"]
+        sim_session = st.session_state.sim_session
 
         # ── Summary stats ──
-        max_sim = max((p["overall"] for p in sim_result["pairs"]), default=0)
+        max_sim = sim_result["summary"]["max"]
         n_files = len(sim_result["names"])
         n_flagged = sim_result["flagged_count"]
         flag_color = "#FF3B5C" if n_flagged > 0 else "#00D26A"
@@ -686,40 +847,42 @@ with tab_similarity:
         )
         st.plotly_chart(heatmap_fig, use_container_width=True)
 
-        # ── Flagged pairs ──
-        flagged = [p for p in sim_result["pairs"] if p["overall"] >= sim_threshold]
-        if flagged:
+        # ── Suspicious groups (connected components of flagged pairs) ──
+        clusters = cluster_result(sim_result, threshold=float(sim_threshold))
+        if clusters:
             st.markdown("""
             <div style="margin-top: 10px; margin-bottom: 12px;">
-                <h3 style="color: #F0F0F5; font-weight: 700; font-size: 20px; margin-bottom: 4px;">Flagged Pairs</h3>
-                <p style="color: #8888A0; font-size: 13px; margin-top: 0;">Pairs exceeding the similarity threshold</p>
+                <h3 style="color: #F0F0F5; font-weight: 700; font-size: 20px; margin-bottom: 4px;">Suspicious Groups</h3>
+                <p style="color: #8888A0; font-size: 13px; margin-top: 0;">Files linked by pairs exceeding the threshold, largest groups first</p>
             </div>
             """, unsafe_allow_html=True)
 
-            for pair in flagged:
-                is_high = pair["flag"] == "high"
+            for rank, cluster in enumerate(clusters, 1):
+                # Links come strongest first, and each pair carries detect_plagiarism()'s own flag
+                is_high = cluster["links"][0]["flag"] == "high"
                 border_color = "#FF3B5C" if is_high else "#FFB800"
                 flag_label = "HIGH" if is_high else "MEDIUM"
                 flag_bg = "rgba(255,59,92,0.15)" if is_high else "rgba(255,184,0,0.15)"
-                bar_gradient = f"linear-gradient(90deg, #A855F7, {border_color})"
-                overall_val = pair["overall"]
-
-                struct_html = ""
-                if pair["structural_sim"] is not None:
-                    struct_html = f"""
-                    <div style="flex: 1; min-width: 100px;">
-                        <div style="font-size: 11px; color: #8888A0; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 4px;">Structural</div>
-                        <div style="font-size: 16px; font-weight: 600; color: #F0F0F5;">{pair['structural_sim']:.1f}%</div>
+
+                member_html = "".join(
+                    f'<span style="background: rgba(168,85,247,0.15); color: #F0F0F5; font-size: 13px; '
+                    f'padding: 3px 10px; border-radius: 10px; margin: 0 6px 6px 0; display: inline-block;">{name}</span>'
+                    for name in cluster["members"]
+                )
+                links_html = ""
+                for pair in cluster["links"]:
+                    struct_str = f"{pair['structural_sim']:.1f}%" if pair["structural_sim"] is not None else "N/A"
+                    links_html += f"""
+                    <div style="display: flex; justify-content: space-between; flex-wrap: wrap; gap: 8px; padding: 6px 0; border-top: 1px solid rgba(255,255,255,0.06);">
+                        <span style="color: #F0F0F5; font-size: 14px;">{pair['sub_a']} <span style="color: #8888A0;">vs</span> {pair['sub_b']}</span>
+                        <span style="color: #8888A0; font-size: 13px;">Text {pair['text_sim']:.1f}% · Token {pair['token_sim']:.1f}% · Structural {struct_str}
+                            <b style="color: {border_color}; margin-left: 8px;">{pair['overall']:.1f}%</b></span>
                     </div>"""
 
                 st.markdown(f"""
                 <div class="glass-card fade-in" style="border-left: 3px solid {border_color};">
                     <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 12px; flex-wrap: wrap; gap: 8px;">
-                        <div>
-                            <span style="color: #F0F0F5; font-weight: 600; font-size: 15px;">{pair['sub_a']}</span>
-                            <span style="color: #8888A0; margin: 0 8px;">vs</span>
-                            <span style="color: #F0F0F5; font-weight: 600; font-size: 15px;">{pair['sub_b']}</span>
-                        </div>
+                        <span style="color: #F0F0F5; font-weight: 600; font-size: 15px;">Group {rank} · {cluster['size']} files · {cluster['edges']} flagged pairs</span>
                         <div style="display: flex; align-items: center; gap: 10px;">
                             <span style="
                                 background: {flag_bg};
@@ -730,27 +893,33 @@ with tab_similarity:
                                 border-radius: 12px;
                                 letter-spacing: 0.5px;
                             ">{flag_label}</span>
-                            <span style="font-size: 24px; font-weight: 800; color: {border_color};">{overall_val:.1f}%</span>
-                        </div>
-                    </div>
-                    <div style="margin-bottom: 14px;">
-                        <div class="dim-bar-track">
-                            <div class="dim-bar-fill" style="width: {overall_val}%; background: {bar_gradient};"></div>
+                            <span style="font-size: 24px; font-weight: 800; color: {border_color};">{cluster['max_link']:.1f}%</span>
                         </div>
                     </div>
-                    <div style="display: flex; gap: 16px; flex-wrap: wrap;">
-                        <div style="flex: 1; min-width: 100px;">
-                            <div style="font-size: 11px; color: #8888A0; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 4px;">Text</div>
-                            <div style="font-size: 16px; font-weight: 600; color: #F0F0F5;">{pair['text_sim']:.1f}%</div>
-                        </div>
-                        <div style="flex: 1; min-width: 100px;">
-                            <div style="font-size: 11px; color: #8888A0; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 4px;">Token</div>
-                            <div style="font-size: 16px; font-weight: 600; color: #F0F0F5;">{pair['token_sim']:.1f}%</div>
-                        </div>
-                        {struct_html}
-                    </div>
+                    <div style="margin-bottom: 10px;">{member_html}</div>
+                    <div style="font-size: 11px; color: #8888A0; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 4px;">Strongest links (mean {cluster['mean_link']:.1f}%)</div>
+                    {links_html}
                 </div>
                 """, unsafe_allow_html=True)
+
+                # Matching regions cost a parse or a tiling per pair, so only for the links asked for
+                for pair in cluster["links"]:
+                    if not st.checkbox(f"Show matching code: {pair['sub_a']} vs {pair['sub_b']}",
+                                       key=f"regions_{pair['sub_a']}_{pair['sub_b']}"):
+                        continue
+                    sub_a, sub_b = sim_session.submission(pair["sub_a"]), sim_session.submission(pair["sub_b"])
+                    regions = shared_subtrees(sub_a, sub_b)
+                    if not regions:
+                        # No Python parse trees: fall back to token tiles
+                        pair_lang = sub_a.language if sub_a.language == sub_b.language else "Other"
+                        regions = gst_matches(sub_a, sub_b, pair_lang)["tiles"]
+                    if regions:
+                        st.caption("Matching code: " + " · ".join(
+                            f"L{r['a_lines'][0]}–{r['a_lines'][1]} ↔ L{r['b_lines'][0]}–{r['b_lines'][1]}"
+                            for r in regions[:3]
+                        ))
+                    else:
+                        st.caption("No matching code regions found.")
         else:
             st.markdown("""
             <div class="glass-card fade-in" style="border-left: 3px solid #00D26A; text-align: center;">
@@ -760,6 +929,24 @@ with tab_similarity:
             </div>
             """, unsafe_allow_html=True)
 
+        # ── Archive matches ──
+        if archive_file:
+            st.markdown("""
+            <div style="margin-top: 10px; margin-bottom: 12px;">
+                <h3 style="color: #F0F0F5; font-weight: 700; font-size: 20px; margin-bottom: 4px;">Archive Matches</h3>
+                <p style="color: #8888A0; font-size: 13px; margin-top: 0;">Earlier submissions whose text fingerprints exceed the threshold</p>
+            </div>
+            """, unsafe_allow_html=True)
+            if archive_matches:
+                for name, matches in archive_matches.items():
+                    found = ", ".join(
+                        f"**{m['name']}**" + (f" ({m['label']})" if m["label"] else "") + f" — {m['similarity']:.1f}%"
+                        for m in matches
+                    )
+                    st.markdown(f"**{name}** matches {found}")
+            else:
+                st.info("No archived submission exceeds the similarity threshold.")
+
         # ── All pairs table (collapsed) ──
         if st.checkbox("📊 View all pair scores", key="view_all_pairs"):
             for pair in sim_result["pairs"]:
@@ -792,13 +979,20 @@ if evaluate_btn:
 
     result = None
     try:
+        surrogate = load_surrogate(os.getenv("ECHELON_SURROGATE", ""))
+        static_result = analyze_code(code, language, time_budget=STATIC_ANALYSIS_TIME_BUDGET)
+        preliminary_note = ""
+        if surrogate is not None and static_result is not None:
+            prediction = surrogate.predict(static_result)
+            preliminary_note = f" (preliminary score {prediction['overall_score']} ± {prediction['overall_margin']})"
+
         with progress_placeholder.container():
             step1 = st.status("Step 1: Running static analysis...", expanded=False)
             step1.update(label="Step 1: Static analysis complete", state="complete")
             step2 = st.status("Step 2: Calling AI evaluator...", expanded=False)
-            step2.update(label="Step 2: Calling AI evaluator...", state="running")
+            step2.update(label=f"Step 2: Calling AI evaluator...{preliminary_note}", state="running")
 
-        result = evaluate_code(code, language, problem_statement)
+        result = evaluate_code(code, language, problem_statement, static_result, surrogate=surrogate)
 
         with progress_placeholder.container():
             step1 = st.status("Step 1: Static analysis complete", expanded=False)
@@ -881,6 +1075,13 @@ if st.session_state.evaluation_result is not None:
         """,
             unsafe_allow_html=True,
         )
+
+        if result.get("scored_by") == "surrogate":
+            st.info(f"Scored by the local surrogate model ({result['surrogate_reason']}), "
+                    f"± {result['preliminary']['overall_margin']} points")
+        elif result.get("preliminary"):
+            st.caption(f"Preliminary surrogate score: {result['preliminary']['overall_score']} "
+                       f"± {result['preliminary']['overall_margin']}")
         
         st.markdown("---")
         st.markdown('<div style="text-align: center; color: #8888A0; font-size: 12px; padding: 10px;">Scroll down in the main panel for detailed analysis ↓</div>', unsafe_allow_html=True)
@@ -1125,6 +1326,8 @@ if st.session_state.evaluation_result is not None:
             ("Comment Ratio", sa["comment_ratio"]),
             ("Naming Quality", sa["naming_quality"]),
         ]
+        if sa.get("complexity"):
+            metrics += [("Est. Time", sa["complexity"]["time"]), ("Est. Space", sa["complexity"]["space"])]
 
         pills_html = "".join(
             f'<div class="metric-pill">'
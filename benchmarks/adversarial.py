@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""Fuzz and scaling benchmark for the analyzers and tokenizers on adversarial input.
+
+Run from the repository root:
+
+    python -m benchmarks.adversarial            # full run
+    python -m benchmarks.adversarial --quick    # smaller sizes, fewer fuzz cases
+    python -m benchmarks.adversarial --json out.json
+
+Three checks, each reported per case:
+  * scaling — every target runs on sizes n, 2n, 4n of a pathological input
+    (deep nesting, huge/unterminated literals, long identifiers, ...) without
+    raising, and 4x the input costs at most MAX_GROWTH x the time
+  * budget  — with a time budget the analyzers return promptly with "partial"
+  * fuzz    — random soups of brackets, quotes, comment markers and keywords
+    never make any target raise
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from src.analyzer import analyze_code
+from src.plagiarism import normalize_code, tokenize_code
+
+# 4x the input may cost at most this many times the time (linear = 4, plus noise)
+MAX_GROWTH = 8.0
+# Timings below this are dominated by noise and skip the growth check
+MIN_TIMED_SECONDS = 0.02
+BUDGET_SLACK_SECONDS = 0.3
+
+# Cases where tree-sitter's own error recovery is super-linear; analyze_code
+# can only bound these through its time budget (covered by run_budget)
+PARSER_BOUND_CASES = {"js_open_comments"}
+
+
+# ── Adversarial input generators: size -> (code, language) ──
+
+def _py_deep_blocks(n):
+    return "".join("    " * (i % 90) + "if x:\n" for i in range(n)) + "    pass\n", "Python"
+
+
+def _py_long_expression(n):
+    return "x = " + " + ".join(["a"] * n) + "\n", "Python"
+
+
+def _py_unterminated_string(n):
+    return "x = '" + "\\'" * n + "\n", "Python"
+
+
+def _js_deep_braces(n):
+    return "function f() {" + "if (x) {" * n + "}" * n + "}", "JavaScript"
+
+
+def _js_escaped_quotes(n):
+    return 'var s = "' + '\\"' * n, "JavaScript"
+
+
+def _js_open_comments(n):
+    return "/* " * n, "JavaScript"
+
+
+def _c_else_if_chain(n):
+    return "int f() { if (a) {} " + "else if (a) {} " * n + "}", "C"
+
+
+def _rust_long_identifier(n):
+    return "fn main() { let " + "a" * (n * 10) + " = 1; }", "Rust"
+
+
+def _ruby_require_whitespace(n):
+    return ("require" + " " * 64 + "x\n") * n, "Ruby"
+
+
+SCALING_CASES = {
+    "py_deep_blocks": _py_deep_blocks,
+    "py_long_expression": _py_long_expression,
+    "py_unterminated_string": _py_unterminated_string,
+    "js_deep_braces": _js_deep_braces,
+    "js_escaped_quotes": _js_escaped_quotes,
+    "js_open_comments": _js_open_comments,
+    "c_else_if_chain": _c_else_if_chain,
+    "rust_long_identifier": _rust_long_identifier,
+    "ruby_require_whitespace": _ruby_require_whitespace,
+}
+
+TARGETS = {
+    "analyze": lambda code, lang: analyze_code(code, lang),
+    "tokenize": lambda code, lang: tokenize_code(code, lang),
+    "normalize": lambda code, lang: normalize_code(code),
+}
+
+_FUZZ_ALPHABET = [
+    "{", "}", "(", ")", "[", "]", "\"", "'", "`", "\\", "/*", "*/", "//", "#",
+    "\n", "    ", ";", ":", "?", "if", "for", "while", "def", "function", "fn",
+    "class", "return", "x", "err", "!=", "nil", "require", "assert", "\x00", "é",
+]
+_FUZZ_LANGUAGES = ["Python", "JavaScript", "TypeScript", "Java", "C", "C++", "Go", "Ruby", "Rust"]
+
+
+def _timed(fn, *args) -> tuple[float, str | None]:
+    """Thread CPU seconds for one call, plus the exception name if it raised."""
+    start = time.thread_time()
+    try:
+        fn(*args)
+        error = None
+    except BaseException as e:  # RecursionError, MemoryError, ...
+        error = f"{type(e).__name__}: {e}"[:120]
+    return time.thread_time() - start, error
+
+
+def run_scaling(base_size: int) -> list[dict]:
+    results = []
+    for case_name, generator in SCALING_CASES.items():
+        for target_name, target in TARGETS.items():
+            timings = []
+            error = None
+            for size in (base_size, base_size * 2, base_size * 4):
+                code, language = generator(size)
+                elapsed, error = _timed(target, code, language)
+                timings.append(round(elapsed, 4))
+                if error:
+                    break
+            growth = None
+            if not error and timings[0] >= MIN_TIMED_SECONDS:
+                growth = round(timings[-1] / timings[0], 2)
+            bounded_by_budget = target_name == "analyze" and case_name in PARSER_BOUND_CASES
+            passed = error is None and (growth is None or growth <= MAX_GROWTH or bounded_by_budget)
+            results.append({
+                "check": "scaling",
+                "case": case_name,
+                "target": target_name,
+                "timings": timings,
+                "growth_4x": growth,
+                "error": error,
+                "bounded_by_budget": bounded_by_budget,
+                "passed": passed,
+            })
+    return results
+
+
+def run_budget(base_size: int, budget: float) -> list[dict]:
+    results = []
+    cases = [
+        ("js_open_comments", _js_open_comments(base_size * 8)),
+        ("js_deep_braces", _js_deep_braces(base_size * 8)),
+        ("py_many_statements", ("x = [i for i in range(3)]\n" * base_size * 8, "Python")),
+    ]
+    for case_name, (code, language) in cases:
+        start = time.thread_time()
+        result = analyze_code(code, language, time_budget=budget)
+        elapsed = time.thread_time() - start
+        results.append({
+            "check": "budget",
+            "case": case_name,
+            "budget": budget,
+            "elapsed": round(elapsed, 4),
+            "partial": result["partial"],
+            # ast.parse is linear C code and cannot be interrupted, so Python
+            # only has to honour the budget for the tree walk itself
+            "passed": language == "Python" or elapsed <= budget + BUDGET_SLACK_SECONDS,
+        })
+    return results
+
+
+def run_fuzz(iterations: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    failures = []
+    for i in range(iterations):
+        language = rng.choice(_FUZZ_LANGUAGES)
+        code = "".join(rng.choice(_FUZZ_ALPHABET) for _ in range(rng.randint(1, 400)))
+        for target_name, target in TARGETS.items():
+            _, error = _timed(target, code, language)
+            if error:
+                failures.append({"iteration": i, "language": language, "target": target_name,
+                                 "error": error, "code": code[:200]})
+    return [{
+        "check": "fuzz",
+        "case": f"{iterations} random inputs (seed {seed})",
+        "failures": failures[:20],
+        "failure_count": len(failures),
+        "passed": not failures,
+    }]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="smaller sizes and fewer fuzz cases")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    base_size = 2000 if args.quick else 8000
+    iterations = 200 if args.quick else 2000
+
+    results = run_scaling(base_size) + run_budget(base_size, budget=0.2) + run_fuzz(iterations, args.seed)
+
+    print("=" * 72)
+    print("Adversarial input benchmark")
+    print("=" * 72)
+    for r in results:
+        status = "PASS" if r["passed"] else "FAIL"
+        if r["check"] == "scaling":
+            detail = f"times={r['timings']} growth={r['growth_4x']}"
+            if r["bounded_by_budget"]:
+                detail += " (parser-bound, see budget check)"
+            if r["error"]:
+                detail += f" error={r['error']}"
+            print(f"  {status}  scaling  {r['case']:<26} {r['target']:<10} {detail}")
+        elif r["check"] == "budget":
+            print(f"  {status}  budget   {r['case']:<26} elapsed={r['elapsed']}s partial={r['partial']}")
+        else:
+            print(f"  {status}  fuzz     {r['case']} failures={r['failure_count']}")
+            for failure in r["failures"][:3]:
+                print(f"           {failure['language']} {failure['target']}: {failure['error']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failed = sum(1 for r in results if not r["passed"])
+    print(f"\n{len(results) - failed}/{len(results)} checks passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Pruning benchmark for the cascading early-exit pair scorer.
+
+Run from the repository root:
+
+    python -m benchmarks.cascade                          # n = 200, both text layers
+    python -m benchmarks.cascade --sizes 500 --text-methods winnow
+    python -m benchmarks.cascade --thresholds 40 60 80 --json out.json
+
+For each cohort size, text layer and threshold, detect_plagiarism() runs on
+the pairwise engine once scoring every layer of every pair, and once with
+cascade=True. Reports both times, the fraction of pairs pruned before all
+layers ran, and whether both runs flag exactly the same pairs with the same
+scores.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from benchmarks.corpus import generate_cohort
+from src.plagiarism import TEXT_METHODS, detect_plagiarism
+
+
+def run_size(n: int, text_methods: list[str], thresholds: list[float], seed: int) -> list[dict]:
+    submissions, _ = generate_cohort(n, seed=seed)
+    results = []
+    for text_method in text_methods:
+        start = time.perf_counter()
+        full = detect_plagiarism(submissions, text_method=text_method, engine="pairwise")
+        full_seconds = time.perf_counter() - start
+        # Keep only what is compared, so a large live result does not slow
+        # the garbage collector during the timed cascade runs
+        total_pairs = full["compared_pairs"]
+        expected = {threshold: [p for p in full["pairs"] if p["overall"] >= threshold]
+                    for threshold in thresholds}
+        del full
+        for threshold in thresholds:
+            start = time.perf_counter()
+            pruned = detect_plagiarism(submissions, threshold=threshold, text_method=text_method,
+                                       engine="pairwise", output="threshold", cascade=True)
+            cascade_seconds = time.perf_counter() - start
+            results.append({
+                "n": n,
+                "text_method": text_method,
+                "threshold": threshold,
+                "pairs": total_pairs,
+                "full_s": round(full_seconds, 3),
+                "cascade_s": round(cascade_seconds, 3),
+                "speedup": round(full_seconds / cascade_seconds, 1),
+                "pruned_fraction": round(pruned["summary"]["pruned"] / total_pairs, 4),
+                "identical_flags": pruned["pairs"] == expected[threshold],
+            })
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200])
+    parser.add_argument("--text-methods", nargs="+", choices=TEXT_METHODS, default=list(TEXT_METHODS))
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[60.0])
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = []
+    for n in args.sizes:
+        results.extend(run_size(n, args.text_methods, args.thresholds, args.seed))
+
+    print("=" * 84)
+    print("Cascading early-exit scoring (pairwise engine)")
+    print("=" * 84)
+    print(f"{'n':>6} {'text':>8} {'thr':>5} {'pairs':>8} {'full':>9} {'cascade':>9} "
+          f"{'speedup':>8} {'pruned':>8} {'identical':>10}")
+    for r in results:
+        print(f"{r['n']:>6} {r['text_method']:>8} {r['threshold']:>5} {r['pairs']:>8} {r['full_s']:>8.2f}s "
+              f"{r['cascade_s']:>8.2f}s {str(r['speedup']) + 'x':>8} {r['pruned_fraction']:>8.1%} "
+              f"{str(r['identical_flags']):>10}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if not all(r["identical_flags"] for r in results):
+        print("\nCascade flagged different pairs than full scoring")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
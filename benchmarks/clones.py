@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Benchmark for AST subtree-hash clone detection.
+
+Run from the repository root:
+
+    python -m benchmarks.clones                      # n = 100 and 300
+    python -m benchmarks.clones --sizes 1000 --min-size 30
+
+Cohorts come from benchmarks.obfuscation (test_samples plus obfuscated
+copies). Reports the time to hash every subtree (and nodes/second, which
+stays flat as files grow because hashing is linear), the time for
+find_clones() over the whole cohort, and how many copied Python pairs get
+at least one reported region.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from benchmarks.obfuscation import generate_cohort
+from src.clones import MIN_CLONE_SIZE, find_clones
+from src.submission import Submission
+
+
+def run(n: int, min_size: int, seed: int) -> dict:
+    submissions, copied = generate_cohort(n, seed=seed)
+    parsed = [Submission(s["code"], s["language"], s["name"]) for s in submissions]
+
+    start = time.perf_counter()
+    nodes = sum(len(sub.subtrees) for sub in parsed if sub.subtrees is not None)
+    hash_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    clones = find_clones(parsed, min_size)
+    find_seconds = time.perf_counter() - start
+
+    index = {sub.name: i for i, sub in enumerate(parsed)}
+    python_copied = [(index[a], index[b]) for a, b in copied
+                     if parsed[index[a]].subtrees is not None and parsed[index[b]].subtrees is not None]
+
+    return {
+        "n": n,
+        "min_size": min_size,
+        "nodes": nodes,
+        "hash_s": round(hash_seconds, 3),
+        "nodes_per_s": round(nodes / hash_seconds),
+        "find_s": round(find_seconds, 3),
+        "pairs_with_clones": len(clones),
+        "copied_python_pairs": len(python_copied),
+        "copied_found": sum((min(i, j), max(i, j)) in clones for i, j in python_copied),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300])
+    parser.add_argument("--min-size", type=int, default=MIN_CLONE_SIZE)
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = [run(n, args.min_size, args.seed) for n in args.sizes]
+
+    print("=" * 72)
+    print(f"AST subtree-hash clone detection (min size {args.min_size} nodes)")
+    print("=" * 72)
+    print(f"{'n':>6} {'nodes':>8} {'hash':>8} {'nodes/s':>9} {'find':>8} {'pairs':>7} "
+          f"{'copies found':>13}")
+    for r in results:
+        found = f"{r['copied_found']}/{r['copied_python_pairs']}"
+        print(f"{r['n']:>6} {r['nodes']:>8} {r['hash_s']:>7.2f}s {r['nodes_per_s']:>9} {r['find_s']:>7.2f}s "
+              f"{r['pairs_with_clones']:>7} {found:>13}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
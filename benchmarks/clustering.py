@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Scaling benchmark for clustering flagged submission pairs.
+
+Run from the repository root:
+
+    python -m benchmarks.clustering                         # 1M and 5M edges
+    python -m benchmarks.clustering --edges 200000 --nodes 20000
+
+Builds a random sparse similarity graph: background edges with scores below
+and around the threshold, plus planted collusion rings whose internal edges
+score above it. Times connected components, ranked clusters and the full
+single-linkage hierarchy, and checks that the planted rings are recovered.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from src.clustering import connected_components, rank_clusters, single_linkage
+
+
+def _graph(nodes: int, edges: int, rings: int, ring_size: int, threshold: float, seed: int):
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, nodes, edges)
+    cols = rng.integers(0, nodes, edges)
+    # Background similarity stays below the threshold
+    weights = np.round(rng.uniform(0, threshold - 0.1, edges), 1)
+
+    members = rng.choice(nodes, rings * ring_size, replace=False).reshape(rings, ring_size)
+    ring_rows, ring_cols = [], []
+    for ring in members:
+        # A chain plus a few chords: connected, but not a clique
+        ring_rows.extend(ring[:-1])
+        ring_cols.extend(ring[1:])
+        chords = rng.choice(ring_size, (ring_size // 2, 2))
+        ring_rows.extend(ring[chords[:, 0]])
+        ring_cols.extend(ring[chords[:, 1]])
+    ring_weights = np.round(rng.uniform(threshold, 100, len(ring_rows)), 1)
+    return (np.concatenate([rows, ring_rows]), np.concatenate([cols, ring_cols]),
+            np.concatenate([weights, ring_weights]), sorted(sorted(ring.tolist()) for ring in members))
+
+
+def run(nodes: int, edges: int, rings: int, ring_size: int, threshold: float, seed: int) -> dict:
+    rows, cols, weights, planted = _graph(nodes, edges, rings, ring_size, threshold, seed)
+    timings = {}
+    start = time.perf_counter()
+    components = connected_components(nodes, rows, cols, weights, threshold)
+    timings["components_s"] = round(time.perf_counter() - start, 3)
+    start = time.perf_counter()
+    ranked = rank_clusters(nodes, rows, cols, weights, threshold)
+    timings["ranked_s"] = round(time.perf_counter() - start, 3)
+    start = time.perf_counter()
+    merges = single_linkage(nodes, rows, cols, weights)
+    timings["single_linkage_s"] = round(time.perf_counter() - start, 3)
+    return {
+        "nodes": nodes,
+        "edges": len(rows),
+        "threshold": threshold,
+        **timings,
+        "clusters": len(ranked),
+        "merges": len(merges),
+        "rings_recovered": sorted(components) == planted,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edges", type=int, nargs="+", default=[1_000_000, 5_000_000])
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--rings", type=int, default=200)
+    parser.add_argument("--ring-size", type=int, default=6)
+    parser.add_argument("--threshold", type=float, default=60.0)
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = [run(args.nodes, edges, args.rings, args.ring_size, args.threshold, args.seed)
+               for edges in args.edges]
+
+    print("=" * 84)
+    print("Clustering flagged pairs")
+    print("=" * 84)
+    print(f"{'nodes':>8} {'edges':>9} {'components':>11} {'ranked':>9} {'linkage':>9} "
+          f"{'clusters':>9} {'merges':>8} {'rings ok':>9}")
+    for r in results:
+        print(f"{r['nodes']:>8} {r['edges']:>9} {r['components_s']:>10.2f}s {r['ranked_s']:>8.2f}s "
+              f"{r['single_linkage_s']:>8.2f}s {r['clusters']:>9} {r['merges']:>8} {str(r['rings_recovered']):>9}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if all(r["rings_recovered"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""Synthetic student cohorts for the plagiarism benchmarks.
+
+Each program is a handful of functions drawn from a bank of templates, with
+random identifiers and constants, plus a main block. A fraction of the cohort
+are copies of earlier programs disguised by the usual tricks (renamed
+identifiers, reordered functions, added comments, blank lines, dead code),
+so benchmarks know which pairs really are plagiarized.
+
+    from benchmarks.corpus import generate_cohort
+    submissions, copied_pairs = generate_cohort(200, seed=0)
+"""
+
+import random
+
+# Function templates. {f} is the function name, {a}/{b}/{c} are local names,
+# {k}/{m} are integer constants.
+_TEMPLATES = [
+    """def {f}({a}):
+    {b} = 0
+    for {c} in {a}:
+        if {c} % {k} == 0:
+            {b} += {c}
+    return {b}
+""",
+    """def {f}({a}, {b}):
+    {c} = []
+    i = j = 0
+    while i < len({a}) and j < len({b}):
+        if {a}[i] <= {b}[j]:
+            {c}.append({a}[i])
+            i += 1
+        else:
+            {c}.append({b}[j])
+            j += 1
+    return {c} + {a}[i:] + {b}[j:]
+""",
+    """def {f}({a}):
+    {b} = {{}}
+    for {c} in {a}:
+        {b}[{c}] = {b}.get({c}, 0) + 1
+    return max({b}, key={b}.get) if {b} else None
+""",
+    """def {f}({a}, {b}):
+    lo, hi = 0, len({a}) - 1
+    while lo <= hi:
+        {c} = (lo + hi) // 2
+        if {a}[{c}] == {b}:
+            return {c}
+        if {a}[{c}] < {b}:
+            lo = {c} + 1
+        else:
+            hi = {c} - 1
+    return -1
+""",
+    """def {f}({a}):
+    if {a} < {k}:
+        return {a}
+    {b}, {c} = 0, 1
+    for _ in range({a}):
+        {b}, {c} = {c}, {b} + {c}
+    return {b} % {m}
+""",
+    """def {f}({a}):
+    {b} = [True] * ({a} + 1)
+    {b}[0:2] = [False, False]
+    for {c} in range(2, int({a} ** 0.5) + 1):
+        if {b}[{c}]:
+            for j in range({c} * {c}, {a} + 1, {c}):
+                {b}[j] = False
+    return [i for i, ok in enumerate({b}) if ok]
+""",
+    """def {f}({a}):
+    {b} = []
+    for {c} in {a}.split():
+        if {c}.isalpha() and len({c}) > {k}:
+            {b}.append({c}.lower())
+    return sorted(set({b}))
+""",
+    """def {f}({a}, {b}):
+    {c} = [[0] * (len({b}) + 1) for _ in range(len({a}) + 1)]
+    for i in range(1, len({a}) + 1):
+        for j in range(1, len({b}) + 1):
+            if {a}[i - 1] == {b}[j - 1]:
+                {c}[i][j] = {c}[i - 1][j - 1] + 1
+            else:
+                {c}[i][j] = max({c}[i - 1][j], {c}[i][j - 1])
+    return {c}[-1][-1]
+""",
+    """def {f}({a}):
+    {b} = []
+    for {c} in {a}:
+        if {c} in "([{{":
+            {b}.append({c})
+        elif {c} in ")]}}":
+            if not {b}:
+                return False
+            {b}.pop()
+    return not {b}
+""",
+    """def {f}({a}, {b}={k}):
+    {c} = {{}}
+    for i, x in enumerate({a}):
+        if {b} - x in {c}:
+            return {c}[{b} - x], i
+        {c}[x] = i
+    return None
+""",
+    """class {F}:
+    def __init__(self, {a}={k}):
+        self.{b} = []
+        self.{c} = {a}
+
+    def push(self, x):
+        if len(self.{b}) >= self.{c}:
+            self.{b}.pop(0)
+        self.{b}.append(x)
+
+    def mean(self):
+        return sum(self.{b}) / max(len(self.{b}), 1)
+""",
+    """def {f}({a}):
+    {b} = sorted({a})
+    {c} = len({b})
+    if {c} == 0:
+        return 0.0
+    if {c} % 2:
+        return {b}[{c} // 2]
+    return ({b}[{c} // 2 - 1] + {b}[{c} // 2]) / 2
+""",
+    """def {f}({a}, {b}):
+    {c} = [[0] * len({b}[0]) for _ in range(len({a}))]
+    for i in range(len({a})):
+        for j in range(len({b}[0])):
+            for k in range(len({b})):
+                {c}[i][j] += {a}[i][k] * {b}[k][j]
+    return {c}
+""",
+    """def {f}({a}):
+    {b} = set()
+    {c} = [{a}]
+    while {c}:
+        node = {c}.pop()
+        if node in {b} or node > {m}:
+            continue
+        {b}.add(node)
+        {c}.extend((node * 2, node + {k}))
+    return len({b})
+""",
+]
+
+_WORDS = [
+    "data", "items", "values", "total", "result", "count", "nums", "arr", "seq",
+    "buf", "acc", "cur", "tmp", "out", "left", "right", "key", "val", "node",
+    "stack", "queue", "seen", "table", "grid", "row", "col", "text", "word",
+    "index", "limit", "score", "best", "step", "size", "memo", "cache", "pair",
+]
+_VERBS = [
+    "compute", "find", "count", "merge", "solve", "build", "check", "process",
+    "collect", "search", "filter", "scan", "walk", "sum", "get", "make",
+]
+_COMMENTS = [
+    "# helper function", "# TODO: handle edge cases", "# main logic here",
+    "# iterate over the input", "# return the answer", "# O(n) approach",
+]
+
+
+def _identifier(rng: random.Random, used: set) -> str:
+    while True:
+        name = rng.choice(_WORDS) + (str(rng.randint(1, 9)) if rng.random() < 0.3 else "")
+        if name not in used:
+            used.add(name)
+            return name
+
+
+def random_program(rng: random.Random) -> dict:
+    """A program spec: templates plus the names and constants to render them with."""
+    functions = []
+    used = set()
+    for template_index in rng.sample(range(len(_TEMPLATES)), rng.randint(3, 6)):
+        name = rng.choice(_VERBS) + "_" + rng.choice(_WORDS)
+        while name in used:
+            name += "_"
+        used.add(name)
+        functions.append({
+            "template": template_index,
+            "f": name,
+            "F": "".join(part.capitalize() for part in name.split("_")),
+            "a": _identifier(rng, set()),
+            "k": rng.randint(2, 9),
+            "m": rng.choice([97, 1000, 10 ** 9 + 7]),
+        })
+        used_locals = {functions[-1]["a"]}
+        functions[-1]["b"] = _identifier(rng, used_locals)
+        functions[-1]["c"] = _identifier(rng, used_locals)
+    return {"functions": functions, "comments": [], "dead_code": [], "blank_lines": 1}
+
+
+def render(spec: dict) -> str:
+    """Python source for a program spec."""
+    parts = []
+    for i, function in enumerate(spec["functions"]):
+        if i < len(spec["comments"]) and spec["comments"][i]:
+            parts.append(spec["comments"][i] + "\n")
+        parts.append(_TEMPLATES[function["template"]].format(**function))
+        if i < len(spec["dead_code"]) and spec["dead_code"][i]:
+            parts.append(spec["dead_code"][i])
+        parts.append("\n" * spec["blank_lines"])
+    main = "\n".join(
+        f"    print({fn['F']}().mean())" if "{F}" in _TEMPLATES[fn["template"]] else f"    print({fn['f']})"
+        for fn in spec["functions"]
+    )
+    parts.append(f'\nif __name__ == "__main__":\n{main}\n')
+    return "".join(parts)
+
+
+# ── Disguises applied to copies ──
+
+def rename_identifiers(spec: dict, rng: random.Random) -> dict:
+    """Give every function and local variable a fresh name."""
+    functions = []
+    for function in spec["functions"]:
+        function = dict(function)
+        name = rng.choice(_VERBS) + "_" + rng.choice(_WORDS) + "_" + str(rng.randint(0, 99))
+        function["f"] = name
+        function["F"] = "".join(part.capitalize() for part in name.split("_"))
+        used = set()
+        for key in ("a", "b", "c"):
+            function[key] = _identifier(rng, used)
+        functions.append(function)
+    return {**spec, "functions": functions}
+
+
+def reorder_functions(spec: dict, rng: random.Random) -> dict:
+    functions = list(spec["functions"])
+    rng.shuffle(functions)
+    return {**spec, "functions": functions}
+
+
+def add_comments(spec: dict, rng: random.Random) -> dict:
+    return {**spec, "comments": [rng.choice(_COMMENTS) for _ in spec["functions"]]}
+
+
+def add_dead_code(spec: dict, rng: random.Random) -> dict:
+    dead = [
+        f"\n_unused_{rng.randint(0, 999)} = [{rng.randint(0, 9)} for _ in range({rng.randint(1, 5)})]\n"
+        if rng.random() < 0.5 else ""
+        for _ in spec["functions"]
+    ]
+    return {**spec, "dead_code": dead}
+
+
+def change_whitespace(spec: dict, rng: random.Random) -> dict:
+    return {**spec, "blank_lines": rng.randint(2, 4)}
+
+
+MUTATIONS = {
+    "rename": rename_identifiers,
+    "reorder": reorder_functions,
+    "comments": add_comments,
+    "dead_code": add_dead_code,
+    "whitespace": change_whitespace,
+}
+
+
+def disguise(spec: dict, rng: random.Random, mutations=None) -> dict:
+    """Apply the named mutations (default: a random non-empty subset) to a spec."""
+    if mutations is None:
+        mutations = [name for name in MUTATIONS if rng.random() < 0.5] or [rng.choice(list(MUTATIONS))]
+    for name in mutations:
+        spec = MUTATIONS[name](spec, rng)
+    return spec
+
+
+def generate_cohort(n: int, seed: int = 0, copy_rate: float = 0.2) -> tuple[list[dict], set]:
+    """Generate `n` submissions, about `copy_rate` of them disguised copies.
+
+    Returns (submissions, copied_pairs): submissions are
+    {'name', 'code', 'language'} dicts as taken by detect_plagiarism(), and
+    copied_pairs holds (name_a, name_b) tuples, ordered by cohort position,
+    for every pair that derives from the same original.
+    """
+    rng = random.Random(seed)
+    specs = []
+    origin = []
+    for i in range(n):
+        if specs and rng.random() < copy_rate:
+            source = rng.randrange(len(specs))
+            specs.append(disguise(specs[source], rng))
+            origin.append(origin[source])
+        else:
+            specs.append(random_program(rng))
+            origin.append(i)
+
+    submissions = [
+        {"name": f"student_{i:04d}.py", "code": render(spec), "language": "Python"}
+        for i, spec in enumerate(specs)
+    ]
+    families = {}
+    for i, source in enumerate(origin):
+        families.setdefault(source, []).append(i)
+    copied_pairs = {
+        (submissions[i]["name"], submissions[j]["name"])
+        for members in families.values()
+        for x, i in enumerate(members) for j in members[x + 1:]
+    }
+    return submissions, copied_pairs
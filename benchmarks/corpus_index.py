@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Build and query benchmark for the persistent corpus index.
+
+Run from the repository root:
+
+    python -m benchmarks.corpus_index                    # archive 20000, 200 queries
+    python -m benchmarks.corpus_index --archive 2000 --queries 50
+    python -m benchmarks.corpus_index --db /tmp/archive.db --json out.json
+
+One synthetic cohort is split in two: the first --archive submissions are
+indexed as an earlier semester, the remaining --queries are checked against
+it. Reports build time, database size and per-query latency, plus:
+  * exact top-1 — for a sample of queries, how often the index's best match
+                  scores the same as a brute-force scan of the whole archive
+  * recall@k    — fraction of queries with an archived copy that find one of
+                  its family in the top k (renamed copies share little text,
+                  so this is bounded by the winnowing layer itself)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import generate_cohort
+from src.corpus_index import CorpusIndex
+from src.submission import Submission
+from src.winnowing import fingerprint_similarity
+
+_EXACT_SAMPLE = 50
+
+
+def run(archive: int, queries: int, k: int, db: str, seed: int) -> dict:
+    submissions, copied = generate_cohort(archive + queries, seed=seed)
+    archived, incoming = submissions[:archive], submissions[archive:]
+    archived_names = {s["name"] for s in archived}
+    expected = {}
+    for a, b in copied:
+        if a in archived_names and b not in archived_names:
+            expected.setdefault(b, set()).add(a)
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db + suffix):
+            os.remove(db + suffix)
+
+    with CorpusIndex(db) as index:
+        start = time.perf_counter()
+        index.add_many(archived, label="archive")
+        build_seconds = time.perf_counter() - start
+
+        latencies = []
+        best = []
+        hits = 0
+        for submission in incoming:
+            start = time.perf_counter()
+            results = index.query(submission["code"], submission["language"], k=k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            best.append(results[0]["similarity"] if results else 0.0)
+            family = expected.get(submission["name"])
+            if family and any(r["name"] in family for r in results):
+                hits += 1
+
+    archived_fingerprints = [Submission(s["code"], s["language"]).fingerprints for s in archived]
+    agree = 0
+    for submission, indexed_best in zip(incoming[:_EXACT_SAMPLE], best):
+        fingerprints = Submission(submission["code"], submission["language"]).fingerprints
+        exact = max(fingerprint_similarity(fingerprints, other) for other in archived_fingerprints)
+        agree += round(exact * 100, 1) == indexed_best
+
+    size = sum(os.path.getsize(db + s) for s in ("", "-wal") if os.path.exists(db + s))
+    latencies.sort()
+    return {
+        "archive": archive,
+        "queries": queries,
+        "k": k,
+        "build_s": round(build_seconds, 2),
+        "db_mb": round(size / 1e6, 1),
+        "query_ms_median": round(statistics.median(latencies), 2),
+        "query_ms_p95": round(latencies[int(0.95 * (len(latencies) - 1))], 2),
+        "exact_top1": round(agree / min(queries, _EXACT_SAMPLE), 4) if queries else None,
+        "queries_with_copy": len(expected),
+        "recall_at_k": round(hits / len(expected), 4) if expected else None,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--archive", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--db", help="database path (default: a temporary file)")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result = run(args.archive, args.queries, args.k,
+                     args.db or os.path.join(tmp, "archive.db"), args.seed)
+
+    print("=" * 72)
+    print("Corpus index")
+    print("=" * 72)
+    print(f"archived submissions : {result['archive']}")
+    print(f"build time           : {result['build_s']:.2f}s")
+    print(f"database size        : {result['db_mb']} MB")
+    print(f"query latency        : {result['query_ms_median']} ms median, {result['query_ms_p95']} ms p95")
+    print(f"exact top-1          : {result['exact_top1']} (of {min(result['queries'], _EXACT_SAMPLE)} sampled)")
+    print(f"recall@{result['k']:<14}: {result['recall_at_k']} "
+          f"({result['queries_with_copy']} queries with an archived copy)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Benchmark for the single-pass lexers in src.lexer.
+
+Run from the repository root:
+
+    python -m benchmarks.lexer                      # n = 300
+    python -m benchmarks.lexer --sizes 100 1000 --repeat 5
+
+Cohorts come from benchmarks.obfuscation. Each lexer is timed against the
+code it replaced, kept below as a reference: the stdlib tokenize based
+Python tokenizer, the five-pass regex splitter used for other languages
+(and for Python that tokenize rejects), and the per-line normalizer.
+Reports MB/s of each (best of --repeat runs) and the share of files whose
+output is identical. Python tokens and the normalized text must match
+exactly. Generic tokens differ where the old splitter glued a string
+literal to an adjacent word or literal, and where a quote inside a comment
+or inside the other kind of string changed which quotes pair up (see
+src.lexer); test_lexer.py checks both.
+"""
+
+import argparse
+import io
+import json
+import re
+import sys
+import time
+import tokenize
+
+from benchmarks.obfuscation import generate_cohort
+from src import lexer
+
+# ── Reference implementations (before src.lexer) ──
+
+_DQ_STRING_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*(?:(")|\\?\Z)')
+_SQ_STRING_RE = re.compile(r"'[^'\\]*(?:\\.[^'\\]*)*(?:(')|\\?\Z)")
+_SLASH_COMMENT_RE = re.compile(r"//.*$", re.MULTILINE)
+_HASH_COMMENT_RE = re.compile(r"#.*$", re.MULTILINE)
+_BLOCK_COMMENT_RE = re.compile(r"/\*.*?(?:\*/|\Z)", re.DOTALL)
+_WORD_RE = re.compile(r"[a-zA-Z_]\w*|[^\s]")
+
+
+def _replace_string(match: re.Match) -> str:
+    return "__STR__" if match.group(1) else match.group(0)
+
+
+def reference_generic(code: str) -> list[str]:
+    for pattern, repl in ((_DQ_STRING_RE, _replace_string), (_SQ_STRING_RE, _replace_string),
+                          (_SLASH_COMMENT_RE, ""), (_HASH_COMMENT_RE, ""), (_BLOCK_COMMENT_RE, "")):
+        code = pattern.sub(repl, code)
+    return [t.lower() for t in _WORD_RE.findall(code) if t.strip()]
+
+
+def reference_python(code: str) -> list[str]:
+    tokens = []
+    try:
+        readline = io.BytesIO(code.encode("utf-8")).readline
+        for tok in tokenize.tokenize(readline):
+            if tok.type == tokenize.ERRORTOKEN:
+                return reference_generic(code)
+            if tok.type in (tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE,
+                            tokenize.INDENT, tokenize.DEDENT, tokenize.ENCODING,
+                            tokenize.ENDMARKER):
+                continue
+            if tok.type == tokenize.STRING:
+                tokens.append("__STR__")
+            elif tok.type == tokenize.NUMBER:
+                tokens.append("__NUM__")
+            elif tok.type == tokenize.NAME:
+                tokens.append(tok.string.lower())
+            else:
+                tokens.append(tok.string)
+    except (tokenize.TokenError, SyntaxError):
+        return reference_generic(code)
+    return tokens
+
+
+def reference_normalize(code: str) -> str:
+    cleaned = []
+    for line in code.splitlines():
+        stripped = line.split("#")[0].rstrip()
+        stripped = re.sub(r"//.*$", "", stripped, flags=re.MULTILINE).rstrip()
+        if stripped.strip():
+            cleaned.append(stripped)
+    return "\n".join(cleaned)
+
+
+# ── Benchmark ──
+
+def _best(function, codes: list[str], repeat: int) -> float:
+    seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for code in codes:
+            function(code)
+        seconds = min(seconds, time.perf_counter() - start)
+    return seconds
+
+
+def run(n: int, repeat: int, seed: int) -> list[dict]:
+    submissions, _ = generate_cohort(n, seed=seed)
+    every = [s["code"] for s in submissions]
+    python = [s["code"] for s in submissions if lexer.family(s["language"]) == "python"]
+    cases = [
+        # (name, files, reference, new, new output comparable to the reference)
+        ("python", python, reference_python,
+         lambda code: lexer.lex(code, "Python"), lambda code: lexer.tokens(code, "Python")),
+        ("generic", every, reference_generic,
+         lambda code: lexer.lex(code, "Other"), lambda code: lexer.tokens(code, "Other")),
+        ("normalize", every, reference_normalize, lexer.normalize, lexer.normalize),
+    ]
+    results = []
+    for name, codes, reference, new, output in cases:
+        megabytes = sum(len(code.encode("utf-8")) for code in codes) / 2**20
+        old_s = _best(reference, codes, repeat)
+        new_s = _best(new, codes, repeat)
+        results.append({
+            "n": n,
+            "lexer": name,
+            "files": len(codes),
+            "mb": round(megabytes, 3),
+            "reference_s": round(old_s, 4),
+            "lexer_s": round(new_s, 4),
+            "reference_mb_per_s": round(megabytes / old_s, 2),
+            "lexer_mb_per_s": round(megabytes / new_s, 2),
+            "speedup": round(old_s / new_s, 2),
+            "identical": sum(reference(code) == output(code) for code in codes),
+        })
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[300])
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per lexer, best is kept")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = [r for n in args.sizes for r in run(n, args.repeat, args.seed)]
+
+    print("=" * 78)
+    print("Single-pass lexers vs. the functions they replaced")
+    print("=" * 78)
+    print(f"{'n':>6} {'lexer':>10} {'files':>6} {'MB':>7} {'ref MB/s':>9} {'new MB/s':>9} "
+          f"{'speedup':>8} {'identical':>10}")
+    for r in results:
+        identical = f"{r['identical']}/{r['files']}"
+        print(f"{r['n']:>6} {r['lexer']:>10} {r['files']:>6} {r['mb']:>7.2f} {r['reference_mb_per_s']:>9.2f} "
+              f"{r['lexer_mb_per_s']:>9.2f} {r['speedup']:>7.2f}x {identical:>10}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Recall and throughput benchmark for MinHash/LSH candidate generation.
+
+Run from the repository root:
+
+    python -m benchmarks.lsh                       # n = 1000, 10000
+    python -m benchmarks.lsh --quick               # n = 500, 2000
+    python -m benchmarks.lsh --thresholds 0.3 0.5 --num-perm 256 --recall-weight 0.7
+    python -m benchmarks.lsh --json out.json
+
+For each cohort size and LSH threshold the benchmark reports the time to
+build signatures and candidates, the fraction of all pairs that survive as
+candidates, and recall against:
+  * copies    — the cohort's ground-truth disguised copies
+  * jaccard   — every pair whose exact token 3-gram Jaccard similarity
+                reaches the threshold (only for n <= --exact-limit)
+  * flagged   — every pair that exact all-pairs detect_plagiarism() flags
+                (only for n <= --exact-limit)
+"""
+
+import argparse
+import json
+import sys
+import time
+from itertools import combinations
+
+from benchmarks.corpus import generate_cohort
+from src.lsh import DEFAULT_NUM_PERM, DEFAULT_RECALL_WEIGHT, MinHashLSH, hash_ngrams
+from src.ngrams import jaccard
+from src.plagiarism import detect_plagiarism
+from src.submission import Submission
+
+
+def _recall(found: set, expected: set) -> float | None:
+    if not expected:
+        return None
+    return round(len(found & expected) / len(expected), 4)
+
+
+def run_size(n: int, thresholds: list[float], num_perm: int, recall_weight: float,
+             exact_limit: int, seed: int) -> list[dict]:
+    submissions, copied_names = generate_cohort(n, seed=seed)
+    index_of = {s["name"]: i for i, s in enumerate(submissions)}
+    copied = {(index_of[a], index_of[b]) for a, b in copied_names}
+    total_pairs = n * (n - 1) // 2
+
+    start = time.perf_counter()
+    ngram_sets = [Submission(s["code"], s["language"]).ngrams(3) for s in submissions]
+    hash_sets = [hash_ngrams(grams) for grams in ngram_sets]
+    features_seconds = time.perf_counter() - start
+
+    exact_jaccard = flagged = None
+    if n <= exact_limit:
+        exact_jaccard = {}
+        for i, j in combinations(range(n), 2):
+            a, b = ngram_sets[i], ngram_sets[j]
+            if len(a) and len(b):
+                exact_jaccard[(i, j)] = jaccard(a, b)
+        result = detect_plagiarism(submissions)
+        flagged = {
+            tuple(sorted((index_of[p["sub_a"]], index_of[p["sub_b"]])))
+            for p in result["pairs"] if p["overall"] >= result["threshold"]
+        }
+
+    results = []
+    for threshold in thresholds:
+        start = time.perf_counter()
+        index = MinHashLSH(threshold, num_perm, recall_weight)
+        index.add(hash_sets)
+        signature_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        candidates = index.candidate_pairs()
+        candidate_seconds = time.perf_counter() - start
+
+        above = None
+        if exact_jaccard is not None:
+            above = {pair for pair, value in exact_jaccard.items() if value >= threshold}
+        results.append({
+            "n": n,
+            "threshold": threshold,
+            "num_perm": num_perm,
+            "recall_weight": recall_weight,
+            "bands": index.bands,
+            "rows": index.rows,
+            "total_pairs": total_pairs,
+            "candidates": len(candidates),
+            "candidate_fraction": round(len(candidates) / total_pairs, 5) if total_pairs else 0.0,
+            "features_s": round(features_seconds, 3),
+            "signatures_s": round(signature_seconds, 3),
+            "candidates_s": round(candidate_seconds, 3),
+            "recall_copies": _recall(candidates, copied),
+            "recall_jaccard": _recall(candidates, above) if above is not None else None,
+            "recall_flagged": _recall(candidates, flagged) if flagged is not None else None,
+        })
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="n = 500, 2000")
+    parser.add_argument("--sizes", type=int, nargs="+")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.3, 0.5, 0.7])
+    parser.add_argument("--num-perm", type=int, default=DEFAULT_NUM_PERM)
+    parser.add_argument("--recall-weight", type=float, default=DEFAULT_RECALL_WEIGHT)
+    parser.add_argument("--exact-limit", type=int, default=1000,
+                        help="compute exact-scoring recall up to this cohort size")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sizes = args.sizes or ([500, 2000] if args.quick else [1000, 10000])
+    results = []
+    for n in sizes:
+        results.extend(run_size(n, args.thresholds, args.num_perm, args.recall_weight,
+                                args.exact_limit, args.seed))
+
+    print("=" * 100)
+    print("MinHash/LSH candidate generation")
+    print("=" * 100)
+    print(f"{'n':>6} {'thr':>5} {'b x r':>7} {'candidates':>11} {'of pairs':>9} {'time':>8} "
+          f"{'recall copies':>14} {'recall jaccard':>15} {'recall flagged':>15}")
+    for r in results:
+        elapsed = r["features_s"] + r["signatures_s"] + r["candidates_s"]
+        print(f"{r['n']:>6} {r['threshold']:>5} {str(r['bands']) + 'x' + str(r['rows']):>7} "
+              f"{r['candidates']:>11} {r['candidate_fraction']:>9.2%} {elapsed:>7.2f}s "
+              f"{str(r['recall_copies']):>14} {str(r['recall_jaccard']):>15} {str(r['recall_flagged']):>15}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
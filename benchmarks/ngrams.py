@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Benchmark for hashed token n-grams (src.ngrams).
+
+Run from the repository root:
+
+    python -m benchmarks.ngrams                     # n = 100 and 300
+    python -m benchmarks.ngrams --sizes 1000 --repeat 5
+
+Cohorts come from benchmarks.obfuscation. The token 3-grams of every
+submission are built twice: as the set of token-string tuples used before
+src.ngrams (kept below as a reference) and as a sorted uint64 array of
+n-gram hashes. Reports the memory each representation retains per
+submission (traced with tracemalloc), the time to build them and the time
+per pair of the Jaccard score (best of --repeat runs each), and how
+many pairs score identically, which only a 64-bit hash collision can break.
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from functools import partial
+from itertools import combinations
+
+from benchmarks.obfuscation import generate_cohort
+from src import lexer
+from src.ngrams import jaccard, ngram_hashes
+
+# ── Reference implementation (before src.ngrams) ──
+
+
+def reference_ngrams(tokens: list[str], n: int) -> set[tuple[str, ...]]:
+    if len(tokens) < n:
+        return set()
+    return {tuple(tokens[i : i + n]) for i in range(len(tokens) - n + 1)}
+
+
+def reference_jaccard(grams_a: set, grams_b: set) -> float:
+    if not grams_a and not grams_b:
+        return 1.0
+    if not grams_a or not grams_b:
+        return 0.0
+    intersection = len(grams_a & grams_b)
+    union = len(grams_a) + len(grams_b) - intersection
+    return intersection / union if union else 0.0
+
+
+# ── Benchmark ──
+
+def _retained(function, streams: list) -> tuple[list, int]:
+    """(features, bytes they retain) of `function` over `streams`, traced apart from the timing runs."""
+    function(streams[0])  # warm-up: first-call allocations are not per submission
+    tracemalloc.start()
+    features = [function(stream) for stream in streams]
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return features, retained
+
+
+def _best_build(function, streams: list, repeat: int) -> float:
+    seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for stream in streams:
+            function(stream)
+        seconds = min(seconds, time.perf_counter() - start)
+    return seconds
+
+
+def _best_pairs(score, features: list, pairs: list, repeat: int) -> float:
+    seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i, j in pairs:
+            score(features[i], features[j])
+        seconds = min(seconds, time.perf_counter() - start)
+    return seconds
+
+
+def run(n: int, repeat: int, seed: int) -> dict:
+    submissions, _ = generate_cohort(n, seed=seed)
+    id_streams = [lexer.lex(s["code"], s["language"])[0] for s in submissions]
+    # Token strings are shared with the vocabulary, so only the tuples and sets count
+    token_streams = [lexer.VOCABULARY.decode(ids) for ids in id_streams]
+
+    build_reference = partial(reference_ngrams, n=3)
+    build_hashed = partial(ngram_hashes, n=3)
+    reference, reference_bytes = _retained(build_reference, token_streams)
+    hashed, hashed_bytes = _retained(build_hashed, id_streams)
+    reference_s = _best_build(build_reference, token_streams, repeat)
+    hashed_s = _best_build(build_hashed, id_streams, repeat)
+
+    pairs = list(combinations(range(n), 2))
+    reference_pair_s = _best_pairs(reference_jaccard, reference, pairs, repeat)
+    hashed_pair_s = _best_pairs(jaccard, hashed, pairs, repeat)
+    identical = sum(reference_jaccard(reference[i], reference[j]) == jaccard(hashed[i], hashed[j])
+                    for i, j in pairs)
+    return {
+        "n": n,
+        "pairs": len(pairs),
+        "mean_ngrams": round(sum(map(len, hashed)) / n, 1),
+        "reference_kb_per_sub": round(reference_bytes / n / 1024, 2),
+        "hashed_kb_per_sub": round(hashed_bytes / n / 1024, 2),
+        "memory_ratio": round(reference_bytes / hashed_bytes, 1),
+        "reference_build_s": round(reference_s, 4),
+        "hashed_build_s": round(hashed_s, 4),
+        "reference_us_per_pair": round(reference_pair_s / len(pairs) * 1e6, 2),
+        "hashed_us_per_pair": round(hashed_pair_s / len(pairs) * 1e6, 2),
+        "identical": identical,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300])
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs of each step, best is kept")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = [run(n, args.repeat, args.seed) for n in args.sizes]
+
+    print("=" * 92)
+    print("Token 3-grams: sets of string tuples vs. sorted arrays of 64-bit hashes")
+    print("=" * 92)
+    print(f"{'n':>6} {'grams':>7} {'ref KB':>8} {'hash KB':>8} {'memory':>7} {'ref build':>10} "
+          f"{'hash build':>11} {'ref us/pr':>10} {'hash us/pr':>11} {'identical':>12}")
+    for r in results:
+        identical = f"{r['identical']}/{r['pairs']}"
+        print(f"{r['n']:>6} {r['mean_ngrams']:>7.0f} {r['reference_kb_per_sub']:>8.1f} "
+              f"{r['hashed_kb_per_sub']:>8.1f} {r['memory_ratio']:>6.1f}x {r['reference_build_s']:>9.3f}s "
+              f"{r['hashed_build_s']:>10.3f}s {r['reference_us_per_pair']:>10.2f} "
+              f"{r['hashed_us_per_pair']:>11.2f} {identical:>12}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+"""Source-level obfuscation of real submissions for the plagiarism benchmarks.
+
+Unlike benchmarks.corpus, which disguises template specs before rendering
+them, these mutations rewrite arbitrary source text. That lets cohorts start
+from the multi-language programs in test_samples/:
+  * rename     — consistently rename declared identifiers (outside strings
+                 and comments; Python via ast/tokenize, others by declaration
+                 patterns)
+  * reorder    — shuffle runs of consecutive top-level definitions
+  * comments   — inject comment lines between statements
+  * dead_code  — insert unused assignments at the top of blocks
+  * whitespace — add blank lines and trailing spaces, and re-indent brace
+                 languages
+
+    from benchmarks.obfuscation import generate_cohort
+    submissions, copied_pairs = generate_cohort(200, seed=0)
+"""
+
+import ast
+import builtins
+import io
+import random
+import re
+import tokenize
+from pathlib import Path
+
+from benchmarks.corpus import random_program, render
+from src.utils import detect_language
+
+SAMPLES_DIR = Path(__file__).resolve().parent.parent / "test_samples"
+
+_WORDS = [
+    "data", "items", "values", "total", "result", "count", "nums", "arr", "seq",
+    "buf", "acc", "cur", "tmp", "out", "left", "right", "key", "val", "node",
+    "stack", "queue", "seen", "table", "grid", "row", "col", "text", "word",
+    "index", "limit", "score", "best", "step", "size", "memo", "cache", "pair",
+]
+_COMMENT_TEXT = [
+    "helper", "TODO: handle edge cases", "main logic here", "iterate over the input",
+    "return the answer", "O(n) approach", "check bounds", "update state",
+]
+_EXTENSIONS = {
+    "Python": ".py", "JavaScript": ".js", "TypeScript": ".ts", "Java": ".java",
+    "C": ".c", "C++": ".cpp", "Go": ".go", "Ruby": ".rb", "Rust": ".rs",
+}
+
+
+def _comment_prefix(language: str) -> str:
+    return "#" if language in ("Python", "Ruby") else "//"
+
+
+def _fresh_name(rng: random.Random, taken: set) -> str:
+    while True:
+        name = rng.choice(_WORDS) + "_" + str(rng.randint(0, 999))
+        if name not in taken:
+            taken.add(name)
+            return name
+
+
+# ── rename ──
+
+_PY_KEEP = set(dir(builtins)) | {"self", "cls"}
+
+
+def _rename_python(code: str, rng: random.Random) -> str:
+    tree = ast.parse(code)
+    declared = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            declared.add(node.name)
+        elif isinstance(node, ast.arg):
+            declared.add(node.arg)
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            declared.add(node.id)
+    declared = {name for name in declared if name not in _PY_KEEP and not name.startswith("__")}
+    taken = {tok.string for tok in tokenize.generate_tokens(io.StringIO(code).readline)
+             if tok.type == tokenize.NAME}
+    mapping = {name: _fresh_name(rng, taken) for name in sorted(declared)}
+
+    lines = code.splitlines(keepends=True)
+    # Replace NAME tokens right to left so earlier columns stay valid
+    for tok in reversed(list(tokenize.generate_tokens(io.StringIO(code).readline))):
+        if tok.type == tokenize.NAME and tok.string in mapping:
+            row, col = tok.start
+            line = lines[row - 1]
+            lines[row - 1] = line[:col] + mapping[tok.string] + line[tok.end[1]:]
+    return "".join(lines)
+
+
+# Strings, comments and identifiers of C-family languages, in one alternation
+_C_LEXEME_RE = re.compile(
+    r'//[^\n]*|/\*.*?(?:\*/|\Z)|"(?:\\.|[^"\\\n])*"?|\'(?:\\.|[^\'\\\n])*\'?|`[^`]*`?|([A-Za-z_]\w*)',
+    re.DOTALL,
+)
+_NOT_NEWLINE_RE = re.compile(r"[^\n]")
+
+
+def _mask_literals(code: str) -> str:
+    """Blank out strings and comments, keeping every newline in place."""
+    return _C_LEXEME_RE.sub(lambda m: m.group(0) if m.group(1) else _NOT_NEWLINE_RE.sub(" ", m.group(0)), code)
+
+
+_C_DECLARATION_RE = re.compile(
+    r"\b(?:function|func|class|struct|let|var|const|int|long|short|double|float|char|bool|"
+    r"boolean|String|string|auto|void|size_t|Node)\b[\s*&]+([A-Za-z_]\w*)"
+    r"|\b([A-Za-z_]\w*)\s*:="
+)
+_C_KEEP = {
+    "main", "if", "else", "for", "while", "return", "new", "this", "null", "nullptr", "true", "false",
+    "int", "long", "double", "float", "char", "void", "auto", "const", "static", "public", "private",
+    "string", "String", "func", "var", "let", "function", "class", "struct", "err", "_",
+}
+
+
+def _rename_c_like(code: str, rng: random.Random) -> str:
+    masked = _mask_literals(code)
+    declared = set()
+    for match in _C_DECLARATION_RE.finditer(masked):
+        declared.add(match.group(1) or match.group(2))
+    declared -= _C_KEEP
+    taken = {m.group(1) for m in _C_LEXEME_RE.finditer(code) if m.group(1)}
+    mapping = {name: _fresh_name(rng, taken) for name in sorted(declared)}
+    return _C_LEXEME_RE.sub(lambda m: mapping.get(m.group(1), m.group(0)) if m.group(1) else m.group(0), code)
+
+
+def rename_identifiers(code: str, language: str, rng: random.Random) -> str:
+    if language == "Python":
+        try:
+            return _rename_python(code, rng)
+        except (SyntaxError, tokenize.TokenError):
+            return code
+    return _rename_c_like(code, rng)
+
+
+# ── reorder ──
+
+_COMMENT_STARTS = ("#", "//", "/*", "*")
+
+
+def _with_leading_comments(lines: list[str], start: int, floor: int = 0) -> int:
+    """Move a span start up over the comment lines directly above it (not above `floor`)."""
+    while start > floor and lines[start - 1].lstrip().startswith(_COMMENT_STARTS):
+        start -= 1
+    return start
+
+
+def _python_definition_spans(code: str) -> list[tuple[int, int]]:
+    """0-based [start, stop) line spans of top-level defs/classes, decorators included."""
+    lines = code.split("\n")
+    spans = []
+    for node in ast.parse(code).body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list]) - 1
+            floor = spans[-1][1] if spans else 0
+            spans.append((_with_leading_comments(lines, start, floor), node.end_lineno))
+    return spans
+
+
+def _brace_definition_spans(code: str, level: int) -> list[tuple[int, int]]:
+    """0-based [start, stop) line spans of brace blocks opened at nesting `level`."""
+    masked = _mask_literals(code)
+    lines = code.split("\n")
+    spans = []
+    depth = 0
+    start = None
+    for number, line in enumerate(masked.split("\n")):
+        if depth == level and start is None and line.rstrip().endswith("{"):
+            start = number
+        depth = max(depth + line.count("{") - line.count("}"), 0)
+        if depth == level and start is not None:
+            floor = spans[-1][1] if spans else 0
+            spans.append((_with_leading_comments(lines, start, floor), number + 1))
+            start = None
+    return spans
+
+
+def _definition_runs(lines: list[str], spans: list[tuple[int, int]]) -> list[list[tuple[int, int]]]:
+    """Group spans into runs separated only by blank lines; only those can be permuted."""
+    runs, run = [], []
+    for span in spans:
+        if run and any(lines[k].strip() for k in range(run[-1][1], span[0])):
+            runs.append(run)
+            run = []
+        run.append(span)
+    runs.append(run)
+    return [run for run in runs if len(run) > 1]
+
+
+def reorder_definitions(code: str, language: str, rng: random.Random) -> str:
+    lines = code.split("\n")
+    if language == "Python":
+        try:
+            runs = _definition_runs(lines, _python_definition_spans(code))
+        except SyntaxError:
+            return code
+    else:
+        # Top-level functions, else the members of a top-level class (Java)
+        runs = (_definition_runs(lines, _brace_definition_spans(code, 0))
+                or _definition_runs(lines, _brace_definition_spans(code, 1)))
+
+    for run in runs:
+        blocks = [lines[a:b] for a, b in run]
+        rng.shuffle(blocks)
+        # Refill the same slots back to front, so earlier slot offsets stay valid
+        for (a, b), block in reversed(list(zip(run, blocks))):
+            lines[a:b] = block
+    return "\n".join(lines)
+
+
+# ── comments, dead code, whitespace ──
+
+_STATEMENT_END = (":", "{", ";", "}")
+
+
+def _indent_of_next(lines: list[str], index: int) -> str:
+    for line in lines[index:]:
+        if line.strip():
+            return line[:len(line) - len(line.lstrip())]
+    return ""
+
+
+def inject_comments(code: str, language: str, rng: random.Random, rate: float = 0.15) -> str:
+    prefix = _comment_prefix(language)
+    lines = code.split("\n")
+    out = []
+    for index, line in enumerate(lines):
+        previous = out[-1].rstrip() if out else ""
+        if line.strip() and (not previous or previous.endswith(_STATEMENT_END)) and rng.random() < rate:
+            out.append(f"{_indent_of_next(lines, index)}{prefix} {rng.choice(_COMMENT_TEXT)}")
+        out.append(line)
+    return "\n".join(out)
+
+
+_DEAD_CODE = {
+    "Python": "_unused_{n} = {v}",
+    "JavaScript": "let unused_{n} = {v};",
+    "TypeScript": "let unused_{n} = {v};",
+    "Java": "int unused_{n} = {v};",
+    "C": "int unused_{n} = {v};",
+    "C++": "int unused_{n} = {v};",
+    "Go": "_ = {v}",
+    "Rust": "let _unused_{n} = {v};",
+    "Ruby": "_unused_{n} = {v}",
+}
+_NO_DEAD_CODE_RE = re.compile(r"\b(?:switch|enum|struct|union|interface|import|select)\b|=\s*\{$|^\s*(?:type|const|var)\b")
+_PY_BLOCK_RE = re.compile(r"^\s*(?:def|if|elif|else|for|while|try|except|finally|with)\b.*:\s*$")
+
+
+def insert_dead_code(code: str, language: str, rng: random.Random, rate: float = 0.3) -> str:
+    template = _DEAD_CODE.get(language)
+    if template is None:
+        return code
+    lines = code.split("\n")
+    out = []
+    for index, line in enumerate(lines):
+        out.append(line)
+        stripped = line.rstrip()
+        if language == "Python":
+            opens_block = bool(_PY_BLOCK_RE.match(stripped))
+        else:
+            opens_block = stripped.endswith("{") and not _NO_DEAD_CODE_RE.search(stripped)
+        if opens_block and rng.random() < rate:
+            indent = _indent_of_next(lines, index + 1)
+            if len(indent) > len(line) - len(line.lstrip()):
+                out.append(indent + template.format(n=rng.randint(0, 999), v=rng.randint(0, 99)))
+    return "\n".join(out)
+
+
+def change_whitespace(code: str, language: str, rng: random.Random) -> str:
+    lines = code.split("\n")
+    out = []
+    reindent = language != "Python" and rng.random() < 0.5
+    for line in lines:
+        if reindent:
+            body = line.lstrip(" \t")
+            leading = line[:len(line) - len(body)]
+            width = leading.count("\t") + leading.count(" ") // 4
+            line = "  " * width + body
+        if line.strip() and rng.random() < 0.2:
+            line += " " * rng.randint(1, 3)
+        out.append(line)
+        if not line.strip() and rng.random() < 0.5:
+            out.append("")
+    return "\n".join(out)
+
+
+SOURCE_MUTATIONS = {
+    "rename": rename_identifiers,
+    "reorder": reorder_definitions,
+    "comments": inject_comments,
+    "dead_code": insert_dead_code,
+    "whitespace": change_whitespace,
+}
+
+
+def obfuscate(code: str, language: str, rng: random.Random, mutations=None) -> str:
+    """Apply the named mutations (default: a random non-empty subset) to source code."""
+    if mutations is None:
+        mutations = [name for name in SOURCE_MUTATIONS if rng.random() < 0.5] or [rng.choice(list(SOURCE_MUTATIONS))]
+    for name in mutations:
+        code = SOURCE_MUTATIONS[name](code, language, rng)
+    return code
+
+
+# ── Cohorts ──
+
+def load_samples(directory: Path = SAMPLES_DIR) -> list[dict]:
+    """The code files in test_samples/ as {'name', 'code', 'language'} dicts."""
+    samples = []
+    for path in sorted(directory.iterdir()):
+        language = detect_language(path.name)
+        if path.suffix in _EXTENSIONS.values() and language:
+            samples.append({"name": path.name, "code": path.read_text(encoding="utf-8"), "language": language})
+    return samples
+
+
+def generate_cohort(n: int, seed: int = 0, copy_rate: float = 0.3, mutations=None) -> tuple[list[dict], set]:
+    """Generate `n` submissions, about `copy_rate` of them obfuscated copies.
+
+    Originals are the test_samples programs first, then synthetic Python
+    programs (benchmarks.corpus) once those run out. Each copy derives from
+    a random earlier submission through `mutations` (default: a random
+    non-empty subset per copy). Returns (submissions, copied_pairs) like
+    benchmarks.corpus.generate_cohort(): copied_pairs holds (name_a, name_b)
+    for every pair sharing an original.
+    """
+    rng = random.Random(seed)
+    samples = load_samples()
+    rng.shuffle(samples)
+    submissions = []
+    origin = []
+    originals = 0
+    for i in range(n):
+        if submissions and rng.random() < copy_rate:
+            source = rng.randrange(len(submissions))
+            language = submissions[source]["language"]
+            code = obfuscate(submissions[source]["code"], language, rng, mutations)
+            origin.append(origin[source])
+        else:
+            if originals < len(samples):
+                code, language = samples[originals]["code"], samples[originals]["language"]
+            else:
+                code, language = render(random_program(rng)), "Python"
+            originals += 1
+            origin.append(i)
+        submissions.append({"name": f"sub_{i:04d}{_EXTENSIONS[language]}", "code": code, "language": language})
+
+    families = {}
+    for i, source in enumerate(origin):
+        families.setdefault(source, []).append(i)
+    copied_pairs = {
+        (submissions[i]["name"], submissions[j]["name"])
+        for members in families.values()
+        for x, i in enumerate(members) for j in members[x + 1:]
+    }
+    return submissions, copied_pairs
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Core-scaling benchmark for the process-parallel pair scoring engine.
+
+Run from the repository root:
+
+    python -m benchmarks.parallel                      # n = 400, 1, 2, 4, ... cores
+    python -m benchmarks.parallel --sizes 1000 --workers 1 4 8
+    python -m benchmarks.parallel --text-method difflib --sizes 150
+
+For each cohort size, detect_plagiarism() runs once with engine="pairwise"
+(one process) and once with engine="parallel" per worker count. Reports
+pairs/second, speedup over the single-process engine, and whether the
+results are identical.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from benchmarks.corpus import generate_cohort
+from src.plagiarism import TEXT_METHODS, detect_plagiarism
+
+
+def _default_workers() -> list[int]:
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def run_size(n: int, workers: list[int], text_method: str, seed: int) -> list[dict]:
+    submissions, _ = generate_cohort(n, seed=seed)
+    pairs = n * (n - 1) // 2
+
+    start = time.perf_counter()
+    baseline = detect_plagiarism(submissions, text_method=text_method, engine="pairwise")
+    baseline_seconds = time.perf_counter() - start
+
+    results = [{"n": n, "text_method": text_method, "engine": "pairwise", "workers": 1,
+                "seconds": round(baseline_seconds, 3),
+                "pairs_per_s": round(pairs / baseline_seconds), "speedup": 1.0, "identical": True}]
+    for count in workers:
+        start = time.perf_counter()
+        result = detect_plagiarism(submissions, text_method=text_method, engine="parallel", workers=count)
+        seconds = time.perf_counter() - start
+        results.append({
+            "n": n, "text_method": text_method, "engine": "parallel", "workers": count,
+            "seconds": round(seconds, 3),
+            "pairs_per_s": round(pairs / seconds),
+            "speedup": round(baseline_seconds / seconds, 2),
+            "identical": result == baseline,
+        })
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[400])
+    parser.add_argument("--workers", type=int, nargs="+", default=_default_workers())
+    parser.add_argument("--text-method", choices=TEXT_METHODS, default="winnow")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = []
+    for n in args.sizes:
+        results.extend(run_size(n, args.workers, args.text_method, args.seed))
+
+    print("=" * 72)
+    print(f"Pair scoring by engine, text layer {args.text_method!r} ({os.cpu_count()} CPUs)")
+    print("=" * 72)
+    print(f"{'n':>6} {'engine':>9} {'workers':>8} {'time':>9} {'pairs/s':>10} {'speedup':>8} {'identical':>10}")
+    for r in results:
+        print(f"{r['n']:>6} {r['engine']:>9} {r['workers']:>8} {r['seconds']:>8.2f}s "
+              f"{r['pairs_per_s']:>10} {str(r['speedup']) + 'x':>8} {str(r['identical']):>10}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if not all(r["identical"] for r in results):
+        print("\nParallel results differ from the single-process engine")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
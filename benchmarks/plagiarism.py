@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Throughput benchmark for detect_plagiarism on synthetic cohorts.
+
+Run from the repository root:
+
+    python -m benchmarks.plagiarism                 # n = 50, 200, 1000
+    python -m benchmarks.plagiarism --sizes 50 200
+    python -m benchmarks.plagiarism --text-method difflib
+    python -m benchmarks.plagiarism --json out.json
+
+For each cohort size two paths are timed:
+  * legacy — compute_pair_similarity() on raw strings, so every pair
+    re-normalizes, re-tokenizes and re-parses both files
+  * cached — detect_plagiarism(), which precomputes each submission's
+    features once and scores pairs from the cached features only
+
+Pairs grow quadratically, so the legacy path is timed on a random sample of
+pairs and extrapolated. The cached path runs in full while the pair count is
+at most --max-full-pairs, and is extrapolated the same way above that. Both
+paths are checked to produce identical scores on the sampled pairs.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from itertools import combinations
+
+from benchmarks.corpus import generate_cohort
+from src.plagiarism import TEXT_METHODS, compute_pair_similarity, detect_plagiarism
+from src.submission import Submission
+
+
+def _sample_pairs(n: int, count: int, rng: random.Random) -> list[tuple[int, int]]:
+    total = n * (n - 1) // 2
+    if total <= count:
+        return list(combinations(range(n), 2))
+    pairs = set()
+    while len(pairs) < count:
+        i, j = rng.sample(range(n), 2)
+        pairs.add((min(i, j), max(i, j)))
+    return sorted(pairs)
+
+
+def run_size(n: int, sample_size: int, max_full_pairs: int, seed: int,
+             text_method: str = "winnow") -> dict:
+    submissions, _ = generate_cohort(n, seed=seed)
+    total_pairs = n * (n - 1) // 2
+    sample = _sample_pairs(n, sample_size, random.Random(seed))
+    codes = [s["code"] for s in submissions]
+
+    # Legacy: raw strings, every call rebuilds both submissions' features
+    start = time.perf_counter()
+    legacy_scores = [compute_pair_similarity(codes[i], codes[j], "Python", text_method) for i, j in sample]
+    legacy_per_pair = (time.perf_counter() - start) / len(sample)
+    legacy_total = legacy_per_pair * total_pairs
+
+    # Cached: features once per submission, then per-pair scoring only
+    start = time.perf_counter()
+    parsed = [Submission(code, "Python").precompute(text_method=text_method) for code in codes]
+    precompute_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    cached_scores = [compute_pair_similarity(parsed[i], parsed[j], "Python", text_method) for i, j in sample]
+    cached_per_pair = (time.perf_counter() - start) / len(sample)
+
+    if total_pairs <= max_full_pairs:
+        start = time.perf_counter()
+        detect_plagiarism(submissions, text_method=text_method)
+        cached_total = time.perf_counter() - start
+        cached_measured = True
+    else:
+        cached_total = precompute_seconds + cached_per_pair * total_pairs
+        cached_measured = False
+
+    return {
+        "n": n,
+        "text_method": text_method,
+        "pairs": total_pairs,
+        "sampled_pairs": len(sample),
+        "legacy_ms_per_pair": round(legacy_per_pair * 1000, 3),
+        "legacy_total_s": round(legacy_total, 2),
+        "cached_precompute_s": round(precompute_seconds, 3),
+        "cached_ms_per_pair": round(cached_per_pair * 1000, 3),
+        "cached_total_s": round(cached_total, 2),
+        "cached_total_measured": cached_measured,
+        "speedup": round(legacy_total / cached_total, 1) if cached_total else None,
+        "scores_match": legacy_scores == cached_scores,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--sample-pairs", type=int, default=300,
+                        help="pairs timed per size on the legacy path")
+    parser.add_argument("--max-full-pairs", type=int, default=20000,
+                        help="run detect_plagiarism() in full up to this many pairs")
+    parser.add_argument("--text-method", choices=TEXT_METHODS, default="winnow")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = [run_size(n, args.sample_pairs, args.max_full_pairs, args.seed, args.text_method)
+               for n in args.sizes]
+
+    print("=" * 88)
+    print(f"detect_plagiarism throughput, text layer {args.text_method!r} "
+          "(legacy per-pair parsing vs precomputed features)")
+    print("=" * 88)
+    print(f"{'n':>6} {'pairs':>9} {'legacy ms/pair':>15} {'legacy total':>13} "
+          f"{'cached ms/pair':>15} {'cached total':>13} {'speedup':>8}")
+    for r in results:
+        cached_total = f"{r['cached_total_s']}s" + ("" if r["cached_total_measured"] else "*")
+        print(f"{r['n']:>6} {r['pairs']:>9} {r['legacy_ms_per_pair']:>15} {str(r['legacy_total_s']) + 's*':>13} "
+              f"{r['cached_ms_per_pair']:>15} {cached_total:>13} {str(r['speedup']) + 'x':>8}")
+    print("* extrapolated from sampled pairs")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    mismatched = [r["n"] for r in results if not r["scores_match"]]
+    if mismatched:
+        print(f"\nScores differ between paths for n = {mismatched}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
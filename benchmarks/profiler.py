@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Accuracy and cost of the sandboxed runtime profiler (src.profiler).
+
+Run from the repository root:
+
+    python -m benchmarks.profiler                    # every reference function once
+    python -m benchmarks.profiler --repeat 3 --json profiler.json
+
+Each reference function below has a known time and space complexity. It is
+profiled with profile_python() on its input generator, and the table lists
+the detected classes against the expected ones, the sizes measured and the
+wall-clock seconds per profile. With --repeat, every function is profiled
+several times and a class counts as detected only if every run agrees,
+which shows how stable the fit is against timing noise.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from src.profiler import profile_python, resource
+
+# (name, input generator, expected time, expected space, code)
+REFERENCES = [
+    ("constant", "array", "O(1)", "O(1)", """
+def first(nums):
+    return nums[0] if nums else None
+"""),
+    ("binary search", "sorted_array_target", "O(log n)", "O(1)", """
+def search(nums, target):
+    lo, hi = 0, len(nums) - 1
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        if nums[mid] == target:
+            return mid
+        if nums[mid] < target:
+            lo = mid + 1
+        else:
+            hi = mid - 1
+    return -1
+"""),
+    ("sum", "array", "O(n)", "O(1)", """
+def total(nums):
+    result = 0
+    for x in nums:
+        result += x
+    return result
+"""),
+    ("two sum (hash map)", "array_target", "O(n)", "O(n)", """
+class Solution:
+    def twoSum(self, nums, target):
+        seen = {}
+        for i, x in enumerate(nums):
+            if target - x in seen:
+                return [seen[target - x], i]
+            seen[x] = i
+        return []
+"""),
+    ("merge sort", "array", "O(n log n)", "O(n)", """
+def merge_sort(nums):
+    if len(nums) <= 1:
+        return nums
+    mid = len(nums) // 2
+    left, right = merge_sort(nums[:mid]), merge_sort(nums[mid:])
+    merged, i, j = [], 0, 0
+    while i < len(left) and j < len(right):
+        if left[i] <= right[j]:
+            merged.append(left[i])
+            i += 1
+        else:
+            merged.append(right[j])
+            j += 1
+    return merged + left[i:] + right[j:]
+"""),
+    ("two sum (nested loops)", "array_target", "O(n^2)", "O(1)", """
+def two_sum(nums, target):
+    for i in range(len(nums)):
+        for j in range(i + 1, len(nums)):
+            if nums[i] + nums[j] == target:
+                return [i, j]
+    return []
+"""),
+    ("in-place bubble sort", "array", "O(n^2)", "O(1)", """
+def bubble_sort(nums):
+    for i in range(len(nums)):
+        for j in range(len(nums) - 1 - i):
+            if nums[j] > nums[j + 1]:
+                nums[j], nums[j + 1] = nums[j + 1], nums[j]
+    return nums
+"""),
+    ("recursive fibonacci", "int", "O(2^n)", None, """
+def fib(n):
+    return n if n < 2 else fib(n - 1) + fib(n - 2)
+"""),
+]
+
+
+def run(repeat: int) -> list[dict]:
+    results = []
+    for name, inputs, time_class, space_class, code in REFERENCES:
+        profiles, seconds = [], []
+        for seed in range(repeat):
+            start = time.perf_counter()
+            profiles.append(profile_python(code, inputs, seed=seed, run_untrusted_code=True))
+            seconds.append(time.perf_counter() - start)
+        results.append({
+            "name": name,
+            "expected_time": time_class,
+            "detected_time": sorted({str(p["time"]) for p in profiles}),
+            "expected_space": space_class,
+            "detected_space": sorted({str(p["space"]) for p in profiles}),
+            "max_n": max((p["sizes"][-1] for p in profiles if p["sizes"]), default=0),
+            "errors": sorted({p["error"] for p in profiles if p["error"]}),
+            "seconds": round(sum(seconds) / repeat, 2),
+        })
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=1, help="profiles of each function (different inputs)")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    args = parser.parse_args()
+    if resource is None:
+        print("The profiler needs the POSIX resource module")
+        return 1
+
+    results = run(args.repeat)
+
+    print("=" * 96)
+    print("Sandboxed profiler: detected vs. expected complexity")
+    print("=" * 96)
+    print(f"{'function':<24} {'time':<12} {'detected':<18} {'space':<8} {'detected':<18} {'max n':>7} {'s':>6}")
+    hits = 0
+    for r in results:
+        time_ok = r["detected_time"] == [r["expected_time"]]
+        space_ok = r["expected_space"] is None or r["detected_space"] == [r["expected_space"]]
+        hits += time_ok + space_ok
+        detected_time = ("" if time_ok else "✗ ") + "/".join(r["detected_time"])
+        detected_space = ("" if space_ok else "✗ ") + "/".join(r["detected_space"])
+        print(f"{r['name']:<24} {r['expected_time']:<12} {detected_time:<18} {r['expected_space'] or '-':<8} "
+              f"{detected_space:<18} {r['max_n']:>7} {r['seconds']:>6.1f}")
+        for error in r["errors"]:
+            print(f"{'':<24} stopped: {error}")
+    print(f"\n{hits}/{2 * len(results)} classes detected in every run")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
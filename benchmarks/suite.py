@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""Standard speed and accuracy workload for the plagiarism detector.
+
+Run from the repository root:
+
+    python -m benchmarks.suite                                # n = 50 and 200
+    python -m benchmarks.suite --sizes 500 --configs vectorized cascade
+    python -m benchmarks.suite --mutations rename reorder     # one kind of disguise
+    python -m benchmarks.suite --json baseline.json
+    python -m benchmarks.suite --baseline baseline.json       # exit 1 on regression
+
+Cohorts come from benchmarks.obfuscation: the test_samples programs (then
+synthetic Python programs) plus obfuscated copies of them. Each detector
+configuration runs on each cohort, and the suite records:
+  * pairs/second of detect_plagiarism(), best of --repeat runs
+  * peak traced memory of a separate run under tracemalloc (worker
+    processes of the parallel engine are not traced)
+  * precision, recall and F1 at --threshold for each layer (text_sim,
+    token_sim, structural_sim on same-language pairs with a parse tree,
+    gst_sim if enabled) and the overall score, plus the threshold with the
+    best F1. Pairs a configuration skips (LSH, cascade) count as score 0,
+    so their recall loss shows up here.
+
+Results go to a table and, with --json, to a versioned JSON document. With
+--baseline, a run fails when pairs/second drops by more than --tolerance or
+overall F1 drops by more than --f1-tolerance for any (size, config) in the
+baseline.
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+from benchmarks.obfuscation import SOURCE_MUTATIONS, generate_cohort
+from src.plagiarism import detect_plagiarism, has_structure
+
+_FORMAT_VERSION = 1
+
+CONFIGS = {
+    "vectorized": {"engine": "vectorized"},
+    "pairwise": {"engine": "pairwise"},
+    "difflib": {"engine": "pairwise", "text_method": "difflib"},
+    "cascade": {"engine": "pairwise", "output": "threshold", "cascade": True},
+    "lsh": {"engine": "pairwise", "lsh_threshold": 0.3},
+    "gst": {"engine": "pairwise", "use_gst": True},
+}
+
+LAYERS = ("text_sim", "token_sim", "structural_sim", "gst_sim", "overall")
+_HEADERS = {"text_sim": "text F1", "token_sim": "token F1", "structural_sim": "struct F1",
+            "gst_sim": "gst F1", "overall": "overall F1"}
+
+
+def _scores(result: dict, layer: str, pairs: list[tuple[str, str]]) -> dict:
+    """{(name_a, name_b): score} for `layer`, 0 for pairs the result left out."""
+    scored = {(p["sub_a"], p["sub_b"]): p[layer] for p in result["pairs"]}
+    return {pair: scored.get(pair) or 0.0 for pair in pairs}
+
+
+def _prf(true_positives: int, flagged: int, positives: int) -> tuple[float, float, float]:
+    precision = true_positives / flagged if flagged else 0.0
+    recall = true_positives / positives if positives else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+def layer_accuracy(scores: dict, copied: set, threshold: float) -> dict:
+    """Precision/recall/F1 of flagging score >= threshold, and the best-F1 threshold."""
+    positives = sum(pair in copied for pair in scores)
+    flagged = [pair for pair, score in scores.items() if score >= threshold]
+    precision, recall, f1 = _prf(sum(pair in copied for pair in flagged), len(flagged), positives)
+
+    # Sweep every distinct score as a cutoff, highest first
+    best_f1, best_threshold = 0.0, None
+    ranked = sorted(scores.items(), key=lambda item: -item[1])
+    true_positives = 0
+    for k, (pair, score) in enumerate(ranked):
+        true_positives += pair in copied
+        if k + 1 < len(ranked) and ranked[k + 1][1] == score:
+            continue
+        f1_here = _prf(true_positives, k + 1, positives)[2]
+        if f1_here > best_f1:
+            best_f1, best_threshold = f1_here, score
+    return {
+        "pairs": len(scores),
+        "positives": positives,
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(f1, 4),
+        "best_f1": round(best_f1, 4),
+        "best_threshold": best_threshold,
+    }
+
+
+def run_config(submissions: list[dict], copied: set, config: str, threshold: float,
+               memory: bool, repeat: int) -> dict:
+    kwargs = CONFIGS[config]
+    seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = detect_plagiarism(submissions, threshold=threshold, **kwargs)
+        seconds = min(seconds, time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        tracemalloc.start()
+        detect_plagiarism(submissions, threshold=threshold, **kwargs)
+        peak_mb = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        tracemalloc.stop()
+
+    names = result["names"]
+    all_pairs = [(a, b) for i, a in enumerate(names) for b in names[i + 1:]]
+    language = {s["name"]: s["language"] for s in submissions}
+    # The structural layer only scores same-language pairs it can parse
+    structured_pairs = [(a, b) for a, b in all_pairs
+                        if language[a] == language[b] and has_structure(language[a])]
+    return {
+        "n": len(submissions),
+        "config": config,
+        "pairs": len(all_pairs),
+        "copied_pairs": len(copied),
+        "seconds": round(seconds, 3),
+        "pairs_per_s": round(len(all_pairs) / seconds, 1),
+        "peak_mb": peak_mb,
+        "accuracy": {
+            layer: layer_accuracy(
+                _scores(result, layer, structured_pairs if layer == "structural_sim" else all_pairs), copied, threshold)
+            for layer in LAYERS
+            if layer != "gst_sim" or kwargs.get("use_gst")
+        },
+    }
+
+
+def check_regressions(results: list[dict], baseline: dict, tolerance: float, f1_tolerance: float) -> list[str]:
+    """Messages for every (n, config) in both runs that got slower or less accurate."""
+    before = {(r["n"], r["config"]): r for r in baseline["results"]}
+    problems = []
+    for r in results:
+        old = before.get((r["n"], r["config"]))
+        if old is None:
+            continue
+        label = f"n={r['n']} {r['config']}"
+        if r["pairs_per_s"] < old["pairs_per_s"] * (1 - tolerance):
+            problems.append(f"{label}: {r['pairs_per_s']:.0f} pairs/s, baseline {old['pairs_per_s']:.0f}")
+        f1, old_f1 = r["accuracy"]["overall"]["f1"], old["accuracy"]["overall"]["f1"]
+        if f1 < old_f1 - f1_tolerance:
+            problems.append(f"{label}: overall F1 {f1:.3f}, baseline {old_f1:.3f}")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--configs", nargs="+", choices=list(CONFIGS), default=["vectorized", "pairwise", "cascade"])
+    parser.add_argument("--mutations", nargs="+", choices=list(SOURCE_MUTATIONS),
+                        help="mutations applied to every copy (default: a random subset per copy)")
+    parser.add_argument("--copy-rate", type=float, default=0.3)
+    parser.add_argument("--threshold", type=float, default=60.0)
+    parser.add_argument("--repeat", type=int, default=2, help="timed runs per config, best is kept")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON ('-' for stdout only)")
+    parser.add_argument("--baseline", metavar="PATH", help="JSON from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative pairs/s drop")
+    parser.add_argument("--f1-tolerance", type=float, default=0.02, help="allowed absolute overall F1 drop")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = []
+    for n in args.sizes:
+        submissions, copied = generate_cohort(n, seed=args.seed, copy_rate=args.copy_rate, mutations=args.mutations)
+        for config in args.configs:
+            results.append(run_config(submissions, copied, config, args.threshold,
+                                      not args.no_memory, args.repeat))
+
+    document = {
+        "version": _FORMAT_VERSION,
+        "config": {
+            "sizes": args.sizes,
+            "configs": args.configs,
+            "mutations": args.mutations,
+            "copy_rate": args.copy_rate,
+            "threshold": args.threshold,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    if args.json == "-":
+        json.dump(document, sys.stdout, indent=2)
+        print()
+    else:
+        print("=" * 96)
+        print(f"Plagiarism benchmark suite (threshold {args.threshold:g}, "
+              f"mutations: {' '.join(args.mutations) if args.mutations else 'random'})")
+        print("=" * 96)
+        print(f"{'n':>5} {'config':>10} {'pairs':>7} {'pairs/s':>9} {'peak':>9}  "
+              + " ".join(f"{_HEADERS[layer]:>10}" for layer in LAYERS) + f" {'best F1':>11}")
+        for r in results:
+            peak = "-" if r["peak_mb"] is None else f"{r['peak_mb']:.1f}MB"
+            overall = r["accuracy"]["overall"]
+            best = f"{overall['best_f1']:.2f}@{overall['best_threshold']}"
+            print(f"{r['n']:>5} {r['config']:>10} {r['pairs']:>7} {r['pairs_per_s']:>9.0f} {peak:>9}  "
+                  + " ".join(f"{r['accuracy'][layer]['f1']:>10.3f}" if layer in r["accuracy"] else f"{'-':>10}"
+                             for layer in LAYERS) + f" {best:>11}")
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(document, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("version") != _FORMAT_VERSION:
+            print(f"Unsupported baseline format version: {baseline.get('version')!r}", file=sys.stderr)
+            return 2
+        problems = check_regressions(results, baseline, args.tolerance, args.f1_tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        if problems:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
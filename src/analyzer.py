@@ -1,23 +1,40 @@
 import ast
+import os
 import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
 
+from src.submission import Submission
 
-def _max_nesting_depth(node, current=0):
-    """Recursively compute the maximum nesting depth of loops/conditionals."""
-    max_depth = current
-    for child in ast.iter_child_nodes(node):
-        if isinstance(child, (ast.For, ast.While, ast.If, ast.With)):
-            max_depth = max(max_depth, _max_nesting_depth(child, current + 1))
-        else:
-            max_depth = max(max_depth, _max_nesting_depth(child, current))
-    return max_depth
+
+_NESTING_NODES = (ast.For, ast.While, ast.If, ast.With)
+_LOOP_NODES = (ast.For, ast.While)
+
+_MAIN_GUARD_RE = re.compile(r'if\s+__name__\s*==\s*["\']__main__["\']')
+
+# Nodes visited between CPU-time checks when a time budget is set
+BUDGET_CHECK_INTERVAL = 256
+
+
+def make_deadline(time_budget: float | None) -> float | None:
+    """Turn a per-call CPU time budget (seconds) into a thread CPU-time deadline."""
+    if time_budget is None:
+        return None
+    return time.thread_time() + time_budget
+
+
+def deadline_passed(deadline: float | None) -> bool:
+    return deadline is not None and time.thread_time() > deadline
 
 
 def _function_line_count(node):
     """Return the number of lines a function spans."""
     if hasattr(node, "end_lineno") and node.end_lineno and node.lineno:
         return node.end_lineno - node.lineno + 1
-    return len(ast.dump(node).split("\n"))
+    return 1
 
 
 def assess_naming(variable_names: list[str]) -> str:
@@ -34,7 +51,19 @@ def assess_naming(variable_names: list[str]) -> str:
     return "poor"
 
 
-def analyze_python_code(code: str) -> dict:
+def analyze_python_code(
+    code: str,
+    submission: Submission | None = None,
+    time_budget: float | None = None,
+) -> dict:
+    """Analyze Python code with the stdlib ast module.
+
+    The tree is walked iteratively, so arbitrarily deep nesting cannot hit
+    RecursionError. With `time_budget` (CPU seconds) the walk stops once the
+    budget is spent and the result carries "partial": True; ast.parse itself
+    is linear-time C code and always runs to completion.
+    """
+    deadline = make_deadline(time_budget)
     lines = code.split("\n")
     total_lines = len(lines)
     blank_lines = sum(1 for line in lines if not line.strip())
@@ -62,20 +91,42 @@ def analyze_python_code(code: str) -> dict:
         "naming_quality": "N/A",
         "is_valid_syntax": True,
         "syntax_error": None,
+        "complexity": None,
+        "partial": False,
     }
 
-    result["has_main_guard"] = bool(re.search(r'if\s+__name__\s*==\s*["\']__main__["\']', code))
+    result["has_main_guard"] = bool(_MAIN_GUARD_RE.search(code))
 
-    try:
-        tree = ast.parse(code)
-    except SyntaxError as e:
+    if submission is None:
+        submission = Submission(code, "Python")
+    tree = submission.python_ast
+    if tree is None:
         result["is_valid_syntax"] = False
-        result["syntax_error"] = str(e)
+        result["syntax_error"] = submission.python_syntax_error
         return result
 
-    result["max_nesting_depth"] = _max_nesting_depth(tree)
+    # Breadth-first like ast.walk(), carrying the nesting depth and a flag for
+    # the nearest enclosing loop (set once that loop is seen to contain another)
+    queue = deque([(tree, 0, None)])
+    visited = 0
+    while queue:
+        visited += 1
+        if visited % BUDGET_CHECK_INTERVAL == 0 and deadline_passed(deadline):
+            result["partial"] = True
+            break
+
+        node, depth, loop_flag = queue.popleft()
+        if isinstance(node, _NESTING_NODES):
+            depth += 1
+            if depth > result["max_nesting_depth"]:
+                result["max_nesting_depth"] = depth
+        if isinstance(node, _LOOP_NODES):
+            if loop_flag is not None and not loop_flag[0]:
+                loop_flag[0] = True
+                result["nested_loops"] += 1
+            loop_flag = [False]
+        queue.extend((child, depth, loop_flag) for child in ast.iter_child_nodes(node))
 
-    for node in ast.walk(tree):
         if isinstance(node, ast.FunctionDef):
             result["functions"].append(node.name)
             # Check for docstrings
@@ -110,12 +161,6 @@ def analyze_python_code(code: str) -> dict:
                 if isinstance(target, ast.Name):
                     result["variable_names"].append(target.id)
 
-        elif isinstance(node, (ast.For, ast.While)):
-            for child in ast.walk(node):
-                if child is not node and isinstance(child, (ast.For, ast.While)):
-                    result["nested_loops"] += 1
-                    break
-
         # Check for assert statements (test patterns)
         elif isinstance(node, ast.Assert):
             result["has_tests"] = True
@@ -124,6 +169,12 @@ def analyze_python_code(code: str) -> dict:
     result["single_char_vars"] = [v for v in result["variable_names"] if len(v) == 1]
     result["naming_quality"] = assess_naming(result["variable_names"])
 
+    # Static big-O estimate; skipped once the budget is spent, like the walk above
+    if not result["partial"]:
+        from src.complexity import estimate_python  # imports this module
+        result["complexity"] = estimate_python(tree, deadline)
+        result["partial"] = result["complexity"] is None
+
     return result
 
 
@@ -154,29 +205,113 @@ def format_analysis_for_prompt(analysis: dict) -> str:
     if analysis["variable_names"]:
         parts.append(f"Variable names: {', '.join(analysis['variable_names'][:15])}")
 
+    complexity = analysis.get("complexity")
+    if complexity:
+        parts.append(f"Estimated time complexity (static): {complexity['time']} ({complexity['time_reason']})")
+        parts.append(f"Estimated space complexity (static): {complexity['space']} ({complexity['space_reason']})")
+
+    if analysis.get("partial"):
+        parts.append("Note: analysis hit its time budget; metrics cover only part of the code")
+
     return "\n".join(parts)
 
 
-def analyze_code(code: str, language: str) -> dict | None:
+def analyze_code(
+    code: str,
+    language: str,
+    submission: Submission | None = None,
+    time_budget: float | None = None,
+) -> dict | None:
     """Analyze code using the appropriate analyzer for the language.
     
     Args:
         code: Source code string
         language: Programming language name (e.g., "Python", "JavaScript")
+        submission: Optional Submission for `code` whose cached parse is reused
+        time_budget: Optional CPU-seconds budget; if exceeded, the result is
+            partial and has "partial": True
     
     Returns:
         Analysis dict with metrics, or None if language not supported
     """
     if language.lower() == "python":
-        return analyze_python_code(code)
+        return analyze_python_code(code, submission, time_budget)
     
     # Try tree-sitter for other languages
     try:
         from src.ts_analyzer import analyze_code_treesitter, LANGUAGE_TO_PARSER
         if language in LANGUAGE_TO_PARSER:
-            return analyze_code_treesitter(code, language)
+            return analyze_code_treesitter(code, language, submission, time_budget)
     except ImportError:
         # Graceful degradation if tree-sitter not installed
         pass
     
     return None
+
+
+# Below this many submissions the process start-up cost outweighs the speedup
+_MIN_PARALLEL_BATCH = 32
+
+
+def _init_analysis_worker(languages) -> None:
+    """Process-pool initializer: load grammars once per worker, not per task."""
+    if not languages:
+        return
+    try:
+        from src.ts_analyzer import preload_parsers
+        preload_parsers(languages)
+    except ImportError:
+        pass
+
+
+def _analyze_submission(submission: dict, time_budget: float | None = None) -> dict | None:
+    """Pool task wrapper around analyze_code() for a submission dict."""
+    try:
+        return analyze_code(
+            submission.get("code", ""), submission.get("language", "Python"),
+            time_budget=time_budget,
+        )
+    except Exception:
+        # One bad submission must not take down the whole batch
+        return None
+
+
+def analyze_code_batch(
+    submissions: list[dict],
+    max_workers: int | None = None,
+    chunksize: int | None = None,
+    time_budget: float | None = None,
+) -> list[dict | None]:
+    """Run static analysis on many submissions across a process pool.
+
+    Args:
+        submissions: List of dicts with keys: 'code', 'language'
+        max_workers: Worker processes (defaults to the CPU count)
+        chunksize: Submissions sent to a worker per task (defaults to ~4 chunks per worker)
+        time_budget: Optional CPU-seconds budget per submission (see analyze_code)
+
+    Returns:
+        List of analysis dicts (None for unsupported languages or failed analyses),
+        in input order. If the pool breaks, the batch is analyzed in this process.
+    """
+    total = len(submissions)
+    workers = min(max_workers or os.cpu_count() or 1, total)
+
+    task = partial(_analyze_submission, time_budget=time_budget)
+    if workers <= 1 or total < _MIN_PARALLEL_BATCH:
+        return [task(s) for s in submissions]
+
+    if chunksize is None:
+        chunksize = max(1, total // (workers * 4))
+
+    languages = sorted({s.get("language", "Python") for s in submissions} - {"Python"})
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_analysis_worker,
+            initargs=(languages,),
+        ) as pool:
+            return list(pool.map(task, submissions, chunksize=chunksize))
+    except (BrokenProcessPool, OSError):
+        # A worker was killed (e.g. out of memory) or processes cannot be started here
+        return [task(s) for s in submissions]
@@ -0,0 +1,262 @@
+"""Structural clone detection from hashes of syntax subtrees.
+
+structural_similarity() compares whole-file node-type histograms, which
+scores how alike two files are but not where. Here every subtree of the
+parse tree (a Python AST, or a tree-sitter tree for other languages) gets a
+bottom-up hash of its node kind and its children's hashes. Identifier names
+and literal values are left out, so renamed or re-valued copies still hash
+alike. Hashing visits each node once, and a parent hashes
+only its children's 8-byte digests, so a file is hashed in linear time.
+
+Two files share a clone wherever their subtrees of at least `min_size`
+nodes have equal hashes. Only maximal clones are reported, i.e. pairs whose
+parents do not also match (Baxter et al., 1998). Clones in consecutive
+sibling statements merge into one region, given as line spans in both
+files.
+
+    regions = shared_subtrees(Submission(code_a, "Python"), Submission(code_b, "Python"))
+    # [{'a_lines': (3, 17), 'b_lines': (5, 19), 'size': 84}, ...]
+"""
+
+import ast
+import hashlib
+from itertools import combinations
+
+# Smallest subtree reported as a clone. A one-line statement such as
+# `total = total + arr[i]` is about 8 nodes, which any two programs share.
+MIN_CLONE_SIZE = 20
+# Blank or comment lines allowed between statements merged into one region
+MAX_GAP_LINES = 2
+
+
+class Subtrees:
+    """Every subtree of one parse tree, in pre-order (parents before children).
+
+    Parallel lists indexed by node: kind (node type name), hash (64-bit int),
+    size (node count), parent (index, -1 for the root) and the first and last
+    source lines (1-based, inclusive).
+    """
+
+    __slots__ = ("kinds", "hashes", "sizes", "parents", "starts", "ends")
+
+    def __init__(self):
+        self.kinds: list[str] = []
+        self.hashes: list[int] = []
+        self.sizes: list[int] = []
+        self.parents: list[int] = []
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+
+# Load/Store/Del only restate the syntax around a name
+_SKIP_NODES = (ast.expr_context,)
+
+
+def python_subtrees(tree: ast.AST) -> Subtrees:
+    """Hash every subtree of a Python AST. Iterative, so deep trees are fine."""
+    subtrees = Subtrees()
+    nodes = []
+    stack = [(tree, -1)]
+    while stack:
+        node, parent = stack.pop()
+        subtrees.parents.append(parent)
+        index = len(nodes)
+        nodes.append(node)
+        children = [child for child in ast.iter_child_nodes(node) if not isinstance(child, _SKIP_NODES)]
+        stack.extend((child, index) for child in reversed(children))
+
+    n = len(nodes)
+    subtrees.kinds = [type(node).__name__ for node in nodes]
+    sizes = [1] * n
+    starts = [getattr(node, "lineno", 0) for node in nodes]
+    ends = [getattr(node, "end_lineno", None) or start for node, start in zip(nodes, starts)]
+    child_digests: list[list[bytes]] = [[] for _ in range(n)]
+    digests: list[bytes] = [b""] * n
+    parents = subtrees.parents
+    # Reverse pre-order reaches every node after all of its descendants
+    for index in range(n - 1, -1, -1):
+        children = child_digests[index]
+        children.reverse()
+        digest = hashlib.blake2b(subtrees.kinds[index].encode(), digest_size=8)
+        for child in children:
+            digest.update(child)
+        digests[index] = digest.digest()
+        child_digests[index] = None
+        parent = parents[index]
+        if parent >= 0:
+            child_digests[parent].append(digests[index])
+            sizes[parent] += sizes[index]
+            # Spans cover the children: nodes without positions (the module,
+            # arguments) get one, and definitions include their decorators
+            if starts[index]:
+                starts[parent] = min(starts[parent] or starts[index], starts[index])
+                ends[parent] = max(ends[parent], ends[index])
+
+    subtrees.hashes = [int.from_bytes(digest, "little") for digest in digests]
+    subtrees.sizes = sizes
+    subtrees.starts = starts
+    subtrees.ends = ends
+    return subtrees
+
+
+def ts_subtrees(tree, skip_kinds=frozenset()) -> Subtrees:
+    """Hash every named subtree of a tree-sitter tree, leaving out `skip_kinds` (comments).
+
+    Anonymous children (operators, keywords, punctuation) are not subtrees of
+    their own but are hashed into their parent, in order, so `a + b` and
+    `a - b` differ while names and literal text never count.
+    """
+    subtrees = Subtrees()
+    kinds, parents, starts, ends = subtrees.kinds, subtrees.parents, subtrees.starts, subtrees.ends
+    parts: list[list] = []  # per node: anonymous child kinds, None for each named child
+    # Pre-order walk with a cursor, which avoids building child lists
+    cursor = tree.walk()
+    enclosing = [-1]  # innermost recorded node of each level entered
+    walking = True
+    while walking:
+        node = cursor.node
+        parent = enclosing[-1]
+        index = -1
+        if not node.is_named:
+            if parent >= 0:
+                parts[parent].append(node.type.encode())
+        elif node.type not in skip_kinds:
+            index = len(kinds)
+            kinds.append(node.type)
+            parents.append(parent)
+            starts.append(node.start_point[0] + 1)
+            ends.append(node.end_point[0] + 1)
+            parts.append([])
+            if parent >= 0:
+                parts[parent].append(None)
+        if index >= 0 and cursor.goto_first_child():
+            enclosing.append(index)
+            continue
+        # Next sibling, else the next sibling of the nearest ancestor that has one
+        while walking and not cursor.goto_next_sibling():
+            walking = cursor.goto_parent()
+            enclosing.pop()
+
+    n = len(kinds)
+    sizes = [1] * n
+    child_digests: list[list[bytes]] = [[] for _ in range(n)]
+    digests: list[bytes] = [b""] * n
+    for index in range(n - 1, -1, -1):
+        children = child_digests[index]
+        children.reverse()
+        digest = hashlib.blake2b(kinds[index].encode(), digest_size=8)
+        named = iter(children)
+        for part in parts[index]:
+            # A 0 byte keeps token text apart from the fixed-size child digests
+            digest.update(next(named) if part is None else b"\0" + part)
+        digests[index] = digest.digest()
+        child_digests[index] = parts[index] = None
+        parent = parents[index]
+        if parent >= 0:
+            child_digests[parent].append(digests[index])
+            sizes[parent] += sizes[index]
+
+    subtrees.hashes = [int.from_bytes(digest, "little") for digest in digests]
+    subtrees.sizes = sizes
+    return subtrees
+
+
+def _clone_pairs(a: Subtrees, b: Subtrees, candidates) -> list[tuple[int, int]]:
+    """Keep the (node in a, node in b) pairs whose parents are not clones as well."""
+    pairs = []
+    for x, y in candidates:
+        px, py = a.parents[x], b.parents[y]
+        if px >= 0 and py >= 0 and a.hashes[px] == b.hashes[py]:
+            continue
+        pairs.append((x, y))
+    return pairs
+
+
+def _regions(a: Subtrees, b: Subtrees, pairs: list[tuple[int, int]], gap: int) -> list[dict]:
+    """Merge clone pairs that continue each other in both files, largest region first."""
+    pairs.sort(key=lambda pair: (a.starts[pair[0]], b.starts[pair[1]]))
+    regions = []
+    by_end: dict[tuple[int, int], dict] = {}
+    for x, y in pairs:
+        a_start, b_start = a.starts[x], b.starts[y]
+        region = None
+        for da in range(1, gap + 2):
+            for db in range(1, gap + 2):
+                region = by_end.pop((a_start - da, b_start - db), None)
+                if region is not None:
+                    break
+            if region is not None:
+                break
+        if region is None:
+            region = {"a_lines": (a_start, a.ends[x]), "b_lines": (b_start, b.ends[y]), "size": 0}
+            regions.append(region)
+        region["a_lines"] = (region["a_lines"][0], max(region["a_lines"][1], a.ends[x]))
+        region["b_lines"] = (region["b_lines"][0], max(region["b_lines"][1], b.ends[y]))
+        region["size"] += a.sizes[x]
+        by_end[region["a_lines"][1], region["b_lines"][1]] = region
+    regions.sort(key=lambda region: (-region["size"], region["a_lines"]))
+    return regions
+
+
+def _index(subtrees: Subtrees, min_size: int) -> dict[int, list[int]]:
+    index: dict[int, list[int]] = {}
+    for node, (h, size) in enumerate(zip(subtrees.hashes, subtrees.sizes)):
+        if size >= min_size:
+            index.setdefault(h, []).append(node)
+    return index
+
+
+def shared_subtrees(a, b, min_size: int = MIN_CLONE_SIZE, gap: int = MAX_GAP_LINES) -> list[dict]:
+    """Copied regions of two submissions: maximal shared subtrees of >= `min_size` nodes.
+
+    `a` and `b` are Submissions (or Subtrees). Returns dicts {'a_lines',
+    'b_lines', 'size'}: inclusive (first, last) line spans in each file and
+    the number of matched AST nodes, largest region first. Submissions
+    without a parse tree share nothing.
+    """
+    a = a if isinstance(a, Subtrees) else a.subtrees
+    b = b if isinstance(b, Subtrees) else b.subtrees
+    if a is None or b is None:
+        return []
+    index_b = _index(b, min_size)
+    candidates = (
+        (x, y)
+        for x, (h, size) in enumerate(zip(a.hashes, a.sizes)) if size >= min_size
+        for y in index_b.get(h, ())
+    )
+    return _regions(a, b, _clone_pairs(a, b, candidates), gap)
+
+
+def find_clones(submissions: list, min_size: int = MIN_CLONE_SIZE,
+                gap: int = MAX_GAP_LINES) -> dict[tuple[int, int], list[dict]]:
+    """shared_subtrees() for every pair of `submissions`, through one hash index.
+
+    Only subtrees whose hash occurs in more than one file are ever paired,
+    so the cost follows the number of clones rather than the number of
+    pairs. Returns {(i, j): regions} for pairs i < j that share any region.
+    """
+    trees = [sub.subtrees for sub in submissions]
+    index: dict[int, list[tuple[int, int]]] = {}
+    for i, subtrees in enumerate(trees):
+        if subtrees is None:
+            continue
+        for h, nodes in _index(subtrees, min_size).items():
+            index.setdefault(h, []).extend((i, node) for node in nodes)
+
+    candidates: dict[tuple[int, int], list[tuple[int, int]]] = {}
+    for entries in index.values():
+        if entries[0][0] == entries[-1][0]:
+            continue  # all in one file
+        for (i, x), (j, y) in combinations(entries, 2):
+            if i != j:
+                candidates.setdefault((i, j), []).append((x, y))
+
+    clones = {}
+    for (i, j), pairs in candidates.items():
+        pairs = _clone_pairs(trees[i], trees[j], pairs)
+        if pairs:
+            clones[i, j] = _regions(trees[i], trees[j], pairs, gap)
+    return clones
@@ -0,0 +1,187 @@
+"""Group suspicious submissions into clusters from pairwise similarity scores.
+
+Flagged pairs are edges of a similarity graph. Collusion rings show up as
+its connected components at the flagging threshold, found with a
+union-find (disjoint-set) structure. single_linkage() gives the whole
+hierarchy instead. It applies Kruskal's algorithm, processing edges from the
+most to the least similar, and records each merge, so components at any
+threshold come from cut_linkage() without recomputing.
+
+Edges are given as parallel (rows, cols, weights) arrays, as from a sparse
+matrix. Everything after one vectorized filter/sort is a single pass over
+the edges with near-constant-time union-find operations, which keeps
+millions of edges fast.
+
+    clusters = cluster_result(detect_plagiarism(submissions), threshold=60)
+"""
+
+import numpy as np
+
+
+class DisjointSet:
+    """Union-find over items 0..n-1, with union by size and path halving."""
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> int | None:
+        """Merge the sets of a and b. Returns the new root, or None if already joined."""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return None
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return a
+
+
+def _strong_edges(rows, cols, weights, threshold: float) -> tuple[list, list, list]:
+    """Edges i != j with weight >= threshold, strongest first (ties in input order)."""
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    keep = np.flatnonzero((weights >= threshold) & (rows != cols))
+    order = keep[np.argsort(-weights[keep], kind="stable")]
+    return rows[order].tolist(), cols[order].tolist(), weights[order].tolist()
+
+
+def connected_components(n: int, rows, cols, weights, threshold: float) -> list[list[int]]:
+    """Groups of at least two items joined by edges with weight >= threshold.
+
+    Each group is sorted; groups are ordered largest first, then by their
+    smallest item.
+    """
+    rows, cols, _ = _strong_edges(rows, cols, weights, threshold)
+    sets = DisjointSet(n)
+    for i, j in zip(rows, cols):
+        sets.union(i, j)
+    groups: dict[int, list[int]] = {}
+    for item in range(n):
+        if sets.size[sets.find(item)] > 1:
+            groups.setdefault(sets.find(item), []).append(item)
+    return sorted(groups.values(), key=lambda group: (-len(group), group[0]))
+
+
+def single_linkage(n: int, rows, cols, weights, min_weight: float = float("-inf")) -> list[tuple]:
+    """Single-linkage merge history of the similarity graph (Kruskal's algorithm).
+
+    Returns merges (cluster_a, cluster_b, weight, size), in order of
+    decreasing weight, in scipy's linkage numbering: items are clusters
+    0..n-1, and merge k creates cluster n + k. Only edges with weight >=
+    `min_weight` are used, so a disconnected graph yields fewer than n - 1
+    merges.
+    """
+    rows, cols, weights = _strong_edges(rows, cols, weights, min_weight)
+    sets = DisjointSet(n)
+    cluster_of = list(range(n))  # union-find root -> linkage cluster id
+    merges = []
+    for i, j, weight in zip(rows, cols, weights):
+        a, b = cluster_of[sets.find(i)], cluster_of[sets.find(j)]
+        root = sets.union(i, j)
+        if root is None:
+            continue
+        merges.append((min(a, b), max(a, b), weight, sets.size[root]))
+        cluster_of[root] = n + len(merges) - 1
+        if len(merges) == n - 1:
+            break
+    return merges
+
+
+def cut_linkage(merges: list[tuple], n: int, threshold: float) -> list[int]:
+    """Cluster label of each item when the hierarchy is cut at `threshold`.
+
+    Equivalent to connected_components() on the original edges. Labels are
+    numbered 0.. in order of each cluster's smallest item.
+    """
+    sets = DisjointSet(2 * n)
+    for k, (a, b, weight, _) in enumerate(merges):
+        if weight < threshold:
+            break
+        sets.union(n + k, a)
+        sets.union(n + k, b)
+    labels: dict[int, int] = {}
+    return [labels.setdefault(sets.find(item), len(labels)) for item in range(n)]
+
+
+def rank_clusters(n: int, rows, cols, weights, threshold: float, top_links: int = 3) -> list[dict]:
+    """Connected components at `threshold`, with statistics, strongest first.
+
+    Returns dicts {'members', 'size', 'edges', 'max_link', 'mean_link',
+    'links'}. Members are item indices, and the link statistics cover the
+    cluster's internal edges >= threshold. 'links' holds its `top_links`
+    strongest edges as (i, j, weight). Clusters are ranked by size, then by
+    strongest link.
+    """
+    rows, cols, weights = _strong_edges(rows, cols, weights, threshold)
+    sets = DisjointSet(n)
+    for i, j in zip(rows, cols):
+        sets.union(i, j)
+
+    stats: dict[int, dict] = {}
+    for i, j, weight in zip(rows, cols, weights):
+        root = sets.find(i)
+        cluster = stats.get(root)
+        if cluster is None:
+            cluster = stats[root] = {"edges": 0, "total": 0.0, "max_link": weight, "links": []}
+        cluster["edges"] += 1
+        cluster["total"] += weight
+        # Edges arrive strongest first, so the first top_links are the strongest
+        if len(cluster["links"]) < top_links:
+            cluster["links"].append((i, j, weight))
+
+    members: dict[int, list[int]] = {}
+    for item in range(n):
+        root = sets.find(item)
+        if root in stats:
+            members.setdefault(root, []).append(item)
+
+    clusters = [
+        {
+            "members": members[root],
+            "size": len(members[root]),
+            "edges": cluster["edges"],
+            "max_link": cluster["max_link"],
+            "mean_link": round(cluster["total"] / cluster["edges"], 1),
+            "links": cluster["links"],
+        }
+        for root, cluster in stats.items()
+    ]
+    clusters.sort(key=lambda c: (-c["size"], -c["max_link"], c["members"][0]))
+    return clusters
+
+
+def cluster_result(result: dict, threshold: float | None = None, top_links: int = 3) -> list[dict]:
+    """Ranked clusters of a detect_plagiarism() result (see rank_clusters).
+
+    Uses the result's own threshold by default. Members are file names, and
+    'links' holds the result's pair dicts. Pairs left out of the result
+    (output="threshold"/"top_k", cascade, LSH) cannot join clusters.
+    """
+    threshold = result["threshold"] if threshold is None else threshold
+    index = {name: i for i, name in enumerate(result["names"])}
+    pairs = result["pairs"]
+    by_edge = {}
+    rows, cols, weights = [], [], []
+    for pair in pairs:
+        if pair["overall"] >= threshold:
+            i, j = index[pair["sub_a"]], index[pair["sub_b"]]
+            by_edge[i, j] = pair
+            rows.append(i)
+            cols.append(j)
+            weights.append(pair["overall"])
+
+    names = result["names"]
+    clusters = rank_clusters(len(names), rows, cols, weights, threshold, top_links)
+    for cluster in clusters:
+        cluster["members"] = [names[i] for i in cluster["members"]]
+        cluster["links"] = [by_edge[i, j] for i, j, _ in cluster["links"]]
+    return clusters
@@ -0,0 +1,907 @@
+"""Static big-O estimates of time and space, from the syntax tree.
+
+The estimator reads the same trees as the analyzers (a Python AST, or a
+tree-sitter tree for other languages) and bounds every function in one
+input size n:
+
+  * loops run n times, log n times when a variable in them is halved or
+    doubled (binary search, `i *= 2`), or a constant number of times over a
+    literal range; nested loops multiply
+  * sort calls cost n log n, binary searches and heap operations log n,
+    linear built-ins (sum, copies, slices, `x in some_list`) n, callbacks of
+    map()/forEach()-style calls run once per element, and calls to functions
+    of the same file cost whatever those functions cost
+  * a recursive function is solved from its number of self-calls, whether
+    they halve the input (divide and conquer, by the master theorem) or
+    shrink it by a constant (n levels), and whether it is memoized; two or
+    more unmemoized self-calls that only shrink by a constant are exponential
+  * space is the largest container that grows inside loops (append, add,
+    dict stores), allocation sized by the input (copies, comprehensions,
+    `[0] * n`) and the recursion stack
+
+A file costs as much as its most expensive function, leaving out drivers
+(module code, main() and tests) when there is anything else. These are heuristics
+over the syntax, not proofs: input sizes are never told apart and library
+calls are known only by name. The estimate goes into the evaluation prompt,
+where the model confirms or corrects it.
+
+    estimate = estimate_python(ast.parse(code))
+    # {'time': 'O(n^2)', 'time_reason': 'loop (line 3) × loop (line 4) in two_sum', ...}
+    estimate = estimate_ts(tree.root_node, code_bytes, "Java", config)
+"""
+
+import ast
+import math
+import re
+from typing import NamedTuple
+
+from src.analyzer import BUDGET_CHECK_INTERVAL, deadline_passed
+
+
+class Bound(NamedTuple):
+    """O(n^degree · log^logs n), with the constructs that produce it, outermost first."""
+
+    degree: float = 0
+    logs: int = 0
+    why: tuple[str, ...] = ()
+
+    @property
+    def order(self) -> tuple[float, int]:
+        return self.degree, self.logs
+
+
+CONSTANT = Bound()
+_MAX_WHY = 4
+_DRIVER_RE = re.compile(r"module code$|main$|_*test|run_?tests?$|demo|bench", re.IGNORECASE)
+EXPONENTIAL = math.inf
+
+
+def _factor(degree: float, logs: int, what: str, line: int) -> Bound:
+    return Bound(degree, logs, (f"{what} (line {line})",))
+
+
+def _times(outer: Bound, inner: Bound) -> Bound:
+    if inner.order == (0, 0):
+        return outer
+    if outer.order == (0, 0):
+        return inner
+    # Only the first few factors are ever reported; long call chains would copy them all
+    return Bound(outer.degree + inner.degree, outer.logs + inner.logs, (outer.why + inner.why)[:_MAX_WHY])
+
+
+def _largest(*bounds) -> Bound | None:
+    """Largest of `bounds` (first on ties), ignoring None; None if all are None."""
+    present = [bound for bound in bounds if bound is not None]
+    return max(present, key=lambda bound: bound.order) if present else None
+
+
+def big_o(bound: Bound) -> str:
+    """Big-O notation for `bound`, e.g. "O(n log n)"."""
+    if bound.degree == EXPONENTIAL:
+        return "O(2^n)"
+    parts = []
+    if bound.degree:
+        exponent = f"{bound.degree:.3g}" if bound.degree % 1 else f"{bound.degree:.0f}"
+        parts.append("n" if bound.degree == 1 else f"n^{exponent}")
+    if bound.logs:
+        parts.append("log n" if bound.logs == 1 else f"log^{bound.logs} n")
+    return f"O({' '.join(parts) or '1'})"
+
+
+class _Cost(NamedTuple):
+    """What evaluating one syntax node costs.
+
+    time is a Bound; growth (containers kept growing) and alloc (memory
+    allocated at once) are Bounds or None when there is none; calls counts
+    the self-calls on one path through the node; halves is whether it
+    halves or doubles a variable.
+    """
+
+    time: Bound = CONSTANT
+    growth: Bound | None = None
+    alloc: Bound | None = None
+    calls: int = 0
+    halves: bool = False
+
+
+_ZERO = _Cost()
+
+
+def _merge(costs, calls: int | None = None) -> _Cost:
+    """Costs of nodes evaluated one after another (self-calls add up unless `calls` is given)."""
+    costs = [cost for cost in costs if cost is not _ZERO]
+    if not costs:
+        return _Cost(calls=calls) if calls else _ZERO
+    if len(costs) == 1 and (calls is None or calls == costs[0].calls):
+        return costs[0]
+    return _Cost(
+        _largest(*(cost.time for cost in costs)),
+        _largest(*(cost.growth for cost in costs)),
+        _largest(*(cost.alloc for cost in costs)),
+        sum(cost.calls for cost in costs) if calls is None else calls,
+        any(cost.halves for cost in costs),
+    )
+
+
+def _loop(trips: Bound, header: _Cost, body: _Cost) -> _Cost:
+    """A loop running `trips` times over `body`, with `header` evaluated once."""
+    return _Cost(
+        _largest(header.time, _times(trips, body.time)),
+        _largest(header.growth, None if body.growth is None else _times(trips, body.growth)),
+        _largest(header.alloc, body.alloc),
+        # Recursing from inside a loop branches once per iteration
+        header.calls + (max(body.calls, 2) if body.calls else 0),
+    )
+
+
+def _solve(work: Bound, calls: int, divides: bool, memoized: bool, states: int,
+           line: int) -> tuple[Bound, Bound]:
+    """(time, stack space) of a function making `calls` self-calls on top of `work`."""
+    if not calls:
+        return work, CONSTANT
+    if divides:
+        stack = _factor(0, 1, "recursion depth", line)
+        if calls == 1:
+            if work.degree:
+                return work, stack  # n + n/2 + n/4 + ... = O(work)
+            return Bound(0, work.logs + 1, (f"halving recursion (line {line})",) + work.why), stack
+        # Master theorem: T(n) = calls · T(n/2) + work
+        critical = math.log2(calls)
+        what = f"{calls}-way divide and conquer (line {line})"
+        if work.degree < critical:
+            return Bound(critical, 0, (what,)), stack
+        if work.degree == critical:
+            return Bound(critical, work.logs + 1, (what,) + work.why), stack
+        return work, stack
+    if calls >= 2 and not memoized:
+        return Bound(EXPONENTIAL, 0, (f"{calls}-way recursion without memoization (line {line})",)), \
+            _factor(1, 0, "recursion depth", line)
+    depth = states if memoized else 1
+    what = "memoized recursion" if memoized else "linear recursion"
+    return _times(_factor(depth, 0, what, line), work), _factor(depth, 0, "recursion depth", line)
+
+
+class _Function(NamedTuple):
+    time: Bound
+    space: Bound
+
+
+def _summary(units: list[tuple[str, _Function]]) -> dict:
+    """The estimate of a file: its most expensive unit for time and for space.
+
+    Module code, main() and test functions drive the solution (often looping
+    over test cases) and are only counted when there is nothing else.
+    """
+    def reason(name: str, bound: Bound, none: str) -> str:
+        return f"{' × '.join(bound.why[:_MAX_WHY])} in {name}" if bound.why else none
+
+    units = [unit for unit in units if not _DRIVER_RE.match(unit[0])] or units
+    time_name, time = max(((name, unit.time) for name, unit in units), key=lambda item: item[1].order)
+    space_name, space = max(((name, unit.space) for name, unit in units), key=lambda item: item[1].order)
+    return {
+        "time": big_o(time),
+        "space": big_o(space),
+        "time_reason": reason(time_name, time, "no loops over the input or recursion"),
+        "space_reason": reason(space_name, space, "no input-sized containers or recursion"),
+    }
+
+
+def _callee_order(callees: dict[str, set[str]]) -> list[str]:
+    """Unit names, callees before callers (cycles broken arbitrarily), iteratively."""
+    order, state = [], {}
+    for root in callees:
+        if root in state:
+            continue
+        state[root] = 1
+        stack = [(root, iter(callees[root]))]
+        while stack:
+            name, pending = stack[-1]
+            for callee in pending:
+                if callee in callees and callee not in state:
+                    state[callee] = 1
+                    stack.append((callee, iter(callees[callee])))
+                    break
+            else:
+                stack.pop()
+                order.append(name)
+    return order
+
+
+# ── Python ──
+
+_FUNCTION_DEFS = (ast.FunctionDef, ast.AsyncFunctionDef)
+_COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+_HALVING_OPS = (ast.FloorDiv, ast.Div, ast.RShift, ast.Mult, ast.LShift)
+_TERMINAL_STATEMENTS = (ast.Return, ast.Raise, ast.Continue, ast.Break)
+
+_SORT_CALLS = {"sorted", "sort", "nlargest", "nsmallest"}
+_LOG_CALLS = {"heappush", "heappop", "heappushpop", "heapreplace", "bisect", "bisect_left", "bisect_right"}
+_LINEAR_CALLS = {
+    "sum", "min", "max", "any", "all", "list", "tuple", "set", "frozenset", "dict", "Counter", "deque",
+    "heapify", "copy", "deepcopy", "count", "index", "join", "split", "replace", "find", "reverse",
+    "insort", "insort_left", "insort_right", "fromkeys",
+}
+# Linear calls whose result is a new container of the input's size
+_COPYING_CALLS = {"list", "tuple", "set", "frozenset", "dict", "Counter", "deque", "copy", "deepcopy",
+                  "split", "sorted", "fromkeys"}
+_GROWTH_CALLS = {"append", "appendleft", "add", "insert", "extend", "update", "setdefault", "heappush"}
+_MEMO_DECORATORS = {"lru_cache", "cache", "memoize", "cached"}
+_MEMO_NAME_RE = re.compile(r"memo|cache|dp|seen|visited", re.IGNORECASE)
+_HALF_NAMES = {"mid", "middle", "half", "m"}
+
+_LIST_FACTORIES = {"list", "sorted", "split"}
+_HASH_FACTORIES = {"dict", "set", "Counter", "defaultdict", "OrderedDict", "fromkeys"}
+
+
+def _call_name(call: ast.Call) -> str | None:
+    func = call.func
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    return None
+
+
+def _is_constant(node: ast.AST | None) -> bool:
+    if isinstance(node, ast.UnaryOp):
+        node = node.operand
+    return isinstance(node, ast.Constant)
+
+
+def _halving(node: ast.AST) -> bool:
+    """Whether an expression halves or doubles, e.g. `(lo + hi) // 2` or `n >> 1`."""
+    return (isinstance(node, ast.BinOp) and isinstance(node.op, _HALVING_OPS)
+            and isinstance(node.right, ast.Constant) and node.right.value in (1, 2))
+
+
+class _PythonUnit:
+    """Per-function facts gathered before costing: callees and local variable kinds."""
+
+    def __init__(self, name: str, node: ast.AST):
+        self.name = name
+        self.node = node
+        self.callees: set[str] = set()
+        self.lists: set[str] = set()
+        self.hashes: set[str] = set()
+        self.strings: set[str] = set()
+        self.halves: set[str] = set()
+        self.memoized = isinstance(node, _FUNCTION_DEFS) and any(
+            (_call_name(d) if isinstance(d, ast.Call) else getattr(d, "id", getattr(d, "attr", None)))
+            in _MEMO_DECORATORS for d in node.decorator_list)
+        self.self_calls: list[ast.Call] = []
+
+    def note(self, node: ast.AST) -> None:
+        if isinstance(node, ast.Call):
+            name = _call_name(node)
+            if name:
+                self.callees.add(name)
+        elif isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            target, value = node.targets[0].id, node.value
+            factory = _call_name(value) if isinstance(value, ast.Call) else None
+            if isinstance(value, (ast.List, ast.ListComp)) or factory in _LIST_FACTORIES:
+                self.lists.add(target)
+            elif isinstance(value, (ast.Dict, ast.Set, ast.DictComp, ast.SetComp)) or factory in _HASH_FACTORIES:
+                self.hashes.add(target)
+            elif isinstance(value, ast.Constant) and isinstance(value.value, str):
+                self.strings.add(target)
+            elif _halving(value):
+                self.halves.add(target)
+            if _MEMO_NAME_RE.search(target) and target in self.hashes | self.lists:
+                self.memoized = True
+        elif isinstance(node, ast.arg):
+            annotation = node.annotation
+            if isinstance(annotation, ast.Subscript):
+                annotation = annotation.value
+            if isinstance(annotation, ast.Name) and annotation.id in ("list", "List"):
+                self.lists.add(node.arg)
+            if _MEMO_NAME_RE.search(node.arg):
+                self.memoized = True
+
+    def is_self_call(self, call: ast.Call) -> bool:
+        func = call.func
+        if isinstance(func, ast.Name):
+            return func.id == self.name
+        return (isinstance(func, ast.Attribute) and func.attr == self.name
+                and isinstance(func.value, ast.Name) and func.value.id in ("self", "cls"))
+
+
+def _python_children(node: ast.AST, root: ast.AST) -> list[ast.AST]:
+    """Children evaluated as part of `node`; nested function definitions are units of their own."""
+    return [child for child in ast.iter_child_nodes(node)
+            if child is root or not isinstance(child, _FUNCTION_DEFS)]
+
+
+def _python_trips(iterable: ast.AST, line: int) -> Bound:
+    """How many times a for loop (or comprehension) over `iterable` runs."""
+    if isinstance(iterable, (ast.Tuple, ast.List, ast.Set, ast.Constant)):
+        return CONSTANT
+    if isinstance(iterable, ast.Call) and _call_name(iterable) == "range" and \
+            all(_is_constant(arg) for arg in iterable.args):
+        return CONSTANT
+    return _factor(1, 0, "loop", line)
+
+
+def _bounded_slice(node: ast.Slice) -> bool:
+    """Whether a slice has a constant length, e.g. a[:3] or a[-2:]."""
+    if _is_constant(node.upper):
+        return node.lower is None or _is_constant(node.lower)
+    return node.upper is None and isinstance(node.lower, ast.UnaryOp) and _is_constant(node.lower)
+
+
+def _statement_calls(statements: list[ast.AST], results: dict) -> int:
+    """Self-calls on the costliest path through a statement list.
+
+    An `if` whose body always leaves (return, raise, ...) makes the rest of
+    the list its else branch, as in `if x < a[mid]: return f(lo, mid)`.
+    """
+    calls = 0
+    for statement in reversed(statements):
+        cost = results.get(id(statement), _ZERO)
+        if (isinstance(statement, ast.If) and statement.body
+                and isinstance(statement.body[-1], _TERMINAL_STATEMENTS)):
+            calls = max(cost.calls, calls)
+        else:
+            calls += cost.calls
+    return calls
+
+
+def _python_cost(node: ast.AST, unit: _PythonUnit, results: dict, functions: dict) -> _Cost:
+    """Cost of `node` from the costs of its children in `results`."""
+    line = getattr(node, "lineno", 0)
+    children = [results[id(child)] for child in _python_children(node, unit.node) if id(child) in results]
+
+    if isinstance(node, (ast.For, ast.AsyncFor)):
+        header = results.get(id(node.iter), _ZERO)
+        body = _merge([results.get(id(node.target), _ZERO)]
+                      + [results.get(id(statement), _ZERO) for statement in node.body + node.orelse],
+                      calls=_statement_calls(node.body, results))
+        return _loop(_python_trips(node.iter, line), header, body)
+
+    if isinstance(node, ast.While):
+        body = _merge(children, calls=_statement_calls(node.body, results))
+        trips = _factor(0, 1, "halving loop", line) if body.halves else _factor(1, 0, "loop", line)
+        return _loop(trips, _ZERO, body)
+
+    if isinstance(node, _COMPREHENSIONS):
+        trips = CONSTANT
+        for generator in node.generators:
+            trips = _times(trips, _python_trips(generator.iter, line))
+        first_iter = results.get(id(node.generators[0].iter), _ZERO)
+        body = _merge(children)
+        cost = _loop(trips, first_iter, body)
+        if not isinstance(node, ast.GeneratorExp) and trips.order != (0, 0):
+            cost = cost._replace(alloc=_largest(cost.alloc, _times(trips, body.alloc or CONSTANT)))
+        return cost
+
+    if isinstance(node, ast.If):
+        test = results.get(id(node.test), _ZERO)
+        merged = _merge(children)
+        calls = test.calls + max(_statement_calls(node.body, results), _statement_calls(node.orelse, results))
+        return merged._replace(calls=calls)
+
+    if isinstance(node, ast.IfExp):
+        merged = _merge(children)
+        branches = max(results.get(id(node.body), _ZERO).calls, results.get(id(node.orelse), _ZERO).calls)
+        return merged._replace(calls=results.get(id(node.test), _ZERO).calls + branches)
+
+    if isinstance(node, _FUNCTION_DEFS) or isinstance(node, ast.Module):
+        return _merge(children, calls=_statement_calls(node.body, results))
+
+    cost = _merge(children)
+    time, growth, alloc, calls, halves = cost
+
+    if isinstance(node, ast.Call):
+        name = _call_name(node)
+        if unit.is_self_call(node):
+            unit.self_calls.append(node)
+            calls += 1
+        elif name in functions and name != unit.name:
+            callee = functions[name]
+            time, alloc = _largest(time, callee.time), _largest(alloc, callee.space)
+        elif name in _SORT_CALLS:
+            time = _largest(time, _factor(1, 1, f"{name}()", line))
+            if name != "sort":
+                alloc = _largest(alloc, _factor(1, 0, f"{name}()", line))
+        elif name in _LOG_CALLS:
+            time = _largest(time, _factor(0, 1, f"{name}()", line))
+        elif name in _LINEAR_CALLS and (node.args or node.keywords):
+            time = _largest(time, _factor(1, 0, f"{name}()", line))
+            if name in _COPYING_CALLS:
+                alloc = _largest(alloc, _factor(1, 0, f"{name}()", line))
+        elif name == "pop" and node.args and _is_constant(node.args[0]) and node.args[0].value == 0:
+            time = _largest(time, _factor(1, 0, "pop(0)", line))
+        if name in _GROWTH_CALLS:
+            if name in ("extend", "update") and node.args and not isinstance(node.args[0], (ast.List, ast.Tuple)):
+                growth = _largest(growth, _factor(1, 0, f"{name}()", line))
+            else:
+                growth = _largest(growth, CONSTANT)
+        if name == "insert":
+            time = _largest(time, _factor(1, 0, "insert()", line))
+
+    elif isinstance(node, ast.Compare):
+        for op, comparator in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)) and (
+                    isinstance(comparator, ast.Name) and comparator.id in unit.lists | unit.strings):
+                time = _largest(time, _factor(1, 0, f"`in {comparator.id}`", line))
+
+    elif isinstance(node, ast.Subscript) and isinstance(node.slice, ast.Slice):
+        if not _bounded_slice(node.slice):
+            time = _largest(time, _factor(1, 0, "slice", line))
+            alloc = _largest(alloc, _factor(1, 0, "slice", line))
+
+    elif isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mult):
+        sides = (node.left, node.right)
+        if any(isinstance(side, ast.List) for side in sides) and not all(
+                isinstance(side, ast.List) or _is_constant(side) for side in sides):
+            time = _largest(time, _factor(1, 0, "list of size n", line))
+            alloc = _largest(alloc, _factor(1, 0, "list of size n", line))
+
+    elif isinstance(node, ast.AugAssign):
+        target = node.target
+        if isinstance(node.op, _HALVING_OPS) and isinstance(node.value, ast.Constant) and node.value.value in (1, 2):
+            halves = True
+        elif isinstance(target, ast.Name) and isinstance(node.op, ast.Add) and \
+                target.id in unit.lists | unit.strings:
+            growth = _largest(growth, CONSTANT)
+        elif isinstance(target, ast.Subscript) and isinstance(target.value, ast.Name) and \
+                target.value.id in unit.hashes:
+            growth = _largest(growth, CONSTANT)
+
+    elif isinstance(node, ast.Assign):
+        if _halving(node.value):
+            halves = True
+        for target in node.targets:
+            if isinstance(target, ast.Subscript) and isinstance(target.value, ast.Name) and \
+                    target.value.id in unit.hashes:
+                growth = _largest(growth, CONSTANT)
+
+    return _Cost(time, growth, alloc, calls, halves)
+
+
+def _python_recursion(unit: _PythonUnit) -> tuple[bool, int]:
+    """(divides, states): whether self-calls halve the input, and how many arguments shrink."""
+    divides, states = False, 1
+    for call in unit.self_calls:
+        shrinking = 0
+        for arg in call.args:
+            for node in ast.walk(arg):
+                # a[:mid] halves through `mid`; a[:i] + a[i + 1:] does not
+                if _halving(node) or (isinstance(node, ast.Name) and node.id in unit.halves | _HALF_NAMES):
+                    divides = True
+            if isinstance(arg, ast.BinOp) and isinstance(arg.op, (ast.Add, ast.Sub)):
+                shrinking += 1
+        states = max(states, shrinking)
+    return divides, states
+
+
+def _estimate_python_unit(unit: _PythonUnit, functions: dict, deadline, visited: list) -> _Function | None:
+    """Cost one function (or the module body) bottom-up, without recursion."""
+    results: dict[int, _Cost] = {}
+    stack = [(unit.node, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            results[id(node)] = _python_cost(node, unit, results, functions)
+            continue
+        visited[0] += 1
+        if visited[0] % BUDGET_CHECK_INTERVAL == 0 and deadline_passed(deadline):
+            return None
+        stack.append((node, True))
+        stack.extend((child, False) for child in _python_children(node, unit.node))
+
+    cost = results[id(unit.node)]
+    line = getattr(unit.node, "lineno", 1)
+    divides, states = _python_recursion(unit)
+    time, stack_space = _solve(cost.time, cost.calls, divides, unit.memoized, states, line)
+    space = _largest(CONSTANT, cost.growth, cost.alloc, stack_space)
+    return _Function(time, space)
+
+
+def estimate_python(tree: ast.Module, deadline: float | None = None) -> dict | None:
+    """Time and space estimate of a parsed Python module, or None if `deadline` passes.
+
+    Returns {"time", "space", "time_reason", "space_reason"}: big-O strings,
+    and the constructs behind each bound with the function they are in.
+    """
+    module = _PythonUnit("module code", tree)
+    by_name: dict[str, list[_PythonUnit]] = {module.name: [module]}
+    # One pass files every node under its innermost function
+    stack = [(tree, module)]
+    visited = 0
+    while stack:
+        node, unit = stack.pop()
+        visited += 1
+        if visited % BUDGET_CHECK_INTERVAL == 0 and deadline_passed(deadline):
+            return None
+        if isinstance(node, _FUNCTION_DEFS):
+            # Methods of different classes may share a name; calls reach the costliest
+            unit = _PythonUnit(node.name, node)
+            by_name.setdefault(node.name, []).append(unit)
+        unit.note(node)
+        stack.extend((child, unit) for child in ast.iter_child_nodes(node))
+    callees = {name: set().union(*(unit.callees for unit in group)) - {name} for name, group in by_name.items()}
+
+    functions: dict[str, _Function] = {}
+    counter = [visited]
+    costed: list[tuple[str, _Function]] = []
+    for name in _callee_order(callees):
+        for unit in by_name[name]:
+            result = _estimate_python_unit(unit, functions, deadline, counter)
+            if result is None:
+                return None
+            costed.append((name, result))
+            if name in functions:
+                result = _Function(_largest(functions[name].time, result.time),
+                                   _largest(functions[name].space, result.space))
+            functions[name] = result
+    return _summary(costed)
+
+
+# ── tree-sitter languages ──
+
+# Callee names, lowercased; calls are known by their last identifier only
+_TS_SORT_CALLS = {"sort", "sorted", "sort_by", "sort_by_key", "sort_unstable", "sort_unstable_by",
+                  "sort_unstable_by_key", "qsort", "stable_sort", "sortfunc", "sortstablefunc"}
+_TS_SEARCH_CALLS = {"binarysearch", "binary_search", "binary_search_by", "bsearch", "bsearch_index",
+                    "lower_bound", "upper_bound", "equal_range"}
+# Calls that run their callback (a lambda or block argument) once per element
+_TS_ITERATING_CALLS = {"map", "filter", "foreach", "for_each", "reduce", "some", "every", "flatmap",
+                       "each", "each_with_index", "each_with_object", "select", "reject", "times",
+                       "upto", "downto", "collect", "inject", "fold", "all", "any", "sum"}
+_TS_LINEAR_CALLS = {"indexof", "lastindexof", "includes", "reverse", "fill", "copyof", "copyofrange",
+                    "arraycopy", "clone", "to_vec", "concat", "join", "splice", "slice", "tolist", "split",
+                    "chars", "tochararray", "substring", "to_a", "dup", "memcpy", "memset", "strlen", "strcpy",
+                    "shift", "unshift"}
+_TS_COPYING_CALLS = {"copyof", "copyofrange", "clone", "to_vec", "concat", "slice", "tolist", "to_a", "dup",
+                     "split", "chars", "tochararray", "substring"}
+_TS_GROWTH_CALLS = {"push", "push_back", "emplace_back", "push_front", "append", "add", "put", "insert",
+                    "push_str", "unshift", "offer", "addlast", "addfirst", "emplace"}
+_TS_ALLOC_CALLS = {"make", "malloc", "calloc", "realloc"}
+_TS_ALLOC_NODES = {"array_creation_expression", "new_expression", "macro_invocation"}
+_TS_TERNARY_NODES = {"conditional_expression", "ternary_expression", "conditional"}
+_TS_TERMINAL_NODES = {"return_statement", "return_expression", "return", "throw_statement",
+                      "break_statement", "continue_statement", "break", "next"}
+_TS_CALL_FIELDS = ("name", "method", "function", "macro")
+_TS_RECEIVER_FIELDS = ("object", "receiver", "operand", "value", "argument", "scope", "path")
+_TS_SELF_RECEIVERS = {b"this", b"self", b"Self", b"(*this)"}
+# Argument node types that are callbacks, run by iterating calls like forEach()
+_TS_CALLBACK_NODES = {"arrow_function", "function_expression", "function", "lambda_expression", "lambda",
+                      "closure_expression", "func_literal", "method_reference", "block", "do_block"}
+_TS_NAME_FIELDS = ("field", "property", "name", "function")
+_TS_ITERABLE_FIELDS = ("right", "value")
+_TS_WHILE_LOOPS = {"while_statement", "do_statement", "while_expression", "loop_expression", "while", "until"}
+
+# Short assignments that halve or double, e.g. `i *= 2`, `mid = (lo + hi) / 2`, `n >>= 1`
+_TS_HALVING_RE = re.compile(rb"(?:[*/]=\s*2|>>=\s*1|<<=\s*1|[*/]\s*2|>>\s*1|<<\s*1)\b")
+# An argument that is a variable: make([]int, n), malloc(n * sizeof(int))
+_TS_SIZED_RE = re.compile(rb"[(,]\s*[A-Za-z_]")
+# An array sized by a variable: new int[n], new Array(n), vec![0; n]
+_TS_SIZED_ARRAY_RE = re.compile(rb"(?:\[|Array\(|;)\s*[A-Za-z_]")
+_TS_INTEGER_RE = re.compile(rb"\s*-?[0-9][0-9_]*[a-zA-Z]*\s*")
+_MAX_SHORT_TEXT = 160
+
+
+def _ts_text(node, code_bytes: bytes, limit: int = _MAX_SHORT_TEXT) -> bytes | None:
+    """Source of a short node, None for one longer than `limit` bytes."""
+    if node.end_byte - node.start_byte > limit:
+        return None
+    return code_bytes[node.start_byte:node.end_byte]
+
+
+def _ts_name(node, code_bytes: bytes, fields) -> str | None:
+    """Last identifier of a (possibly qualified) name: `a.b.sort` → "sort"."""
+    for _ in range(8):
+        if node is None:
+            return None
+        if node.type.endswith("identifier") and not node.type.startswith(("qualified", "scoped")) \
+                or node.type == "constant":
+            return code_bytes[node.start_byte:node.end_byte].decode("utf-8", errors="replace")
+        node = next((child for child in map(node.child_by_field_name, fields) if child is not None), None)
+    return None
+
+
+def _ts_callee(node, code_bytes: bytes) -> tuple[str | None, bytes, object]:
+    """(name, short source, node) of the function a call node calls: `std::sort(v)` → "sort", b"std::sort"."""
+    callee = next((child for child in map(node.child_by_field_name, _TS_CALL_FIELDS) if child is not None), None)
+    if callee is None:
+        return None, b"", None
+    return _ts_name(callee, code_bytes, _TS_NAME_FIELDS), _ts_text(callee, code_bytes, 48) or b"", callee
+
+
+def _ts_receiver(call, callee, code_bytes: bytes) -> bytes | None:
+    """Source of the object a method is called on (`this` in `this.f()`), None for a bare call."""
+    for node in (call, callee):
+        receiver = next((child for child in map(node.child_by_field_name, _TS_RECEIVER_FIELDS) if child is not None),
+                        None)
+        if receiver is not None:
+            return _ts_text(receiver, code_bytes) or b""
+    return None
+
+
+def _ts_arity(node) -> int | None:
+    """Number of parameters of a function node, None if they cannot be found."""
+    parameters = node.child_by_field_name("parameters")
+    declarator = node
+    while parameters is None and declarator is not None:
+        # C and C++: int f(int a) declares its parameters on the declarator
+        declarator = declarator.child_by_field_name("declarator")
+        parameters = declarator.child_by_field_name("parameters") if declarator is not None else None
+    if parameters is None:
+        return None
+    return sum(child.type not in ("comment", "self_parameter") for child in parameters.named_children)
+
+
+def _ts_function_name(node, code_bytes: bytes) -> str | None:
+    """Name of a function node; C and C++ keep it inside the declarator."""
+    name = node.child_by_field_name("name")
+    if name is None and node.type == "arrow_function" and node.parent is not None \
+            and node.parent.type == "variable_declarator":
+        name = node.parent.child_by_field_name("name")
+    if name is None:
+        declarator = node
+        for _ in range(4):
+            declarator = declarator.child_by_field_name("declarator")
+            if declarator is None or declarator.type.endswith("identifier"):
+                break
+        name = declarator
+    return _ts_name(name, code_bytes, ("name",)) if name is not None else None
+
+
+def _ts_is_integer(node, code_bytes: bytes) -> bool:
+    text = _ts_text(node, code_bytes, 24)
+    return text is not None and _TS_INTEGER_RE.fullmatch(text) is not None
+
+
+def _ts_trips(node, code_bytes: bytes, halves: bool) -> Bound:
+    """How many times a loop node runs."""
+    line = node.start_point[0] + 1
+    if halves:
+        return _factor(0, 1, "halving loop", line)
+    # for (i = 0; i < 10; i++), Go `for i := 0; i < 10; i++`, Rust/Ruby `for i in 0..10`
+    clause = next((child for child in node.children if child.type == "for_clause"), node)
+    condition = clause.child_by_field_name("condition")
+    if condition is not None:
+        bound = condition.child_by_field_name("right")
+        if bound is not None and _ts_is_integer(bound, code_bytes):
+            return CONSTANT
+    iterable = node.child_by_field_name("value")
+    if iterable is not None and iterable.type == "in":
+        iterable = iterable.named_children[0] if iterable.named_children else None
+    if iterable is not None and iterable.type in ("range_expression", "range") and iterable.named_children \
+            and all(_ts_is_integer(child, code_bytes) for child in iterable.named_children):
+        return CONSTANT
+    return _factor(1, 0, "loop", line)
+
+
+class _TSUnit:
+    """A named function (or the whole file) of a tree-sitter tree, and what costing it found."""
+
+    def __init__(self, name: str, node, code_bytes: bytes):
+        self.name = name
+        self.node = node
+        text = _ts_text(node, code_bytes, 1 << 16)
+        self.memoized = text is not None and _MEMO_NAME_RE.search(text.decode("utf-8", "replace")) is not None
+        self.arity = _ts_arity(node)
+        self.self_calls: list[bytes | None] = []  # argument text of each self-call
+        # What each called name cost when this unit was costed (None: not known yet)
+        self.seen: dict[str, _Function | None] = {}
+        self.result: _Function | None = None
+
+    def is_self_call(self, name: str | None, call, callee, arguments, code_bytes: bytes) -> bool:
+        """Whether a call recurses: same name, no other receiver, and no other overload's arity."""
+        if name != self.name:
+            return False
+        receiver = _ts_receiver(call, callee, code_bytes)
+        if receiver is not None and receiver not in _TS_SELF_RECEIVERS:
+            return False
+        return self.arity is None or arguments is None or len(arguments.named_children) == self.arity
+
+
+def _ts_terminal(node) -> bool:
+    """Whether an if statement's consequence always leaves, like `if (x) return f(a);`."""
+    consequence = node.child_by_field_name("consequence")
+    if consequence is None:
+        return False
+    if consequence.type in _TS_TERMINAL_NODES:
+        return True
+    named = consequence.named_children
+    if named and named[-1].type == "expression_statement" and named[-1].named_children:
+        named = named[-1].named_children
+    return bool(named) and named[-1].type in _TS_TERMINAL_NODES
+
+
+class _TSEstimator:
+    """Costs units of one tree-sitter tree, bottom-up, configured per language."""
+
+    def __init__(self, code_bytes: bytes, config: dict, language: str):
+        self.code_bytes = code_bytes
+        self.config = config
+        self.ruby = language == "Ruby"
+        self.functions: dict[str, _Function] = {}
+        # Node types cost() treats specially; any other node just passes its children's cost up
+        self.special = (config["loop_nodes"] | config["conditional_nodes"] | config["call_nodes"]
+                        | config["assignment_nodes"] | _TS_TERNARY_NODES | _TS_ALLOC_NODES
+                        | {"update_expression", "binary"})
+
+    def children(self, node, units: list[_TSUnit]) -> list:
+        """Children of `node` costed with it; named functions are queued as units of their own."""
+        function_nodes = self.config["function_nodes"]
+        children = []
+        for child in node.children:
+            if child.type in function_nodes:
+                name = _ts_function_name(child, self.code_bytes)
+                if name is not None:
+                    units.append(_TSUnit(name, child, self.code_bytes))
+                    continue
+            children.append(child)
+        return children
+
+    def cost(self, node, children: list, costs: list[_Cost], unit: _TSUnit) -> _Cost:
+        code_bytes, config = self.code_bytes, self.config
+        node_type = node.type
+        line = node.start_point[0] + 1
+
+        if node_type in config["loop_nodes"]:
+            body = node.child_by_field_name("body")
+            iterables = {field.start_byte for field in map(node.child_by_field_name, _TS_ITERABLE_FIELDS)
+                         if field is not None}
+            header = _merge(cost for child, cost in zip(children, costs) if child.start_byte in iterables)
+            inner = [cost for child, cost in zip(children, costs) if child.start_byte not in iterables]
+            loop_body = _merge(inner)
+            # A for loop's halving must be in its header; a while loop's anywhere in it.
+            # Go spells `while` as a for with a bare condition
+            while_like = node_type in _TS_WHILE_LOOPS or node_type == "for_statement" and not any(
+                child.type in ("for_clause", "range_clause") for child in children) and not any(
+                map(node.child_by_field_name, ("update", "increment", "initializer", "init")))
+            halves = loop_body.halves if while_like else any(
+                cost.halves for child, cost in zip(children, costs)
+                if body is None or child.start_byte != body.start_byte)
+            return _loop(_ts_trips(node, code_bytes, halves), header, loop_body)
+
+        if node_type in config["conditional_nodes"] or node_type in _TS_TERNARY_NODES:
+            # Branches are alternatives: one path makes the most self-calls of any branch
+            return _merge(costs, calls=max((cost.calls for cost in costs), default=0))
+
+        # Self-calls in a sequence: an if that always leaves makes the rest its else
+        calls = 0
+        for child, cost in zip(reversed(children), reversed(costs)):
+            if child.type in config["conditional_nodes"] and _ts_terminal(child):
+                calls = max(cost.calls, calls)
+            else:
+                calls += cost.calls
+        time, growth, alloc, _, halves = _merge(costs)
+
+        if node_type in config["call_nodes"]:
+            name, qualified, callee = _ts_callee(node, code_bytes)
+            lowered = (name or "").lower()
+            arguments = node.child_by_field_name("arguments")
+            has_arguments = arguments is not None and bool(arguments.named_children)
+            if name and name not in self.functions:
+                unit.seen.setdefault(name, None)  # a function defined further on, or a library call
+            if unit.is_self_call(name, node, callee, arguments, code_bytes):
+                calls += 1
+                unit.self_calls.append(_ts_text(arguments, code_bytes) if arguments is not None else b"")
+            elif name in self.functions:
+                callee_cost = unit.seen[name] = self.functions[name]
+                time, alloc = _largest(time, callee_cost.time), _largest(alloc, callee_cost.space)
+            elif lowered in _TS_SEARCH_CALLS or qualified.startswith(b"sort.Search"):
+                time = _largest(time, _factor(0, 1, f"{name}()", line))
+            elif lowered in _TS_SORT_CALLS or qualified.startswith((b"sort.", b"slices.Sort")):
+                time = _largest(time, _factor(1, 1, f"{name}()", line))
+            elif lowered in _TS_ITERATING_CALLS and any(
+                    child.type in _TS_CALLBACK_NODES
+                    for child in (arguments.named_children if arguments is not None else []) + children):
+                time = _times(_factor(1, 0, f"{name}()", line), time)
+                growth = None if growth is None else _times(_factor(1, 0, f"{name}()", line), growth)
+                calls = max(calls, 2) if calls else 0
+            elif lowered in _TS_LINEAR_CALLS:
+                time = _largest(time, _factor(1, 0, f"{name}()", line))
+                if lowered in _TS_COPYING_CALLS:
+                    alloc = _largest(alloc, _factor(1, 0, f"{name}()", line))
+            elif lowered in _TS_ALLOC_CALLS and has_arguments:
+                text = _ts_text(arguments, code_bytes)
+                if text is not None and _TS_SIZED_RE.search(text):
+                    alloc = _largest(alloc, _factor(1, 0, f"{name}()", line))
+            if lowered in _TS_GROWTH_CALLS:
+                growth = _largest(growth, CONSTANT)
+
+        if node_type in _TS_ALLOC_NODES:
+            text = _ts_text(node, code_bytes)
+            if text is not None and (node_type != "macro_invocation" or text.startswith(b"vec!")) \
+                    and _TS_SIZED_ARRAY_RE.search(text):
+                time = _largest(time, _factor(1, 0, "array of size n", line))
+                alloc = _largest(alloc, _factor(1, 0, "array of size n", line))
+        elif "assignment" in node_type or node_type == "update_expression" or node_type in config["assignment_nodes"]:
+            text = _ts_text(node, code_bytes, 80)
+            if text is not None and _TS_HALVING_RE.search(text):
+                halves = True
+        elif self.ruby and node_type == "binary":
+            operator = node.child_by_field_name("operator")
+            if operator is not None and operator.type == "<<":
+                growth = _largest(growth, CONSTANT)
+
+        return _Cost(time, growth, alloc, calls, halves)
+
+    def estimate(self, unit: _TSUnit, deadline, visited: list, units: list[_TSUnit]) -> bool:
+        """Cost `unit` into unit.result; False once the deadline passes."""
+        root = unit.node
+        special = self.special
+        unit.self_calls.clear()
+        unit.seen.clear()
+        # Frames of [node, children, costs]; a node is costed once all its children are
+        frames = [[root, self.children(root, units), []]]
+        result = None
+        while frames:
+            node, children, costs = frames[-1]
+            if len(costs) < len(children):
+                child = children[len(costs)]
+                visited[0] += 1
+                if visited[0] % BUDGET_CHECK_INTERVAL == 0 and deadline_passed(deadline):
+                    return False
+                if child.child_count:
+                    frames.append([child, self.children(child, units), []])
+                else:
+                    costs.append(_ZERO)  # leaves: tokens, identifiers, literals
+                continue
+            frames.pop()
+            node_type = node.type
+            if node_type in special or "assignment" in node_type:
+                cost = self.cost(node, children, costs, unit)
+            elif len(costs) == 1:
+                cost = costs[0]
+            elif all(cost is _ZERO for cost in costs):
+                cost = _ZERO  # plain expressions of leaves
+            else:
+                cost = self.cost(node, children, costs, unit)
+            if frames:
+                frames[-1][2].append(cost)
+            else:
+                result = cost
+
+        divides = any(text is not None and (_TS_HALVING_RE.search(text) or re.search(rb"\b(?:mid|middle|half)\b", text))
+                      for text in unit.self_calls)
+        states = max((text.count(b"+") + text.count(b"-") for text in unit.self_calls if text), default=1)
+        time, stack_space = _solve(result.time, result.calls, divides, unit.memoized, max(states, 1),
+                                   root.start_point[0] + 1)
+        unit.result = _Function(time, _largest(CONSTANT, result.growth, result.alloc, stack_space))
+        return True
+
+    def record(self, name: str, group: list[_TSUnit]) -> None:
+        """Make the cost of a call to `name` that of its costliest definition (overloads share names)."""
+        self.functions[name] = _Function(_largest(*(unit.result.time for unit in group)),
+                                         _largest(*(unit.result.space for unit in group)))
+
+
+def estimate_ts(root, code_bytes: bytes, language: str, config: dict,
+                deadline: float | None = None) -> dict | None:
+    """estimate_python() for the root node of a tree-sitter tree of `language`.
+
+    `config` is the analyzer's node-type configuration for the language
+    (src.ts_analyzer._LANGUAGE_CONFIG).
+    """
+    estimator = _TSEstimator(code_bytes, config, language)
+    units = [_TSUnit("module code", root, code_bytes)]
+    by_name: dict[str, list[_TSUnit]] = {}
+    visited = [0]
+    # Costing a unit queues the named functions inside it, so this visits every node once
+    for unit in units:
+        if not estimator.estimate(unit, deadline, visited, units):
+            return None
+        group = by_name.setdefault(unit.name, [])
+        group.append(unit)
+        estimator.record(unit.name, group)
+
+    # Units that called a function before it was costed (or saw an overload's cost
+    # change) are costed again, callees first
+    callees = {name: set().union(*(unit.seen for unit in group)) - {name} for name, group in by_name.items()}
+    for name in _callee_order(callees):
+        group = by_name[name]
+        stale = False
+        for unit in group:
+            if any(estimator.functions.get(callee) != cost for callee, cost in unit.seen.items() if callee != name):
+                if not estimator.estimate(unit, deadline, visited, []):
+                    return None
+                stale = True
+        if stale:
+            estimator.record(name, group)
+    return _summary([(unit.name, unit.result) for unit in units])
@@ -0,0 +1,226 @@
+"""Disk-backed fingerprint index of archived submissions.
+
+Lets new submissions be checked against every earlier semester without
+loading the archive into memory. Each archived submission is reduced to its
+winnowed fingerprint set (see src.winnowing), and an SQLite inverted index
+maps fingerprint → submission ids. A query looks up only the query's own
+fingerprints and runs in two stages:
+  1. SQLite counts, per archived submission, the shared fingerprints that
+     are rare in the archive. Fingerprints found in a large fraction of it
+     (starter code, boilerplate) carry little evidence and have the longest
+     posting lists, so this stage skips them.
+  2. The best candidates' full fingerprint sets (stored as one blob per
+     submission) are loaded and ranked by exact Dice overlap, the same
+     score as the text layer of detect_plagiarism().
+
+    with CorpusIndex("archive.db") as index:
+        index.add(code, "Python", name="alice_hw1.py", label="2025-fall")
+        index.query(new_code, "Python", k=5)
+"""
+
+import sqlite3
+import time
+from array import array
+
+from src.submission import Submission, as_submission
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    language TEXT NOT NULL,
+    label TEXT NOT NULL DEFAULT '',
+    code_hash TEXT NOT NULL UNIQUE,
+    fingerprint_count INTEGER NOT NULL,
+    fingerprints BLOB NOT NULL,
+    added_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    fingerprint INTEGER NOT NULL,
+    submission_id INTEGER NOT NULL,
+    PRIMARY KEY (fingerprint, submission_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS fingerprint_stats (
+    fingerprint INTEGER PRIMARY KEY,
+    document_count INTEGER NOT NULL
+);
+"""
+
+# Fingerprints found in more than this fraction of the archive are ignored by
+# queries (only once the archive holds at least _MIN_COMMON_DOCUMENTS entries)
+DEFAULT_COMMON_FRACTION = 0.05
+_MIN_COMMON_DOCUMENTS = 20
+# Candidates re-scored exactly per query: max(k * factor, minimum)
+_RERANK_FACTOR = 10
+_MIN_RERANK = 50
+
+
+def _pack(fingerprints) -> bytes:
+    # Fingerprints are below 2^61, so they fit SQLite's signed 64-bit INTEGER
+    return array("q", sorted(fingerprints)).tobytes()
+
+
+def _unpack(blob: bytes) -> array:
+    values = array("q")
+    values.frombytes(blob)
+    return values
+
+
+class CorpusIndex:
+    """SQLite inverted index from winnowed fingerprints to archived submissions.
+
+    Args:
+        path: database file (created if missing); ":memory:" for a throwaway index
+        common_fraction: queries skip fingerprints present in more than this
+            fraction of archived submissions
+    """
+
+    def __init__(self, path: str, common_fraction: float = DEFAULT_COMMON_FRACTION):
+        self.path = path
+        self.common_fraction = common_fraction
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "CorpusIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM submissions").fetchone()[0]
+
+    # ── Updates ──
+
+    def _insert(self, submission: Submission, name: str, label: str) -> int:
+        row = self._conn.execute(
+            "SELECT id FROM submissions WHERE code_hash = ?", (submission.code_hash,)
+        ).fetchone()
+        if row:
+            return row[0]
+        fingerprints = submission.fingerprints
+        cursor = self._conn.execute(
+            "INSERT INTO submissions (name, language, label, code_hash, fingerprint_count, fingerprints, added_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (name, submission.language, label, submission.code_hash, len(fingerprints),
+             _pack(fingerprints), time.time()),
+        )
+        submission_id = cursor.lastrowid
+        self._conn.executemany(
+            "INSERT INTO postings (fingerprint, submission_id) VALUES (?, ?)",
+            ((fp, submission_id) for fp in fingerprints),
+        )
+        self._conn.executemany(
+            "INSERT INTO fingerprint_stats (fingerprint, document_count) VALUES (?, 1)"
+            " ON CONFLICT(fingerprint) DO UPDATE SET document_count = document_count + 1",
+            ((fp,) for fp in fingerprints),
+        )
+        return submission_id
+
+    def add(self, code: str | Submission, language: str, name: str = "", label: str = "") -> int:
+        """Archive one submission and return its id.
+
+        Identical source that is already archived is not added again; its
+        existing id is returned.
+        """
+        submission = as_submission(code, language)
+        with self._conn:
+            return self._insert(submission, name or submission.name, label)
+
+    def add_many(self, submissions: list[dict], label: str = "") -> list[int]:
+        """Archive {'name', 'code', 'language'} dicts in a single transaction."""
+        with self._conn:
+            return [
+                self._insert(Submission(s["code"], s["language"], s["name"]), s["name"], label)
+                for s in submissions
+            ]
+
+    def remove(self, submission_id: int) -> bool:
+        """Drop an archived submission. Returns False if the id is unknown."""
+        with self._conn:
+            row = self._conn.execute(
+                "SELECT fingerprints FROM submissions WHERE id = ?", (submission_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            fingerprints = _unpack(row[0])
+            self._conn.executemany(
+                "DELETE FROM postings WHERE fingerprint = ? AND submission_id = ?",
+                ((fp, submission_id) for fp in fingerprints),
+            )
+            self._conn.executemany(
+                "UPDATE fingerprint_stats SET document_count = document_count - 1 WHERE fingerprint = ?",
+                ((fp,) for fp in fingerprints),
+            )
+            self._conn.execute("DELETE FROM fingerprint_stats WHERE document_count <= 0")
+            self._conn.execute("DELETE FROM submissions WHERE id = ?", (submission_id,))
+        return True
+
+    # ── Queries ──
+
+    def query(self, code: str | Submission, language: str, k: int = 5,
+              min_similarity: float = 0.0) -> list[dict]:
+        """Return the `k` archived submissions most similar to `code`.
+
+        Each result is {'id', 'name', 'language', 'label', 'shared',
+        'similarity'} with similarity the Dice overlap of fingerprint sets
+        in percent (0-100), best first. Results below `min_similarity` are
+        dropped.
+
+        Scores are exact, but only candidates that share rare fingerprints
+        are scored: near-copies are always found, while among archived
+        submissions that merely share common code the ranking is approximate.
+        """
+        fingerprints = as_submission(code, language).fingerprints
+        if not fingerprints or k <= 0:
+            return []
+
+        total = len(self)
+        max_documents = total
+        if total >= _MIN_COMMON_DOCUMENTS:
+            max_documents = max(1, int(total * self.common_fraction))
+
+        with self._conn:
+            self._conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS query_fingerprints (fingerprint INTEGER PRIMARY KEY)"
+            )
+            self._conn.executemany(
+                "INSERT INTO query_fingerprints (fingerprint) VALUES (?)", ((fp,) for fp in fingerprints)
+            )
+            # CROSS JOIN pins the join order: walk the query's fingerprints and
+            # probe the indexes, never scan the postings table
+            candidates = self._conn.execute(
+                """
+                SELECT p.submission_id
+                FROM query_fingerprints q
+                CROSS JOIN fingerprint_stats f ON f.fingerprint = q.fingerprint
+                CROSS JOIN postings p ON p.fingerprint = q.fingerprint
+                WHERE f.document_count <= ?
+                GROUP BY p.submission_id
+                ORDER BY COUNT(*) DESC, p.submission_id
+                LIMIT ?
+                """,
+                (max_documents, max(k * _RERANK_FACTOR, _MIN_RERANK)),
+            ).fetchall()
+            self._conn.execute("DELETE FROM query_fingerprints")
+
+        results = []
+        for submission_id, in candidates:
+            name, lang, label, blob = self._conn.execute(
+                "SELECT name, language, label, fingerprints FROM submissions WHERE id = ?", (submission_id,)
+            ).fetchone()
+            archived = _unpack(blob)
+            shared = len(fingerprints.intersection(archived))
+            similarity = 200.0 * shared / (len(fingerprints) + len(archived))
+            if similarity >= min_similarity:
+                results.append({
+                    "id": submission_id, "name": name, "language": lang, "label": label,
+                    "shared": shared, "similarity": round(similarity, 1),
+                })
+        results.sort(key=lambda r: (-r["similarity"], r["id"]))
+        return results[:k]
@@ -3,8 +3,15 @@ import time
 from src.llm_client import call_llm
 from src.utils import parse_llm_response
 from src.prompts import EVALUATION_SYSTEM_PROMPT, format_prompt
-from src.analyzer import analyze_code, format_analysis_for_prompt
+from src.analyzer import analyze_code, analyze_code_batch, format_analysis_for_prompt
+from src.problem_analysis import analyze_problem
+from src.profiler import format_profile_for_prompt, profile_python
 from src.scoring import compute_overall_score, get_verdict
+from src.surrogate import SurrogateScorer, surrogate_result
+
+# CPU seconds static analysis may spend on one submission before it returns
+# partial metrics (guards against adversarial or generated inputs)
+STATIC_ANALYSIS_TIME_BUDGET = 5.0
 
 EXPECTED_DIMENSIONS = [
     "correctness", "time_efficiency", "space_efficiency",
@@ -12,19 +19,81 @@ EXPECTED_DIMENSIONS = [
 ]
 
 
-def evaluate_code(code: str, language: str, problem_statement: str) -> dict:
+def _apply_static_complexity(dims: dict, complexity: dict) -> None:
+    """Fill "detected_complexity" from the static estimate wherever the model confirmed it."""
+    for key, bound, reason in (
+        ("time_efficiency", complexity["time"], complexity["time_reason"]),
+        ("space_efficiency", complexity["space"], complexity["space_reason"]),
+    ):
+        dim = dims[key]
+        detected = str(dim.get("detected_complexity") or "").strip()
+        correction = str(dim.pop("correction_reason", None) or "").strip()
+        if not detected or detected.lower().startswith("confirm"):
+            dim["detected_complexity"] = bound
+            dim.setdefault("explanation", reason)
+            dim["complexity_source"] = "static"
+        else:
+            # The estimator's reason explains the rejected bound, so it is not reused
+            explanation = f"Corrected from the static estimate {bound}"
+            dim.setdefault("explanation", f"{explanation}: {correction}" if correction else explanation)
+            dim["complexity_source"] = "corrected"
+
+
+def _normalize_bound(bound) -> str:
+    return str(bound or "").lower().replace(" ", "").replace("²", "^2").replace("³", "^3")
+
+
+def _apply_problem_analysis(dims: dict, evaluation: dict, reference: dict) -> None:
+    """Fill the per-problem fields the prompt left out from the reference analysis."""
+    time_dim = dims["time_efficiency"]
+    time_dim.setdefault("expected_optimal", reference["optimal_time"])
+    if not evaluation.get("better_approach"):
+        optimal = _normalize_bound(time_dim.get("detected_complexity")) == _normalize_bound(reference["optimal_time"])
+        evaluation["better_approach"] = "N/A" if optimal else reference["reference_approach"]
+
+
+def evaluate_code(
+    code: str,
+    language: str,
+    problem_statement: str,
+    static_analysis_result: dict | None = None,
+    runtime_profile: dict | None = None,
+    surrogate: SurrogateScorer | None = None,
+    problem_analysis: dict | None = None,
+) -> dict:
     start_time = time.time()
 
-    # Run static analysis using the appropriate analyzer
-    static_analysis_result = analyze_code(code, language)
+    # Run static analysis using the appropriate analyzer (unless pre-computed)
+    if static_analysis_result is None:
+        static_analysis_result = analyze_code(code, language, time_budget=STATIC_ANALYSIS_TIME_BUDGET)
     if static_analysis_result is not None:
         static_analysis_text = format_analysis_for_prompt(static_analysis_result)
     else:
         static_analysis_text = f"Not available (static analysis not supported for {language})"
+    # Measured growth from src.profiler is evidence the model should weigh over the estimate
+    if runtime_profile is not None:
+        static_analysis_text += "\n" + format_profile_for_prompt(runtime_profile)
 
-    # Build prompt and call LLM
-    prompt = format_prompt(code, language, problem_statement, static_analysis_text)
-    raw_response = call_llm(prompt, EVALUATION_SYSTEM_PROMPT)
+    # A trained surrogate scores clear-cut submissions, and all of them if no LLM answers
+    preliminary = None
+    if surrogate is not None and static_analysis_result is not None:
+        preliminary = surrogate.predict(static_analysis_result)
+        if surrogate.is_clear_cut(preliminary):
+            result = surrogate_result(preliminary, language, static_analysis_result, "clear-cut")
+            result["evaluation_time_seconds"] = round(time.time() - start_time, 1)
+            return result
+
+    # Build prompt and call LLM; a static complexity estimate only needs confirming
+    complexity = (static_analysis_result or {}).get("complexity")
+    prompt = format_prompt(code, language, problem_statement, static_analysis_text, complexity, problem_analysis)
+    try:
+        raw_response = call_llm(prompt, EVALUATION_SYSTEM_PROMPT)
+    except RuntimeError as e:
+        if preliminary is None:
+            raise
+        result = surrogate_result(preliminary, language, static_analysis_result, f"LLM unavailable: {e}")
+        result["evaluation_time_seconds"] = round(time.time() - start_time, 1)
+        return result
 
     # Parse response
     evaluation = parse_llm_response(raw_response)
@@ -54,6 +123,13 @@ def evaluate_code(code: str, language: str, problem_statement: str) -> dict:
         if "score" not in dims[key]:
             dims[key]["score"] = 0
         dims[key]["score"] = int(float(dims[key]["score"]))
+    if complexity:
+        _apply_static_complexity(dims, complexity)
+    if problem_analysis:
+        _apply_problem_analysis(dims, evaluation, problem_analysis)
+    if runtime_profile is not None:
+        dims["time_efficiency"]["measured_complexity"] = runtime_profile.get("time")
+        dims["space_efficiency"]["measured_complexity"] = runtime_profile.get("space")
 
     # Compute weighted overall score (our code, not the LLM's)
     overall_score = compute_overall_score(dims)
@@ -72,6 +148,9 @@ def evaluate_code(code: str, language: str, problem_statement: str) -> dict:
         "static_analysis": static_analysis_result,
         "evaluation_time_seconds": elapsed,
         "error": None,
+        "scored_by": "llm",
+        "preliminary": preliminary,
+        "problem_analysis": problem_analysis,
     }
 
 
@@ -79,6 +158,10 @@ def evaluate_batch(
     submissions: list[dict],
     problem_statement: str = "",
     progress_callback=None,
+    profile_inputs=None,
+    surrogate: SurrogateScorer | None = None,
+    problem_cache: str | None = None,
+    run_untrusted_code: bool = False,
 ) -> dict:
     """
     Evaluate multiple code submissions in batch.
@@ -87,6 +170,18 @@ def evaluate_batch(
         submissions: List of dicts with keys: 'code', 'language', 'name' (optional)
         problem_statement: Optional problem context for all submissions
         progress_callback: Optional function(submission_index, total, result) for progress updates
+        profile_inputs: Optional input generator for src.profiler (a name in INPUT_GENERATORS
+            or a callable); Python submissions are then run at growing input sizes in a sandbox
+            and their measured complexity goes to the model. A submission dict may instead
+            carry its own 'runtime_profile'. Profiling executes the submissions on this
+            host, so it also needs run_untrusted_code=True.
+        surrogate: Optional trained src.surrogate.SurrogateScorer; clear-cut submissions
+            are scored by it without an LLM call, and every submission is if no LLM answers
+        problem_cache: Optional JSON file caching the reference analysis of problem statements
+            (src.problem_analysis) between runs. With two or more submissions and a problem
+            statement, the optimal complexity, edge cases and reference approach are derived
+            once and shared by every submission prompt.
+        run_untrusted_code: Opt-in required with profile_inputs (see src.profiler.profile_python)
     
     Returns:
         dict with keys:
@@ -95,11 +190,21 @@ def evaluate_batch(
             - total_time: Total evaluation time
             - errors: List of errors encountered
     """
+    if profile_inputs is not None and not run_untrusted_code:
+        raise ValueError("profile_inputs runs the submissions on this host; pass run_untrusted_code=True")
     start_time = time.time()
     results = []
     errors = []
     
     total = len(submissions)
+
+    # Static analysis is CPU-bound, so run it for the whole batch up front
+    analyses = analyze_code_batch(submissions, time_budget=STATIC_ANALYSIS_TIME_BUDGET)
+    # One reference per problem instead of one derivation per submission response
+    try:
+        problem_analysis = analyze_problem(problem_statement, problem_cache) if total > 1 else None
+    except Exception:
+        problem_analysis = None  # the submissions are still evaluated, just without a reference
     
     for idx, submission in enumerate(submissions, 1):
         code = submission.get("code", "")
@@ -118,7 +223,13 @@ def evaluate_batch(
             continue
         
         try:
-            result = evaluate_code(code, language, problem_statement)
+            runtime_profile = submission.get("runtime_profile")
+            if runtime_profile is None and profile_inputs is not None and language == "Python":
+                runtime_profile = profile_python(code, profile_inputs, run_untrusted_code=True)
+            result = evaluate_code(
+                code, language, problem_statement, analyses[idx - 1], runtime_profile, surrogate,
+                problem_analysis,
+            )
             result["name"] = name
             results.append(result)
             
@@ -156,6 +267,7 @@ def evaluate_batch(
             verdict = r.get("verdict", "Unknown")
             verdict_counts[verdict] = verdict_counts.get(verdict, 0) + 1
         summary["verdict_distribution"] = verdict_counts
+        summary["scored_by_surrogate"] = sum(r.get("scored_by") == "surrogate" for r in successful_results)
     else:
         summary = {
             "total_submissions": total,
@@ -175,4 +287,5 @@ def evaluate_batch(
         "summary": summary,
         "total_time": total_time,
         "errors": errors,
+        "problem_analysis": problem_analysis,
     }
@@ -0,0 +1,151 @@
+"""Greedy String Tiling with Karp-Rabin matching (Wise, 1993; as in JPlag).
+
+Greedy String Tiling covers two token sequences with non-overlapping
+"tiles": maximal common substrings of at least `min_match` tokens, taken
+longest first. Each token belongs to at most one tile. Tiles may appear in
+any order in either sequence, so moving blocks of code around does not hide
+them, unlike n-gram sets that lose matches at every seam.
+
+Each round looks for matches of at least `s` tokens. Karp-Rabin hashes of
+every unmarked length-`s` window of one sequence go into a table, and the
+windows of the other sequence probe it. Hits are verified and extended as
+far as both sequences stay unmarked. The longest matches become tiles, then
+`s` shrinks towards `min_match`. Every round is linear in the input plus
+the matches found, and there are O(log n) rounds, so typical inputs take
+near-linear time. Repetitive streams (the same statement over and over)
+put most windows under one hash; each window probes at most
+`_MAX_PROBES` of them, as JPlag bounds its hash chains, which keeps those
+rounds linear at the cost of possibly missing a tile between repeats.
+
+    tiles = greedy_string_tiling(ids_a, ids_b)   # [(start_a, start_b, length), ...]
+    score = tiling_coverage(tiles, len(ids_a), len(ids_b))
+"""
+
+# Mersenne prime modulus and base for the rolling hash, as in src.winnowing
+_MODULUS = (1 << 61) - 1
+_BASE = 1_000_003
+
+# JPlag's default minimum match length for most languages
+DEFAULT_MIN_MATCH = 9
+DEFAULT_INITIAL_SEARCH = 20
+# Candidate positions a window checks per round (earliest unmarked ones first)
+_MAX_PROBES = 16
+
+
+def _windows(seq: list[int], marked: bytearray, s: int):
+    """Yield (start, hash) of every length-`s` window containing no marked token."""
+    n = len(seq)
+    top = pow(_BASE, s - 1, _MODULUS)
+    i = 0
+    while i <= n - s:
+        # Find the next run of at least s unmarked tokens
+        if marked[i]:
+            i += 1
+            continue
+        run_end = i
+        while run_end < n and not marked[run_end]:
+            run_end += 1
+        if run_end - i >= s:
+            h = 0
+            for value in seq[i:i + s]:
+                h = (h * _BASE + value) % _MODULUS
+            yield i, h
+            for start in range(i + 1, run_end - s + 1):
+                h = ((h - seq[start - 1] * top) * _BASE + seq[start + s - 1]) % _MODULUS
+                yield start, h
+        i = run_end + 1
+
+
+def _extend(a, b, marked_a, marked_b, i: int, j: int, k: int) -> int:
+    """Length of the unmarked common run at (i, j), given that its first `k` tokens match."""
+    limit = min(len(a) - i, len(b) - j)
+    stop = marked_a.find(1, i + k, i + limit)
+    if stop != -1:
+        limit = stop - i
+    stop = marked_b.find(1, j + k, j + limit)
+    if stop != -1:
+        limit = stop - j
+    # Compare growing slices, so a long run (repetitive code) costs few Python steps
+    step = 16
+    while k < limit:
+        end = min(k + step, limit)
+        if a[i + k:i + end] != b[j + k:j + end]:
+            while a[i + k] == b[j + k]:
+                k += 1
+            return k
+        k = end
+        step *= 2
+    return k
+
+
+def _scan(a, b, marked_a, marked_b, s: int) -> tuple[int, dict[int, list[tuple[int, int]]]]:
+    """Maximal unmarked matches of at least `s` tokens, grouped by length."""
+    table: dict[int, list[int]] = {}
+    for start, h in _windows(b, marked_b, s):
+        table.setdefault(h, []).append(start)
+
+    matches: dict[int, list[tuple[int, int]]] = {}
+    longest = 0
+    for i, h in _windows(a, marked_a, s):
+        for j in table.get(h, ())[:_MAX_PROBES]:
+            if a[i:i + s] != b[j:j + s]:
+                continue  # hash collision
+            # Only report a match from its first token, not once per suffix
+            if i and j and a[i - 1] == b[j - 1] and not marked_a[i - 1] and not marked_b[j - 1]:
+                continue
+            k = _extend(a, b, marked_a, marked_b, i, j, s)
+            matches.setdefault(k, []).append((i, j))
+            longest = max(longest, k)
+    return longest, matches
+
+
+def _mark(matches, marked_a, marked_b, tiles: list) -> bool:
+    """Turn matches into tiles, longest first, skipping any that overlap a tile."""
+    added = False
+    for length in sorted(matches, reverse=True):
+        for i, j in matches[length]:
+            if any(marked_a[i:i + length]) or any(marked_b[j:j + length]):
+                continue  # occluded; an unmarked remainder is found in a later round
+            marked_a[i:i + length] = b"\x01" * length
+            marked_b[j:j + length] = b"\x01" * length
+            tiles.append((i, j, length))
+            added = True
+    return added
+
+
+def greedy_string_tiling(a: list[int], b: list[int], min_match: int = DEFAULT_MIN_MATCH,
+                         initial_search: int = DEFAULT_INITIAL_SEARCH) -> list[tuple[int, int, int]]:
+    """Tiles (start_a, start_b, length) covering `a` and `b`, sorted by start_a.
+
+    `a` and `b` are sequences of token ids (non-negative ints). Matches shorter
+    than `min_match` tokens are never tiled.
+    """
+    if min_match < 1:
+        raise ValueError(f"min_match must be at least 1, got {min_match}")
+    # Lists index faster than arrays (e.g. Submission.token_ids) in the loops below
+    a, b = list(a), list(b)
+    marked_a, marked_b = bytearray(len(a)), bytearray(len(b))
+    tiles: list[tuple[int, int, int]] = []
+    s = max(initial_search, min_match)
+    while True:
+        longest, matches = _scan(a, b, marked_a, marked_b, s)
+        if longest > 2 * s:
+            # Much longer matches exist: rescan at that length before marking
+            s = longest
+            continue
+        added = _mark(matches, marked_a, marked_b, tiles)
+        if s > 2 * min_match:
+            s //= 2
+        elif s > min_match:
+            s = min_match
+        elif not added:
+            break
+    tiles.sort()
+    return tiles
+
+
+def tiling_coverage(tiles: list[tuple[int, int, int]], len_a: int, len_b: int) -> float:
+    """Fraction of both sequences covered by tiles, 2·covered / (len_a + len_b)."""
+    if not len_a and not len_b:
+        return 1.0
+    return 2 * sum(length for _, _, length in tiles) / (len_a + len_b)
@@ -0,0 +1,149 @@
+"""MinHash signatures and banded locality-sensitive hashing.
+
+Used by detect_plagiarism() to avoid scoring all n(n-1)/2 pairs on large
+cohorts. Each submission's token n-gram hashes are cut to 32 bits and
+summarized by a MinHash signature of `num_perm` values. Two signatures agree
+in any one position with probability equal to the Jaccard similarity of the
+n-gram sets.
+
+Signatures are cut into `bands` bands of `rows` values each. Submissions
+whose signatures agree on a whole band share a bucket and become a candidate
+pair. A pair with Jaccard similarity s becomes a candidate with probability
+1 - (1 - s^rows)^bands, an S-curve whose midpoint sits near the chosen
+threshold. Everything is seeded, so candidates are reproducible.
+"""
+
+import numpy as np
+
+DEFAULT_NUM_PERM = 128
+DEFAULT_THRESHOLD = 0.3
+# A missed copy costs more than scoring a few extra pairs exactly
+DEFAULT_RECALL_WEIGHT = 0.9
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def hash_ngrams(ngrams) -> np.ndarray:
+    """32-bit hash of each n-gram: the high half of its 64-bit hash (see src.ngrams).
+
+    The high bits of a multiplicative hash are the well mixed ones.
+    """
+    return np.fromiter(ngrams, dtype=np.uint64, count=len(ngrams)) >> np.uint64(32)
+
+
+def _permutations(num_perm: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+    b = rng.randint(0, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash_signatures(hash_sets: list, num_perm: int = DEFAULT_NUM_PERM, seed: int = 1) -> np.ndarray:
+    """MinHash signature of each set of 32-bit hashes, as an (n, num_perm) uint64 array.
+
+    Permutations are universal hashes (a * x + b) mod (2^61 - 1), truncated
+    to 32 bits. An empty set gets the all-max signature, which never shares
+    a bucket with a non-empty one.
+    """
+    a, b = _permutations(num_perm, seed)
+    signatures = np.full((len(hash_sets), num_perm), _MAX_HASH, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for i, hashes in enumerate(hash_sets):
+            if not len(hashes):
+                continue
+            values = np.asarray(hashes, dtype=np.uint64)[:, np.newaxis]
+            permuted = ((values * a + b) % _MERSENNE_PRIME) & _MAX_HASH
+            signatures[i] = permuted.min(axis=0)
+    return signatures
+
+
+def estimate_jaccard(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
+    """Jaccard similarity estimated from two MinHash signatures."""
+    return float(np.mean(signature_a == signature_b))
+
+
+def _candidate_probability(s: float, bands: int, rows: int) -> float:
+    return 1.0 - (1.0 - s ** rows) ** bands
+
+
+def optimal_bands(threshold: float, num_perm: int = DEFAULT_NUM_PERM,
+                  false_negative_weight: float = DEFAULT_RECALL_WEIGHT) -> tuple[int, int]:
+    """Choose (bands, rows) with bands * rows <= num_perm for a Jaccard threshold.
+
+    Minimizes the weighted area of false positives (pairs below `threshold`
+    that become candidates) and false negatives (pairs above it that do
+    not). Weighting false negatives higher trades extra candidates for recall.
+    """
+    steps = 200
+    grid = [(i + 0.5) / steps for i in range(steps)]
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        false_positive = sum(_candidate_probability(s, bands, rows) for s in grid if s < threshold)
+        false_negative = sum(1 - _candidate_probability(s, bands, rows) for s in grid if s >= threshold)
+        error = ((1 - false_negative_weight) * false_positive + false_negative_weight * false_negative) / steps
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHashLSH:
+    """Banded LSH index over MinHash signatures.
+
+    Args:
+        threshold: target Jaccard similarity of the token n-gram sets; pairs
+            above it become candidates with high probability
+        num_perm: signature length; more permutations sharpen the S-curve
+            (closer to exact) at a linear cost in time and memory
+        recall_weight: 0-1 weight of missed pairs against extra candidates
+            when choosing the bands; higher favours recall
+        seed: seed for the permutations
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = DEFAULT_NUM_PERM,
+                 recall_weight: float = DEFAULT_RECALL_WEIGHT, seed: int = 1):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.seed = seed
+        self.bands, self.rows = optimal_bands(threshold, num_perm, recall_weight)
+        self._buckets: list[dict[bytes, list[int]]] = [{} for _ in range(self.bands)]
+        self.size = 0
+
+    def add_signatures(self, signatures: np.ndarray) -> None:
+        """Insert signatures; their ids continue from the current index size."""
+        for offset, signature in enumerate(signatures):
+            item = self.size + offset
+            for band, buckets in enumerate(self._buckets):
+                key = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+                buckets.setdefault(key, []).append(item)
+        self.size += len(signatures)
+
+    def add(self, hash_sets: list) -> np.ndarray:
+        """Signature and insert each hash set. Returns the new signatures."""
+        signatures = minhash_signatures(hash_sets, self.num_perm, self.seed)
+        self.add_signatures(signatures)
+        return signatures
+
+    def candidate_pairs(self) -> set[tuple[int, int]]:
+        """All (i, j) with i < j that share a bucket in at least one band."""
+        pairs = set()
+        for buckets in self._buckets:
+            for items in buckets.values():
+                if len(items) < 2:
+                    continue
+                for x in range(len(items)):
+                    for y in range(x + 1, len(items)):
+                        pairs.add((items[x], items[y]))
+        return pairs
+
+
+def candidate_pairs(hash_sets: list, threshold: float = DEFAULT_THRESHOLD,
+                    num_perm: int = DEFAULT_NUM_PERM, recall_weight: float = DEFAULT_RECALL_WEIGHT,
+                    seed: int = 1) -> set[tuple[int, int]]:
+    """Index `hash_sets` and return the LSH candidate pairs (i, j), i < j."""
+    index = MinHashLSH(threshold, num_perm, recall_weight, seed)
+    index.add(hash_sets)
+    return index.candidate_pairs()
@@ -0,0 +1,75 @@
+"""Hashed token n-grams for the token layer.
+
+An n-gram is hashed from the 64-bit hashes of its tokens (see
+src.lexer.Vocabulary) as a polynomial in an odd base modulo 2^64, the same
+Karp-Rabin scheme as src.winnowing but with wrap-around arithmetic, which
+NumPy computes for every window at once. A submission's n-grams are kept as
+a sorted array of distinct hashes, about 8 bytes per n-gram where a set of
+string tuples took over 100, and two arrays are intersected by a merge
+(np.intersect1d) rather than by hashing every element again.
+
+    grams = ngram_hashes(sub.token_ids(), 3)   # sorted uint64 array
+    score = jaccard(grams, other_grams)
+
+Hashes depend only on the token texts, so they agree across processes and
+runs. Without NumPy the same hashes are returned as a frozenset.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # the pairwise engine still runs, on frozensets
+    np = None
+
+from src.lexer import VOCABULARY, Vocabulary
+
+_BASE = 0x100000001B3  # odd, so each step is a bijection mod 2^64
+_MASK = (1 << 64) - 1
+
+
+def ngram_hashes(ids, n: int, vocab: Vocabulary = VOCABULARY):
+    """Distinct hashes of the length-`n` windows of token ids `ids`, sorted.
+
+    Returns a uint64 array (a frozenset of ints without NumPy). A stream
+    shorter than `n` has no n-grams.
+    """
+    count = len(ids) - n + 1
+    if np is None:
+        if count <= 0:
+            return frozenset()
+        values = [vocab.hashes[token_id] for token_id in ids]
+        grams = set()
+        for i in range(count):
+            h = 0
+            for value in values[i:i + n]:
+                h = (h * _BASE + value) & _MASK
+            grams.add(h)
+        return frozenset(grams)
+    if count <= 0:
+        return np.empty(0, dtype=np.uint64)
+    # Not np.frombuffer(vocab.hashes): a live view would stop the array growing
+    values = np.fromiter(map(vocab.hashes.__getitem__, ids), dtype=np.uint64, count=len(ids))
+    base = np.uint64(_BASE)
+    hashes = values[:count].copy()
+    for k in range(1, n):
+        hashes *= base
+        hashes += values[k:k + count]
+    return np.unique(hashes)
+
+
+def shared_count(grams_a, grams_b) -> int:
+    """Number of hashes in both `grams_a` and `grams_b`."""
+    if np is not None and isinstance(grams_a, np.ndarray):
+        return len(np.intersect1d(grams_a, grams_b, assume_unique=True))
+    return len(grams_a & grams_b)
+
+
+def jaccard(grams_a, grams_b) -> float:
+    """Jaccard similarity of two n-gram hash sets (1.0 if both are empty)."""
+    size_a, size_b = len(grams_a), len(grams_b)
+    if not size_a and not size_b:
+        return 1.0
+    if not size_a or not size_b:
+        return 0.0
+    intersection = shared_count(grams_a, grams_b)
+    union = size_a + size_b - intersection
+    return intersection / union if union else 0.0
@@ -0,0 +1,244 @@
+"""Process-parallel exact pair scoring for detect_plagiarism().
+
+The pair space is cut into blocks of roughly equal size, and the blocks are
+scored in a process pool. Instead of pickling features into every task, the
+parent packs each submission's precomputed features into one
+multiprocessing.shared_memory segment as flat NumPy arrays:
+  * text layer: winnowed fingerprints (int64), or the UTF-8 normalized text
+    for the difflib method
+  * token layer: sorted uint64 token n-gram hashes (see src.ngrams), once
+    as tokenized for the submission's own language and, for mixed cohorts,
+    once generically
+  * structural layer: a dense int64 syntax node-type histogram and its norm
+Each array of variable-length rows is stored as values plus an offsets array.
+Workers attach to the segment once, intersect n-gram rows in place and
+rebuild fingerprint sets lazily.
+Tasks carry only block bounds, and results return as compact arrays.
+
+The per-pair arithmetic mirrors compute_pair_similarity() operation for
+operation, so every score is identical to the pairwise engine.
+"""
+
+import difflib
+import os
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+
+from src.ngrams import jaccard
+from src.winnowing import fingerprint_similarity
+
+# Blocks per worker: more blocks balance uneven rows, fewer cut overhead
+_BLOCKS_PER_WORKER = 4
+
+# ── Shared-memory packing ──
+
+
+def _pack(arrays: dict[str, np.ndarray]) -> tuple[shared_memory.SharedMemory, dict]:
+    """Copy `arrays` into one shared-memory segment.
+
+    Returns the segment and a manifest {name: (dtype, shape, byte offset)}
+    from which _views() rebuilds the arrays in another process.
+    """
+    manifest = {}
+    size = 0
+    for name, array in arrays.items():
+        size = -(-size // 8) * 8  # 8-byte alignment
+        manifest[name] = (array.dtype.str, array.shape, size)
+        size += array.nbytes
+    segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for name, array in arrays.items():
+        _, shape, offset = manifest[name]
+        np.ndarray(shape, array.dtype, segment.buf, offset)[...] = array
+    return segment, manifest
+
+
+def _views(segment: shared_memory.SharedMemory, manifest: dict) -> dict[str, np.ndarray]:
+    return {
+        name: np.ndarray(shape, np.dtype(dtype), segment.buf, offset)
+        for name, (dtype, shape, offset) in manifest.items()
+    }
+
+
+def _ragged(rows: list, dtype) -> tuple[np.ndarray, np.ndarray]:
+    """(offsets, values) for a list of variable-length integer rows (or arrays)."""
+    offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum([len(row) for row in rows], out=offsets[1:])
+    if rows and all(isinstance(row, np.ndarray) for row in rows):
+        return offsets, np.concatenate(rows).astype(dtype, copy=False)
+    values = np.fromiter((value for row in rows for value in row), dtype=dtype, count=int(offsets[-1]))
+    return offsets, values
+
+
+def feature_arrays(parsed: list, mixed: bool, text_method: str) -> dict[str, np.ndarray]:
+    """Flatten precomputed Submission features into the shared-memory layout."""
+    arrays = {}
+    if text_method == "difflib":
+        encoded = [sub.normalized.encode("utf-8") for sub in parsed]
+        arrays["text_offsets"], arrays["text_values"] = _ragged(encoded, np.uint8)
+    else:
+        arrays["fp_offsets"], arrays["fp_values"] = _ragged(
+            [sorted(sub.fingerprints) for sub in parsed], np.int64)
+
+    # N-gram hashes are already sorted arrays; workers intersect slices of them
+    tables = [("native", [sub.ngrams(3, sub.language) for sub in parsed])]
+    if mixed:
+        tables.append(("generic", [sub.ngrams(3, "Other") for sub in parsed]))
+    for table, gram_arrays in tables:
+        arrays[f"{table}_offsets"], arrays[f"{table}_values"] = _ragged(gram_arrays, np.uint64)
+
+    languages = {}
+    arrays["language"] = np.array([languages.setdefault(sub.language, len(languages)) for sub in parsed],
+                                  dtype=np.int32)
+    arrays["structured"] = np.array([sub.has_structure for sub in parsed], dtype=bool)
+    node_types = {}
+    for sub in parsed:
+        if sub.has_structure:
+            for node_type in sub.ast_histogram:
+                node_types.setdefault(node_type, len(node_types))
+    histograms = np.zeros((len(parsed), len(node_types)), dtype=np.int64)
+    norms = np.zeros(len(parsed), dtype=np.float64)
+    for row, sub in enumerate(parsed):
+        if sub.has_structure:
+            for node_type, count in sub.ast_histogram.items():
+                histograms[row, node_types[node_type]] = count
+            norms[row] = sub.ast_histogram_norm
+    arrays["histograms"] = histograms
+    arrays["norms"] = norms
+    return arrays
+
+
+# ── Worker side ──
+
+_segment = None
+_features: dict[str, np.ndarray] = {}
+_sets: dict[tuple[str, int], frozenset] = {}
+_matchers: dict[int, difflib.SequenceMatcher] = {}
+
+
+def _attach(name: str, manifest: dict) -> None:
+    """Pool initializer: map the parent's feature segment into this worker."""
+    global _segment, _features
+    _segment = shared_memory.SharedMemory(name=name)
+    _features = _views(_segment, manifest)
+    _sets.clear()
+    _matchers.clear()
+
+
+def _row_set(table: str, index: int) -> frozenset:
+    key = (table, index)
+    if key not in _sets:
+        offsets = _features[f"{table}_offsets"]
+        _sets[key] = frozenset(_features[f"{table}_values"][offsets[index]:offsets[index + 1]].tolist())
+    return _sets[key]
+
+
+def _row(table: str, index: int) -> np.ndarray:
+    offsets = _features[f"{table}_offsets"]
+    return _features[f"{table}_values"][offsets[index]:offsets[index + 1]]
+
+
+def _normalized(index: int) -> str:
+    offsets = _features["text_offsets"]
+    return _features["text_values"][offsets[index]:offsets[index + 1]].tobytes().decode("utf-8")
+
+
+def _text_similarity(i: int, j: int) -> float:
+    """As text_similarity(parsed[i], parsed[j], method)."""
+    if "fp_offsets" in _features:
+        return fingerprint_similarity(_row_set("fp", i), _row_set("fp", j))
+    norm_a = _normalized(i)
+    if j not in _matchers:
+        _matchers[j] = difflib.SequenceMatcher(None, "", _normalized(j))
+    matcher = _matchers[j]
+    if not norm_a and not matcher.b:
+        return 1.0
+    if not norm_a or not matcher.b:
+        return 0.0
+    matcher.set_seq1(norm_a)
+    return matcher.ratio()
+
+
+def _score_block(block: tuple) -> tuple[np.ndarray, ...]:
+    """Score one block of pairs.
+
+    A block is either (row_start, row_stop), meaning every pair (i, j) with
+    row_start <= i < row_stop and i < j, or (rows, cols) arrays of explicit
+    pairs. Returns (rows, cols, overall, text, token, structural) arrays,
+    with structural -1 where the pair has no structural layer.
+    """
+    n = len(_features["language"])
+    if isinstance(block[0], int):
+        start, stop = block
+        pairs = ((i, j) for i in range(start, stop) for j in range(i + 1, n))
+    else:
+        pairs = zip(block[0].tolist(), block[1].tolist())
+
+    language = _features["language"]
+    structured = _features["structured"]
+    histograms = _features["histograms"]
+    norms = _features["norms"]
+    columns = ([], [], [], [], [], [])
+    for i, j in pairs:
+        same_language = language[i] == language[j]
+        txt = _text_similarity(i, j)
+        table = "native" if same_language else "generic"
+        tok = jaccard(_row(table, i), _row(table, j))
+        if same_language and structured[i]:
+            # As structural_similarity(): integer dot product over the norms
+            struct = 0.0
+            if norms[i] and norms[j]:
+                struct = int(histograms[i] @ histograms[j]) / (float(norms[i]) * float(norms[j]))
+            overall = txt * 0.40 + tok * 0.30 + struct * 0.30
+        else:
+            struct = -1.0
+            overall = txt * 0.57 + tok * 0.43
+        for column, value in zip(columns, (i, j, overall, txt, tok, struct)):
+            column.append(value)
+    return (np.array(columns[0], dtype=np.int64), np.array(columns[1], dtype=np.int64),
+            *(np.array(column, dtype=np.float64) for column in columns[2:]))
+
+
+# ── Parent side ──
+
+
+def _row_blocks(n: int, blocks: int) -> list[tuple[int, int]]:
+    """Split rows 0..n-1 into ranges holding about the same number of pairs (i, j > i)."""
+    total = n * (n - 1) // 2
+    target = max(1, -(-total // max(blocks, 1)))
+    ranges = []
+    start = count = 0
+    for i in range(n - 1):
+        count += n - 1 - i
+        if count >= target:
+            ranges.append((start, i + 1))
+            start, count = i + 1, 0
+    if start < n - 1:
+        ranges.append((start, n - 1))
+    return ranges
+
+
+def score_blocks(parsed: list, mixed: bool, text_method: str, candidates=None,
+                 workers: int | None = None):
+    """Score pairs of precomputed Submissions in a process pool.
+
+    Scores every pair (i < j), or only `candidates` if given (a sorted list
+    of (i, j)). Yields (rows, cols, overall, text, token, structural) arrays
+    block by block, in pair order.
+    """
+    workers = workers or os.cpu_count() or 1
+    n = len(parsed)
+    if candidates is None:
+        blocks = _row_blocks(n, workers * _BLOCKS_PER_WORKER)
+    else:
+        pairs = np.array(candidates, dtype=np.int64).reshape(-1, 2)
+        blocks = [(chunk[:, 0], chunk[:, 1])
+                  for chunk in np.array_split(pairs, max(1, min(len(pairs), workers * _BLOCKS_PER_WORKER)))]
+
+    segment, manifest = _pack(feature_arrays(parsed, mixed, text_method))
+    try:
+        with get_context().Pool(workers, initializer=_attach, initargs=(segment.name, manifest)) as pool:
+            yield from pool.imap(_score_block, blocks)
+    finally:
+        segment.close()
+        segment.unlink()
@@ -1,152 +1,171 @@
 """Plagiarism / similarity detection engine.
 
 Pure algorithmic — no LLM calls. Combines three layers:
-  1. Text similarity (difflib SequenceMatcher)
+  1. Text similarity (winnowed k-gram fingerprints, or difflib SequenceMatcher)
   2. Token n-gram Jaccard similarity
-  3. AST structural cosine similarity (Python only)
+  3. Syntax-tree structural cosine similarity (Python AST, or tree-sitter
+     for the languages in src.ts_analyzer)
+and optionally a fourth:
+  4. Greedy String Tiling coverage of the token streams (use_gst=True)
 """
 
-import ast
-import difflib
-import io
-import math
-import re
-import tokenize
+import heapq
+import os
 from collections import Counter
+from functools import lru_cache
 from itertools import combinations
 
+from src import lexer, ngrams
+from src.gst import DEFAULT_MIN_MATCH, greedy_string_tiling, tiling_coverage
+from src.submission import Submission, as_submission
+from src.winnowing import fingerprint_similarity
+
 
 # ── Layer 1: Text similarity ──
 
 def normalize_code(code: str) -> str:
-    """Strip comments, blank lines, normalize whitespace."""
-    lines = code.splitlines()
-    cleaned = []
-    for line in lines:
-        # Remove inline comments (simple heuristic — works for Python/#-style)
-        stripped = line.split("#")[0].rstrip()
-        # Remove C-style single-line comments
-        stripped = re.sub(r"//.*$", "", stripped).rstrip()
-        if stripped.strip():
-            cleaned.append(stripped)
-    return "\n".join(cleaned)
-
-
-def text_similarity(code_a: str, code_b: str) -> float:
-    """SequenceMatcher ratio on normalized code. Returns 0.0-1.0."""
-    norm_a = normalize_code(code_a)
-    norm_b = normalize_code(code_b)
+    """Strip comments, blank lines, normalize whitespace (see src.lexer.normalize)."""
+    return lexer.normalize(code)
+
+
+TEXT_METHODS = ("winnow", "difflib")
+
+
+def text_similarity(
+    code_a: str | Submission, code_b: str | Submission, method: str = "winnow"
+) -> float:
+    """Similarity of normalized code. Returns 0.0-1.0.
+
+    method="winnow" (default) compares winnowed k-gram fingerprint sets
+    (MOSS-style): linear-time per file, and a set overlap per pair.
+    method="difflib" is the original SequenceMatcher ratio, quadratic in
+    the worst case.
+    """
+    if method not in TEXT_METHODS:
+        raise ValueError(f"Unknown text similarity method: {method!r}")
+    code_a = as_submission(code_a, "Other")
+    code_b = as_submission(code_b, "Other")
+    if method == "winnow":
+        return fingerprint_similarity(code_a.fingerprints, code_b.fingerprints)
+    norm_a = code_a.normalized
+    norm_b = code_b.normalized
     if not norm_a and not norm_b:
         return 1.0
     if not norm_a or not norm_b:
         return 0.0
-    return difflib.SequenceMatcher(None, norm_a, norm_b).ratio()
+    # Reuse code_b's index of its normalized text instead of rebuilding it per pair
+    matcher = code_b.text_matcher
+    matcher.set_seq1(norm_a)
+    return matcher.ratio()
 
 
 # ── Layer 2: Token n-gram similarity ──
 
 def tokenize_code(code: str, language: str) -> list[str]:
-    """Tokenize code into normalized tokens.
+    """Tokenize code into normalized tokens (see src.lexer).
 
-    For Python: uses the stdlib tokenizer (strips comments & strings).
-    For other languages: regex-based word splitter.
+    For Python: the stdlib tokenizer's tokens (strips comments & strings).
+    For other languages: lowercased words and single characters.
     """
-    if language.lower() == "python":
-        return _tokenize_python(code)
-    return _tokenize_generic(code)
+    return lexer.tokens(code, language)
 
 
-def _tokenize_python(code: str) -> list[str]:
-    """Tokenize Python source using the stdlib tokenizer."""
-    tokens = []
-    try:
-        readline = io.BytesIO(code.encode("utf-8")).readline
-        for tok in tokenize.tokenize(readline):
-            if tok.type in (tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE,
-                            tokenize.INDENT, tokenize.DEDENT, tokenize.ENCODING,
-                            tokenize.ENDMARKER):
-                continue
-            if tok.type == tokenize.STRING:
-                tokens.append("__STR__")
-            elif tok.type == tokenize.NUMBER:
-                tokens.append("__NUM__")
-            elif tok.type == tokenize.NAME:
-                tokens.append(tok.string.lower())
-            else:
-                tokens.append(tok.string)
-    except tokenize.TokenizeError:
-        return _tokenize_generic(code)
-    return tokens
-
-
-def _tokenize_generic(code: str) -> list[str]:
-    """Fallback regex word splitter for non-Python code."""
-    # Remove string literals
-    code = re.sub(r'"(?:[^"\\]|\\.)*"', "__STR__", code)
-    code = re.sub(r"'(?:[^'\\]|\\.)*'", "__STR__", code)
-    # Remove single-line comments
-    code = re.sub(r"//.*$", "", code, flags=re.MULTILINE)
-    code = re.sub(r"#.*$", "", code, flags=re.MULTILINE)
-    # Remove multi-line comments
-    code = re.sub(r"/\*.*?\*/", "", code, flags=re.DOTALL)
-    # Split into word and operator tokens
-    return [t.lower() for t in re.findall(r"[a-zA-Z_]\w*|[^\s]", code) if t.strip()]
-
-
-def _ngrams(tokens: list[str], n: int) -> set[tuple[str, ...]]:
-    """Generate a set of n-grams from a token list."""
-    if len(tokens) < n:
-        return set()
-    return {tuple(tokens[i : i + n]) for i in range(len(tokens) - n + 1)}
-
-
-def ngram_similarity(code_a: str, code_b: str, language: str, n: int = 3) -> float:
-    """Jaccard similarity on token n-grams. Returns 0.0-1.0."""
-    toks_a = tokenize_code(code_a, language)
-    toks_b = tokenize_code(code_b, language)
-    grams_a = _ngrams(toks_a, n)
-    grams_b = _ngrams(toks_b, n)
-    if not grams_a and not grams_b:
-        return 1.0
-    if not grams_a or not grams_b:
-        return 0.0
-    intersection = len(grams_a & grams_b)
-    union = len(grams_a | grams_b)
-    return intersection / union if union else 0.0
+def tokenize_code_lines(code: str, language: str) -> tuple[list[str], list[int]]:
+    """tokenize_code() plus the 1-based source line of each token."""
+    ids, lines = lexer.lex(code, language, lines=True)
+    return lexer.VOCABULARY.decode(ids), lines
+
+
+def ngram_similarity(
+    code_a: str | Submission, code_b: str | Submission, language: str, n: int = 3
+) -> float:
+    """Jaccard similarity on token n-grams (hashed, see src.ngrams). Returns 0.0-1.0."""
+    grams_a = as_submission(code_a, language).ngrams(n, language)
+    grams_b = as_submission(code_b, language).ngrams(n, language)
+    return ngrams.jaccard(grams_a, grams_b)
+
 
+# ── Layer 3: Structural similarity (Python AST or tree-sitter) ──
 
-# ── Layer 3: AST structural similarity (Python only) ──
+@lru_cache(maxsize=None)
+def has_structure(language: str) -> bool:
+    """Whether the structural layer applies to `language`.
 
-def ast_node_histogram(code: str) -> dict[str, int]:
-    """Count each AST node type. Returns {node_type: count}."""
+    True for Python, and for tree-sitter languages whose grammar loads.
+    """
+    if language.lower() == "python":
+        return True
     try:
-        tree = ast.parse(code)
-    except SyntaxError:
-        return {}
-    counter: dict[str, int] = {}
-    for node in ast.walk(tree):
-        name = type(node).__name__
-        counter[name] = counter.get(name, 0) + 1
-    return counter
-
-
-def structural_similarity(code_a: str, code_b: str) -> float:
-    """Cosine similarity of AST node histograms. Returns 0.0-1.0."""
-    hist_a = ast_node_histogram(code_a)
-    hist_b = ast_node_histogram(code_b)
+        from src.ts_analyzer import _get_parser
+        return _get_parser(language)[0] is not None
+    except ImportError:
+        return False
+
+
+def ast_node_histogram(code: str | Submission, language: str = "Python") -> dict[str, int]:
+    """Count each syntax node type. Returns {node_type: count}."""
+    return as_submission(code, language).ast_histogram
+
+
+def structural_similarity(code_a: str | Submission, code_b: str | Submission, language: str = "Python") -> float:
+    """Cosine similarity of syntax node histograms. Returns 0.0-1.0.
+
+    Raw code is parsed as `language`; Submissions use their own language.
+    """
+    code_a = as_submission(code_a, language)
+    code_b = as_submission(code_b, language)
+    hist_a = code_a.ast_histogram
+    hist_b = code_b.ast_histogram
     if not hist_a or not hist_b:
         return 0.0
-    all_keys = set(hist_a) | set(hist_b)
-    vec_a = [hist_a.get(k, 0) for k in all_keys]
-    vec_b = [hist_b.get(k, 0) for k in all_keys]
-    dot = sum(a * b for a, b in zip(vec_a, vec_b))
-    mag_a = math.sqrt(sum(a * a for a in vec_a))
-    mag_b = math.sqrt(sum(b * b for b in vec_b))
+    if len(hist_b) < len(hist_a):
+        hist_a, hist_b = hist_b, hist_a
+    dot = sum(count * hist_b.get(name, 0) for name, count in hist_a.items())
+    mag_a = code_a.ast_histogram_norm
+    mag_b = code_b.ast_histogram_norm
     if mag_a == 0 or mag_b == 0:
         return 0.0
     return dot / (mag_a * mag_b)
 
 
+# ── Layer 4: Greedy String Tiling (optional) ──
+
+def gst_matches(code_a: str | Submission, code_b: str | Submission, language: str,
+                min_match: int = DEFAULT_MIN_MATCH) -> dict:
+    """Greedy String Tiling of the two token streams (see src.gst).
+
+    Returns dict with keys:
+        score — float 0.0-1.0, share of both token streams covered by tiles
+        tiles — list of {'a_lines', 'b_lines', 'tokens'}: each tile's
+                inclusive (first, last) source lines in each file and its
+                length in tokens, longest first
+    """
+    code_a = as_submission(code_a, language)
+    code_b = as_submission(code_b, language)
+    ids_a, ids_b = code_a.token_ids(language), code_b.token_ids(language)
+    tiles = greedy_string_tiling(ids_a, ids_b, min_match)
+    lines_a, lines_b = code_a.token_lines(language), code_b.token_lines(language)
+    return {
+        "score": tiling_coverage(tiles, len(ids_a), len(ids_b)),
+        "tiles": [
+            {
+                "a_lines": (lines_a[i], lines_a[i + length - 1]),
+                "b_lines": (lines_b[j], lines_b[j + length - 1]),
+                "tokens": length,
+            }
+            for i, j, length in sorted(tiles, key=lambda tile: (-tile[2], tile[0]))
+        ],
+    }
+
+
+def gst_similarity(code_a: str | Submission, code_b: str | Submission, language: str) -> float:
+    """Greedy String Tiling coverage of the token streams. Returns 0.0-1.0."""
+    code_a = as_submission(code_a, language)
+    code_b = as_submission(code_b, language)
+    ids_a, ids_b = code_a.token_ids(language), code_b.token_ids(language)
+    return tiling_coverage(greedy_string_tiling(ids_a, ids_b), len(ids_a), len(ids_b))
+
+
 # ── Combined similarity ──
 
 _FLAG_HIGH = 80.0
@@ -161,83 +180,440 @@ def _flag_label(score: float) -> str:
     return "low"
 
 
-def compute_pair_similarity(code_a: str, code_b: str, language: str) -> dict:
-    """Combine all layers into an overall similarity score.
+# Share of the overall score taken by the optional GST layer; the other
+# layers keep their relative weights in the remaining share
+_GST_WEIGHT = 0.25
 
-    Returns dict with keys:
-        overall   — float 0-100
-        text_sim  — float 0-100
-        token_sim — float 0-100
-        structural_sim — float 0-100, or None if not Python
-        flag      — 'high' | 'medium' | 'low'
-    """
-    txt = text_similarity(code_a, code_b)
-    tok = ngram_similarity(code_a, code_b, language)
 
-    is_python = language.lower() == "python"
-    if is_python:
-        struct = structural_similarity(code_a, code_b)
+def _weighted_overall(txt: float, tok: float, struct: float, structured: bool, gst: float | None = None) -> float:
+    if structured:
         # Weights: text 40%, token 30%, structural 30%
         overall = txt * 0.40 + tok * 0.30 + struct * 0.30
-        struct_pct = round(struct * 100, 1)
     else:
         # Redistribute structural weight: text 57%, token 43%
         overall = txt * 0.57 + tok * 0.43
-        struct_pct = None
+    if gst is None:
+        return overall
+    return overall * (1 - _GST_WEIGHT) + gst * _GST_WEIGHT
 
-    overall_pct = round(overall * 100, 1)
 
-    return {
+def _pair_result(txt: float, tok: float, struct: float, structured: bool, gst: float | None = None) -> dict:
+    overall_pct = round(_weighted_overall(txt, tok, struct, structured, gst) * 100, 1)
+    result = {
         "overall": overall_pct,
         "text_sim": round(txt * 100, 1),
         "token_sim": round(tok * 100, 1),
-        "structural_sim": struct_pct,
+        "structural_sim": round(struct * 100, 1) if structured else None,
         "flag": _flag_label(overall_pct),
     }
+    if gst is not None:
+        result["gst_sim"] = round(gst * 100, 1)
+    return result
 
 
-def detect_plagiarism(submissions: list[dict], threshold: float = 60.0) -> dict:
-    """Run pairwise comparison on all submissions.
+def _size_bound(size_a: int, size_b: int, dice: bool) -> float:
+    """Upper bound on the Dice (or Jaccard) similarity of sets of these sizes."""
+    if not size_a and not size_b:
+        return 1.0
+    if not size_a or not size_b:
+        return 0.0
+    small, large = min(size_a, size_b), max(size_a, size_b)
+    return 2 * small / (small + large) if dice else small / large
 
-    Args:
-        submissions: list of {'name': str, 'code': str, 'language': str}
-        threshold: minimum overall % to flag a pair
+
+def _cascade_pair_similarity(code_a: Submission, code_b: Submission, language: str,
+                             text_method: str, threshold: float, use_gst: bool = False) -> dict | None:
+    """compute_pair_similarity() that stops once `threshold` is out of reach.
+
+    Every layer starts at a cheap upper bound (set sizes, the difflib
+    length ratio, 1.0 for structure, token counts for GST), and bounds are replaced by exact
+    scores cheapest-first. After each step the weighted overall of the
+    current bounds is checked; bounds only ever shrink toward the exact
+    scores with the same float operations, so a pair is dropped only if its
+    exact overall would also round below `threshold`.
+    """
+    structured = has_structure(language)
+
+    def reachable() -> bool:
+        return round(_weighted_overall(txt, tok, struct, structured, gst) * 100, 1) >= threshold
+
+    grams_a = code_a.ngrams(3, language)
+    grams_b = code_b.ngrams(3, language)
+    tok = _size_bound(len(grams_a), len(grams_b), dice=False)
+    struct = 1.0
+    gst = None
+    if use_gst:
+        # Tiles cover at most the shorter stream, in both streams
+        gst = _size_bound(len(code_a.token_ids(language)), len(code_b.token_ids(language)), dice=True)
+    if text_method == "winnow":
+        txt = _size_bound(len(code_a.fingerprints), len(code_b.fingerprints), dice=True)
+    else:
+        norm_a, matcher = code_a.normalized, code_b.text_matcher
+        txt = 1.0 if not norm_a and not matcher.b else 0.0
+        if norm_a and matcher.b:
+            matcher.set_seq1(norm_a)
+            txt = matcher.real_quick_ratio()
+    if not reachable():
+        return None
+
+    if text_method == "winnow":
+        txt = text_similarity(code_a, code_b, text_method)
+        if not reachable():
+            return None
+    tok = ngram_similarity(code_a, code_b, language)
+    if not reachable():
+        return None
+    if structured:
+        struct = structural_similarity(code_a, code_b)
+        if not reachable():
+            return None
+    if use_gst:
+        gst = gst_similarity(code_a, code_b, language)
+        if not reachable():
+            return None
+    if text_method == "difflib" and norm_a and matcher.b:
+        # quick_ratio() counts shared characters in linear time; ratio()
+        # (the expensive matching) runs only for the pairs still in reach
+        txt = matcher.quick_ratio()
+        if not reachable():
+            return None
+        txt = matcher.ratio()
+    return _pair_result(txt, tok, struct, structured, gst)
+
+
+def compute_pair_similarity(
+    code_a: str | Submission, code_b: str | Submission, language: str,
+    text_method: str = "winnow", threshold: float | None = None, use_gst: bool = False,
+) -> dict | None:
+    """Combine all layers into an overall similarity score.
+
+    Accepts raw code or Submission objects; with Submissions the parse,
+    token and normalization work is shared across every pair they appear in.
+    `text_method` selects the text layer (see text_similarity).
+
+    If `threshold` (overall %, 0-100) is given, layers are evaluated as a
+    cascade of cheap upper bounds, and None is returned as soon as the pair
+    provably cannot reach the threshold. Pairs that can are scored exactly.
+
+    `use_gst` adds Greedy String Tiling of the token streams as a fourth
+    layer (see gst_similarity), weighted 25% of the overall score.
 
     Returns dict with keys:
-        pairs         — list of pair result dicts (sorted by similarity desc)
-        matrix        — NxN similarity matrix (list of lists)
-        names         — ordered file names
-        flagged_count — number of pairs >= threshold
-        threshold     — the threshold used
+        overall   — float 0-100
+        text_sim  — float 0-100
+        token_sim — float 0-100
+        structural_sim — float 0-100, or None without a structural layer
+                         (see has_structure; mixed-language pairs are "Other")
+        gst_sim   — float 0-100, only with use_gst
+        flag      — 'high' | 'medium' | 'low'
     """
-    n = len(submissions)
-    names = [s["name"] for s in submissions]
-    matrix = [[100.0 if i == j else 0.0 for j in range(n)] for i in range(n)]
-    pairs = []
+    if text_method not in TEXT_METHODS:
+        raise ValueError(f"Unknown text similarity method: {text_method!r}")
+    code_a = as_submission(code_a, language)
+    code_b = as_submission(code_b, language)
+    if threshold is not None:
+        return _cascade_pair_similarity(code_a, code_b, language, text_method, threshold, use_gst)
+
+    txt = text_similarity(code_a, code_b, text_method)
+    tok = ngram_similarity(code_a, code_b, language)
+    structured = has_structure(language)
+    struct = structural_similarity(code_a, code_b) if structured else 0.0
+    gst = gst_similarity(code_a, code_b, language) if use_gst else None
+    return _pair_result(txt, tok, struct, structured, gst)
+
+
+def _lsh_candidates(parsed: list[Submission], mixed: bool, lsh_threshold: float,
+                    num_perm: int) -> list[tuple[int, int]]:
+    """Pairs whose token n-gram sets are likely to reach `lsh_threshold` Jaccard."""
+    from src.lsh import candidate_pairs, hash_ngrams
+
+    hash_sets = [hash_ngrams(sub.ngrams(3, "Other" if mixed else sub.language)) for sub in parsed]
+    return sorted(candidate_pairs(hash_sets, lsh_threshold, num_perm))
+
+
+def _pairwise(parsed: list[Submission], candidates, text_method: str, threshold: float | None = None,
+              use_gst: bool = False):
+    """Yield (i, j, result) for each candidate pair, scored one pair at a time.
 
-    for i, j in combinations(range(n), 2):
-        lang = submissions[i]["language"]
+    With a `threshold`, result is None for pairs pruned by the cascade.
+    """
+    for i, j in candidates:
+        lang = parsed[i].language
         # If languages differ, use the first one (or generic)
-        if submissions[j]["language"] != lang:
+        if parsed[j].language != lang:
             lang = "Other"
-        result = compute_pair_similarity(
-            submissions[i]["code"], submissions[j]["code"], lang
+        yield i, j, compute_pair_similarity(parsed[i], parsed[j], lang, text_method, threshold, use_gst)
+
+
+def _score_rows(rows, cols, overall, text, token, structural):
+    """Yield (i, j, result) from parallel lists of raw 0-1 scores (structural < 0: no structural layer)."""
+    for i, j, total, txt, tok, struct in zip(rows, cols, overall, text, token, structural):
+        overall_pct = round(total * 100, 1)
+        yield i, j, {
+            "overall": overall_pct,
+            "text_sim": round(txt * 100, 1),
+            "token_sim": round(tok * 100, 1),
+            "structural_sim": round(struct * 100, 1) if struct >= 0 else None,
+            "flag": _flag_label(overall_pct),
+        }
+
+
+def _vectorized_pairs(parsed: list[Submission]):
+    """Yield (i, j, result) for all pairs, scored by the vectorized engine."""
+    import numpy as np
+    from src.similarity_matrix import score_matrices
+
+    scores = score_matrices(parsed)
+    structural = np.where(np.isnan(scores["structural"]), -1.0, scores["structural"])
+    n = len(parsed)
+    # Row by row, so only one row of Python floats exists at a time
+    for i in range(n - 1):
+        yield from _score_rows(
+            [i] * (n - 1 - i), range(i + 1, n),
+            scores["overall"][i, i + 1:].tolist(),
+            scores["text"][i, i + 1:].tolist(),
+            scores["token"][i, i + 1:].tolist(),
+            structural[i, i + 1:].tolist(),
         )
-        matrix[i][j] = result["overall"]
-        matrix[j][i] = result["overall"]
-        pairs.append({
-            "sub_a": names[i],
-            "sub_b": names[j],
-            **result,
-        })
+
+
+def _parallel_pairs(parsed: list[Submission], mixed: bool, text_method: str, candidates,
+                    workers: int | None):
+    """Yield (i, j, result) for the candidate pairs, scored in a process pool."""
+    from src.parallel_scoring import score_blocks
+
+    for block in score_blocks(parsed, mixed, text_method, candidates, workers):
+        yield from _score_rows(*(column.tolist() for column in block))
+
+
+# Below this many pairs, process start-up costs more than parallel scoring saves
+_PARALLEL_MIN_PAIRS = 20_000
+
+OUTPUT_MODES = ("full", "threshold", "top_k")
+MATRIX_FORMATS = ("dense", "condensed", "sparse")
+
+
+class _MatrixBuilder:
+    """Collects pair scores into the requested matrix format.
+
+    dense     — N×N list of lists (100.0 on the diagonal), every scored pair
+    condensed — float32 array of the N(N-1)/2 upper-triangle scores in
+                scipy.spatial.distance.squareform order, every scored pair
+    sparse    — symmetric scipy.sparse CSR float32 matrix of the pairs kept
+                in the output only (implicit zeros elsewhere, including the
+                diagonal)
+    """
+
+    def __init__(self, n: int, matrix_format: str):
+        self.n = n
+        self.format = matrix_format
+        if matrix_format == "dense":
+            self.values = [[100.0 if i == j else 0.0 for j in range(n)] for i in range(n)]
+        elif matrix_format == "condensed":
+            import numpy as np
+            self.values = np.zeros(n * (n - 1) // 2, dtype=np.float32)
+        else:
+            self.values = ([], [], [])
+
+    def scored(self, i: int, j: int, overall: float) -> None:
+        if self.format == "dense":
+            self.values[i][j] = overall
+            self.values[j][i] = overall
+        elif self.format == "condensed":
+            self.values[self.n * i - i * (i + 1) // 2 + j - i - 1] = overall
+
+    def kept(self, i: int, j: int, overall: float) -> None:
+        if self.format == "sparse":
+            rows, cols, values = self.values
+            rows += (i, j)
+            cols += (j, i)
+            values += (overall, overall)
+
+    def build(self):
+        if self.format != "sparse":
+            return self.values
+        import numpy as np
+        from scipy import sparse
+
+        rows, cols, values = self.values
+        return sparse.csr_matrix((np.array(values, dtype=np.float32), (rows, cols)), shape=(self.n, self.n))
+
+
+def _check_output(output: str, top_k: int, matrix_format: str | None) -> str:
+    """Validate the output arguments of detect_plagiarism(); returns the matrix format."""
+    if output not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode: {output!r}")
+    if output == "top_k" and top_k < 1:
+        raise ValueError(f"top_k must be at least 1, got {top_k}")
+    matrix_format = matrix_format or ("dense" if output == "full" else "sparse")
+    if matrix_format not in MATRIX_FORMATS:
+        raise ValueError(f"Unknown matrix format: {matrix_format!r}")
+    return matrix_format
+
+
+def collect_results(scored, names: list[str], threshold: float, output: str = "full", top_k: int = 5,
+                    matrix_format: str | None = None) -> dict:
+    """Build the detect_plagiarism() result from a stream of (i, j, result).
+
+    `scored` yields each pair once with i < j, in pair order; result None
+    marks a pair pruned by the cascade. See detect_plagiarism() for the
+    output arguments and the returned dict.
+    """
+    matrix_format = _check_output(output, top_k, matrix_format)
+    n = len(names)
+    matrix = _MatrixBuilder(n, matrix_format)
+    pairs = []
+    nearest = [[] for _ in range(n)] if output == "top_k" else None
+
+    compared = flagged_count = pruned = 0
+    total = 0.0
+    best = 0.0
+    flags = {"high": 0, "medium": 0, "low": 0}
+    for i, j, result in scored:
+        if result is None:
+            pruned += 1
+            continue
+        overall = result["overall"]
+        compared += 1
+        total += overall
+        best = max(best, overall)
+        flags[result["flag"]] += 1
+        flagged_count += overall >= threshold
+        matrix.scored(i, j, overall)
+
+        if output == "full" or (output == "threshold" and overall >= threshold):
+            matrix.kept(i, j, overall)
+            pairs.append({"sub_a": names[i], "sub_b": names[j], **result})
+        elif output == "top_k":
+            # Min-heaps of (overall, -partner, pair): the weakest kept pair is on top
+            for heap, partner in ((nearest[i], j), (nearest[j], i)):
+                entry = (overall, -partner, (i, j, result))
+                if len(heap) < top_k:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+
+    if output == "top_k":
+        kept = {entry[2][:2]: entry[2][2] for heap in nearest for entry in heap}
+        for i, j in sorted(kept):
+            matrix.kept(i, j, kept[i, j]["overall"])
+            pairs.append({"sub_a": names[i], "sub_b": names[j], **kept[i, j]})
 
     pairs.sort(key=lambda p: p["overall"], reverse=True)
-    flagged_count = sum(1 for p in pairs if p["overall"] >= threshold)
 
     return {
         "pairs": pairs,
-        "matrix": matrix,
+        "matrix": matrix.build(),
         "names": names,
         "flagged_count": flagged_count,
         "threshold": threshold,
+        "compared_pairs": compared,
+        "summary": {
+            "max": best,
+            "mean": round(total / compared, 1) if compared else 0.0,
+            **flags,
+            "pruned": pruned,
+        },
     }
+
+
+def detect_plagiarism(
+    submissions: list[dict], threshold: float = 60.0, text_method: str = "winnow",
+    lsh_threshold: float | None = None, num_perm: int = 128, engine: str = "auto",
+    workers: int | None = None, output: str = "full", top_k: int = 5, matrix_format: str | None = None,
+    cascade: bool = False, use_gst: bool = False,
+) -> dict:
+    """Run pairwise comparison on all submissions.
+
+    Args:
+        submissions: list of {'name': str, 'code': str, 'language': str}
+        threshold: minimum overall % to flag a pair
+        text_method: "winnow" (default) or "difflib", see text_similarity()
+        lsh_threshold: if set, only score pairs that MinHash/LSH finds likely
+            to have at least this token n-gram Jaccard similarity (0-1);
+            the rest are skipped and left at 0 in the matrix. None (default)
+            scores all pairs exactly.
+        num_perm: MinHash signature length for lsh_threshold; higher values
+            make candidate selection closer to exact, at linear extra cost
+        engine: "vectorized" builds every layer's N×N matrix at once with
+            NumPy/SciPy (winnow text layer, all pairs); "parallel" scores
+            blocks of pairs in a process pool that reads features from shared
+            memory; "pairwise" scores pairs one by one in this process.
+            "auto" (default) picks vectorized when it applies and SciPy is
+            installed, else parallel for large cohorts on several cores.
+            All engines give identical scores.
+        workers: process count for the parallel engine (default: CPU count)
+        output: which pairs to return — "full" (default) every scored pair,
+            "threshold" only pairs >= threshold, "top_k" each submission's
+            `top_k` most similar partners. Only the kept pairs are held in
+            memory; the counts and summary always cover every scored pair.
+        top_k: partners kept per submission with output="top_k"
+        matrix_format: "dense", "condensed" or "sparse", see _MatrixBuilder.
+            Defaults to dense for output="full" and sparse (SciPy) otherwise.
+        cascade: stop scoring a pair as soon as cheap upper bounds show it
+            cannot reach `threshold` (see compute_pair_similarity). Pruned
+            pairs are left at 0 in the matrix, left out of pairs and summary
+            scores, and counted in summary['pruned']; flagged_count stays
+            exact. Uses the pairwise engine.
+        use_gst: add the Greedy String Tiling layer to every pair (see
+            compute_pair_similarity). Uses the pairwise engine.
+
+    Returns dict with keys:
+        pairs         — list of kept pair result dicts (sorted by similarity desc)
+        matrix        — similarity matrix in `matrix_format`
+        names         — ordered file names
+        flagged_count — number of pairs >= threshold
+        threshold     — the threshold used
+        compared_pairs — number of pairs actually scored
+        summary       — {'max', 'mean', 'high', 'medium', 'low', 'pruned'}:
+                        overall score max/mean and counts per flag over all
+                        scored pairs, and pairs dropped by the cascade
+    """
+    matrix_format = _check_output(output, top_k, matrix_format)
+    n = len(submissions)
+    names = [s["name"] for s in submissions]
+    # Parse/tokenize/normalize each file once up front, so pairs below are
+    # scored from cached features only
+    parsed = [Submission(s["code"], s["language"], s["name"]) for s in submissions]
+    mixed = len({s.language for s in parsed}) > 1
+    for sub in parsed:
+        sub.precompute((sub.language, "Other") if mixed else (sub.language,), text_method)
+    if engine not in ("auto", "vectorized", "parallel", "pairwise"):
+        raise ValueError(f"Unknown engine: {engine!r}")
+    vectorizable = text_method == "winnow" and lsh_threshold is None
+    if engine == "vectorized" and not vectorizable:
+        raise ValueError('engine="vectorized" needs text_method="winnow" and no lsh_threshold')
+    if cascade and engine not in ("auto", "pairwise"):
+        raise ValueError(f'cascade=True needs the pairwise engine, got engine={engine!r}')
+    if use_gst and engine not in ("auto", "pairwise"):
+        raise ValueError(f'use_gst=True needs the pairwise engine, got engine={engine!r}')
+
+    if lsh_threshold is None:
+        candidates = None
+    else:
+        candidates = _lsh_candidates(parsed, mixed, lsh_threshold, num_perm)
+    if engine == "auto":
+        engine = "pairwise"
+        if vectorizable and not (cascade or use_gst):
+            try:
+                import src.similarity_matrix  # noqa: F401  (needs NumPy and SciPy)
+                engine = "vectorized"
+            except ImportError:
+                pass
+        pair_count = n * (n - 1) // 2 if candidates is None else len(candidates)
+        if engine == "pairwise" and not (cascade or use_gst) and pair_count >= _PARALLEL_MIN_PAIRS and (workers or os.cpu_count() or 1) > 1:
+            try:
+                import src.parallel_scoring  # noqa: F401  (needs NumPy)
+                engine = "parallel"
+            except ImportError:
+                pass
+
+    if engine == "vectorized":
+        scored = _vectorized_pairs(parsed)
+    elif engine == "parallel":
+        scored = _parallel_pairs(parsed, mixed, text_method, candidates, workers)
+    else:
+        scored = _pairwise(parsed, combinations(range(n), 2) if candidates is None else candidates,
+                           text_method, threshold if cascade else None, use_gst)
+
+    return collect_results(scored, names, threshold, output, top_k, matrix_format)
@@ -0,0 +1,128 @@
+"""Reference analysis of a problem statement, computed once per problem.
+
+Every submission to a problem would otherwise make the model work out the
+optimal complexity and the edge cases again. One LLM call per problem
+derives them, plus a short reference approach; format_prompt() then shows
+the result to the model for each submission, whose response no longer
+carries "expected_optimal" or "better_approach" (evaluate_code() fills them
+in from the reference).
+
+    reference = analyze_problem(problem_statement)   # one LLM call, then cached
+    evaluate_code(code, language, problem_statement, problem_analysis=reference)
+
+Results are cached by problem_hash() of the statement: in this process, and
+with `cache_path` also in a JSON file shared between runs. Statements that
+differ only in whitespace share an entry.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+from src.llm_client import call_llm
+from src.prompts import PROBLEM_ANALYSIS_PROMPT, PROBLEM_ANALYSIS_SYSTEM_PROMPT
+from src.utils import extract_json
+
+# The reference is injected into every submission prompt, so it is kept short
+MAX_EDGE_CASES = 8
+MAX_FIELD_CHARS = 400
+
+_memory_cache: dict[str, dict] = {}
+
+
+def problem_hash(problem_statement: str) -> str:
+    """SHA-256 of the statement with runs of whitespace collapsed."""
+    normalized = " ".join(problem_statement.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _clip(value, limit: int = MAX_FIELD_CHARS) -> str:
+    return re.sub(r"\s+", " ", str(value)).strip()[:limit]
+
+
+def _validate(data: dict) -> dict | None:
+    """The reference fields of a parsed response, or None if any is missing."""
+    fields = ("optimal_time", "optimal_space", "reference_approach")
+    if not all(isinstance(data.get(key), str) and data[key].strip() for key in fields):
+        return None
+    edge_cases = data.get("edge_cases")
+    if not isinstance(edge_cases, list):
+        edge_cases = []
+    return {
+        "optimal_time": _clip(data["optimal_time"], 40),
+        "optimal_space": _clip(data["optimal_space"], 40),
+        "edge_cases": [_clip(case, 120) for case in edge_cases if str(case).strip()][:MAX_EDGE_CASES],
+        "reference_approach": _clip(data["reference_approach"]),
+    }
+
+
+def _read_cache(cache_path: str) -> dict:
+    try:
+        with open(cache_path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_cache(cache_path: str, entries: dict) -> None:
+    # Write-then-rename, so a crash or a concurrent reader never sees half a file
+    directory = os.path.dirname(os.path.abspath(cache_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".problem-cache-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(entries, f, indent=1)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def analyze_problem(problem_statement: str, cache_path: str | None = None) -> dict | None:
+    """Reference analysis of `problem_statement`, from the cache or one LLM call.
+
+    Returns:
+        dict with "optimal_time", "optimal_space", "edge_cases" (list of
+        short strings), "reference_approach" and "problem_hash"; None for an
+        empty statement or when the LLM gives no usable answer (evaluation
+        then proceeds without a reference, and nothing is cached). A cache
+        file that cannot be written is skipped.
+    """
+    if not problem_statement or not problem_statement.strip():
+        return None
+    key = problem_hash(problem_statement)
+    if key in _memory_cache:
+        return _memory_cache[key]
+    if cache_path is not None:
+        cached = _read_cache(cache_path).get(key)
+        if isinstance(cached, dict) and _validate(cached):
+            _memory_cache[key] = {**_validate(cached), "problem_hash": key}
+            return _memory_cache[key]
+
+    prompt = PROBLEM_ANALYSIS_PROMPT.format(problem_statement=problem_statement)
+    try:
+        reference = _validate(extract_json(call_llm(prompt, PROBLEM_ANALYSIS_SYSTEM_PROMPT)))
+    except (RuntimeError, ValueError):
+        return None
+    if reference is None:
+        return None
+
+    reference["problem_hash"] = key
+    _memory_cache[key] = reference
+    if cache_path is not None:
+        # Re-read right before writing so entries other runs added meanwhile survive
+        entries = _read_cache(cache_path)
+        entries[key] = {field: value for field, value in reference.items() if field != "problem_hash"}
+        try:
+            _write_cache(cache_path, entries)
+        except OSError:
+            pass  # the reference stays cached in this process; only the file is missing it
+    return reference
+
+
+def clear_cache() -> None:
+    """Forget the references cached in this process (cache files are left alone)."""
+    _memory_cache.clear()
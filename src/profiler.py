@@ -0,0 +1,428 @@
+"""Empirical time and memory profiling of Python submissions in a sandbox.
+
+The submission's entry function is run on inputs of growing size n in a
+child interpreter (`python -I`) with `resource` limits on CPU time, address
+space and file writes, an empty environment (no API keys) and a scratch
+working directory. For each n the child reports the best of a few timed
+calls and the peak memory of one call traced with tracemalloc, one JSON line
+per size, so a child killed by its limits still leaves the sizes it finished.
+Sizes double until a call takes longer than `time_cap`, the next size would
+overrun the CPU budget, or the sizes run out. Calls that leave their
+arguments unchanged are timed in batches (with the garbage collector off, as
+timeit does); calls that mutate them get a fresh copy each time.
+
+The measurements are fitted to complexity classes (t ≈ a + b·f(n) for
+f = 1, log n, n, n log n, n², n³, by least squares relative to each point);
+running times that grow faster than any polynomial in n are classed O(2^n).
+
+    profile = profile_python(code, inputs="array", run_untrusted_code=True)
+    # {'entry': 'two_sum', 'time': 'O(n^2)', 'space': 'O(1)', 'sizes': [16, 32, ...], ...}
+
+Inputs come from a generator n → argument tuple: a name from
+INPUT_GENERATORS, or any callable (it runs in this process; only its
+results are sent to the child). The child may not fork (RLIMIT_NPROC,
+which Linux does not enforce for root) and its whole process group is
+killed when it ends. The sandbox does not isolate the file system or
+network, so callers must pass run_untrusted_code=True; it only runs code on
+POSIX systems.
+A submission can forge its own measurements, so they are evidence for the
+evaluation prompt, not a verdict.
+"""
+
+import ast
+import json
+import math
+import os
+import pickle
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, so submissions are never run
+    resource = None
+
+DEFAULT_SIZES = tuple(2 ** k for k in range(4, 17))  # 16 .. 65536
+DEFAULT_TIME_CAP = 0.5  # seconds a single call may take before sizes stop growing
+DEFAULT_TIME_BUDGET = 20.0  # CPU seconds for the whole child
+DEFAULT_MEMORY_LIMIT_MB = 512
+DEFAULT_REPEATS = 5
+
+# Calls faster than this are timed in batches of 10, 100, ... calls
+_MIN_BATCH = 2e-3
+# Peak memory growing by less than this over all sizes is taken as constant
+_SPACE_NOISE_BYTES = 4096
+
+# Fewer measured sizes than this cannot tell complexity classes apart
+MIN_POINTS = 4
+
+
+def _random_ints(n: int, rng: random.Random) -> list[int]:
+    return [rng.randint(-10 * n, 10 * n) for _ in range(n)]
+
+
+def _array_target(n: int, rng: random.Random) -> tuple:
+    # No two elements reach the target, so searches run to the end (the worst case)
+    return _random_ints(n, rng), 20 * n + 1
+
+
+def _sorted_array_target(n: int, rng: random.Random) -> tuple:
+    nums = sorted(_random_ints(n, rng))
+    return nums, rng.choice(nums)
+
+
+def _string(n: int, rng: random.Random) -> tuple:
+    return "".join(rng.choice("abcdefghij") for _ in range(n)),
+
+
+def _parentheses(n: int, rng: random.Random) -> tuple:
+    return "".join(rng.choice("()[]{}") for _ in range(n)),
+
+
+# Input generators by name: n and a seeded Random → the entry function's arguments
+INPUT_GENERATORS = {
+    "int": lambda n, rng: (n,),
+    "array": lambda n, rng: (_random_ints(n, rng),),
+    "array_target": _array_target,
+    "sorted_array_target": _sorted_array_target,
+    "string": _string,
+    "parentheses": _parentheses,
+    "matrix": lambda n, rng: ([_random_ints(math.isqrt(n), rng) for _ in range(math.isqrt(n))],),
+}
+
+# Complexity classes fitted to measurements, simplest first
+_CLASSES = (
+    ("O(1)", lambda n: 1.0),
+    ("O(log n)", math.log2),
+    ("O(n)", float),
+    ("O(n log n)", lambda n: n * math.log2(n)),
+    ("O(n^2)", lambda n: float(n) ** 2),
+    ("O(n^3)", lambda n: float(n) ** 3),
+)
+EXPONENTIAL = "O(2^n)"
+# A class must halve the residual of every simpler class to be preferred (cache
+# effects make large-n timings drift upwards)
+_SIMPLER_MARGIN = 0.5
+# Local growth exponent (log-log slope between consecutive sizes) above which
+# the timings are taken to be exponential
+_EXPONENTIAL_SLOPE = 4.0
+
+# Run by the child interpreter: limits, then the submission, then one JSON line per size
+_RUNNER = r'''
+import copy, gc, json, os, pickle, resource, signal, sys, time, tracemalloc
+
+job = pickle.load(sys.stdin.buffer)
+sys.stdin.close()
+cpu = max(1, int(job["cpu_seconds"]))
+resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+memory = job["memory_bytes"]
+resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+signal.signal(signal.SIGXFSZ, signal.SIG_IGN)  # file writes fail with an error instead
+resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))  # no fork() (not enforced for root)
+
+# Results go to the original stdout; the submission's own output is discarded
+out = os.fdopen(os.dup(1), "w")
+devnull = os.open(os.devnull, os.O_WRONLY)
+os.dup2(devnull, 1)
+os.dup2(devnull, 2)
+
+def report(**fields):
+    out.write(json.dumps(fields) + "\n")
+    out.flush()
+
+try:
+    namespace = {"__name__": "__submission__"}
+    exec(compile(job["code"], "<submission>", "exec"), namespace)
+    owner, _, name = job["entry"].rpartition(".")
+    entry = getattr(namespace[owner](), name) if owner else namespace[name]
+except BaseException as error:
+    report(error=f"{type(error).__name__} while loading the submission: {error}"[:300])
+    sys.exit(0)
+
+def timed(args, number, mutates):
+    calls = [copy.deepcopy(args) for _ in range(number)] if mutates else [args] * number
+    gc.collect()
+    gc.disable()  # as timeit does: collections would time the heap, not the function
+    try:
+        start = time.perf_counter()
+        for call_args in calls:
+            entry(*call_args)
+        return (time.perf_counter() - start) / number
+    finally:
+        gc.enable()
+
+previous = None
+for n, args in job["inputs"]:
+    try:
+        # Functions that leave their arguments unchanged are called in batches
+        # long enough for the clock; the others get a fresh copy for every call
+        call_args = copy.deepcopy(args)
+        best = timed(call_args, 1, False)
+        mutates = call_args != args
+        number = 1
+        while not mutates and best * number < job["min_batch"] and number < 100000:
+            number *= 10
+        spent = best
+        for _ in range(job["repeats"]):
+            if spent > job["time_cap"]:
+                break
+            seconds = timed(args, number, mutates)
+            best, spent = min(best, seconds), spent + seconds * number
+        call_args = copy.deepcopy(args)
+        gc.collect()
+        start = time.perf_counter()
+        tracemalloc.start()
+        entry(*call_args)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        spent += time.perf_counter() - start  # tracing slows allocating code several times over
+    except BaseException as error:
+        report(error=f"{type(error).__name__} at n={n}: {error}"[:300])
+        break
+    report(n=n, seconds=best, peak_bytes=peak)
+    # Stop before a size that would overrun the CPU limit, if a call slows down as
+    # it did from the previous size (and at least 4x, as a quadratic would)
+    growth = max(4.0, best / previous) if previous else 4.0
+    if best > job["time_cap"] or time.process_time() + growth * spent > cpu:
+        break
+    previous = best
+'''
+
+
+def find_entry(code: str, arity: int | None = None) -> str | None:
+    """Name of the function to profile: "name", or "Class.method" for a LeetCode-style class.
+
+    The first top-level function (or method of a class whose constructor
+    takes no arguments) that is not a driver like main() or a test, and, when
+    `arity` is given, takes exactly that many positional arguments.
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+
+    def fits(function: ast.FunctionDef, skip: int) -> bool:
+        if function.name.startswith("_") or function.name in ("main", "solve_all") \
+                or function.name.lower().startswith(("test", "run", "demo", "bench")):
+            return False
+        args = function.args
+        required = len(args.posonlyargs) + len(args.args) - len(args.defaults) - skip
+        return arity is None or required == arity
+
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if not isinstance(node, ast.AsyncFunctionDef) and fits(node, 0):
+                return node.name
+        elif isinstance(node, ast.ClassDef):
+            methods = [item for item in node.body if isinstance(item, ast.FunctionDef)]
+            init = next((method for method in methods if method.name == "__init__"), None)
+            if init is not None and len(init.args.args) - len(init.args.defaults) > 1:
+                continue
+            for method in methods:
+                if fits(method, 1) and not any(isinstance(d, ast.Name) and d.id == "staticmethod"
+                                               for d in method.decorator_list):
+                    return f"{node.name}.{method.name}"
+    return None
+
+
+def _least_squares(xs: list[float], ys: list[float]) -> tuple[float, float, float]:
+    """(a, b, residual) of y ≈ a + b·x, weighting each point by 1/y² (relative error)."""
+    floor = max(ys) * 1e-3 or 1.0
+    weights = [1.0 / (y + floor) ** 2 for y in ys]
+    sw = sum(weights)
+    mean_x = sum(w * x for w, x in zip(weights, xs)) / sw
+    mean_y = sum(w * y for w, y in zip(weights, ys)) / sw
+    sxx = sum(w * (x - mean_x) ** 2 for w, x in zip(weights, xs))
+    b = sum(w * (x - mean_x) * (y - mean_y) for w, x, y in zip(weights, xs, ys)) / sxx if sxx else 0.0
+    a = mean_y - b * mean_x
+    residual = sum(w * (y - a - b * x) ** 2 for w, x, y in zip(weights, xs, ys))
+    return a, b, residual
+
+
+def fit_complexity(sizes: list[int], values: list[float], exponential: bool = True,
+                   noise: float = 0.0) -> str | None:
+    """Complexity class best fitting `values` measured at `sizes`, None with too few points.
+
+    With `exponential`, values growing faster than n^4 between the last two
+    sizes are classed O(2^n) (timings stop early then, leaving few points).
+    Values that vary by no more than `noise` are O(1).
+    """
+    points = [(n, value) for n, value in zip(sizes, values) if n > 1]
+    if len(points) >= MIN_POINTS and max(values) - min(values) <= noise:
+        return "O(1)"
+    if exponential and len(points) >= 2:
+        (n0, v0), (n1, v1) = points[-2:]
+        if v0 > 0 and v1 > 0 and math.log(v1 / v0) / math.log(n1 / n0) > _EXPONENTIAL_SLOPE:
+            return EXPONENTIAL
+    if len(points) < MIN_POINTS:
+        return None
+    ns, ys = [n for n, _ in points], [value for _, value in points]
+    best, best_residual = None, math.inf
+    for label, f in _CLASSES:
+        xs = [f(n) for n in ns]
+        _, b, residual = _least_squares(xs, ys)
+        if label != "O(1)" and b <= 0:
+            continue  # a decreasing curve is not this class
+        if best is None or residual < best_residual * _SIMPLER_MARGIN:
+            best, best_residual = label, residual
+    return best
+
+
+def _drain(fd: int) -> bytes:
+    """Everything buffered in the non-blocking pipe `fd`, without waiting for EOF."""
+    os.set_blocking(fd, False)
+    chunks = []
+    while True:
+        try:
+            chunk = os.read(fd, 65536)
+        except BlockingIOError:
+            break
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _run_sandboxed(job: dict, scratch: str, timeout: float) -> tuple[bytes, int | None]:
+    """(stdout, exit code or None on timeout) of _RUNNER on `job`.
+
+    The child leads its own process group, which is killed once the child
+    exits or times out, so processes it forked cannot outlive the run or hold
+    the output pipe open. Its output is small and fully buffered in the pipe
+    by then, so it is read without waiting for EOF.
+    """
+    process = subprocess.Popen(
+        [sys.executable, "-I", "-c", _RUNNER], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL, cwd=scratch, env={"PATH": os.defpath}, start_new_session=True,
+    )
+    try:
+        try:
+            process.stdin.write(pickle.dumps(job))
+            process.stdin.close()
+        except BrokenPipeError:
+            pass  # the child died before reading its job; its exit code says why
+        returncode = process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        returncode = None
+    finally:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        process.wait()
+    try:
+        return _drain(process.stdout.fileno()), returncode
+    finally:
+        process.stdout.close()
+
+
+def profile_python(
+    code: str,
+    inputs="array",
+    entry: str | None = None,
+    sizes=DEFAULT_SIZES,
+    time_cap: float = DEFAULT_TIME_CAP,
+    time_budget: float = DEFAULT_TIME_BUDGET,
+    memory_limit_mb: int = DEFAULT_MEMORY_LIMIT_MB,
+    repeats: int = DEFAULT_REPEATS,
+    seed: int = 0,
+    run_untrusted_code: bool = False,
+) -> dict:
+    """Run a Python submission's entry function at growing input sizes in a sandbox.
+
+    This executes the submission on this host. The child's resources are
+    limited, but it can still read, write and delete files the server user
+    can, and use the network. Callers must opt in with `run_untrusted_code`.
+
+    Args:
+        code: Python source of the submission
+        inputs: Name in INPUT_GENERATORS, or a callable (n, random.Random) → tuple of arguments
+        entry: Function to call ("name" or "Class.method"); found with find_entry() if None
+        sizes: Increasing input sizes to try
+        time_cap: Seconds one call may take; larger sizes are not tried after that
+        time_budget: CPU (and, doubled, wall-clock) seconds for the whole run
+        memory_limit_mb: Address-space limit of the child process
+        repeats: Timed calls (or batches) per size; the fastest is kept
+        seed: Seed of the random.Random passed to the generator
+        run_untrusted_code: Must be True: confirms that running the submission on this host is acceptable
+
+    Returns:
+        dict with "entry", "sizes", "seconds", "peak_bytes" (per measured size),
+        "time" and "space" (complexity classes, None when too few sizes were
+        measured) and "error" (None, or why the run stopped early)
+    """
+    if not run_untrusted_code:
+        raise ValueError("profile_python() runs untrusted code on this host; pass run_untrusted_code=True")
+    generator = INPUT_GENERATORS.get(inputs) if isinstance(inputs, str) else inputs
+    if generator is None:
+        raise ValueError(f"unknown input generator {inputs!r}; expected one of {sorted(INPUT_GENERATORS)}")
+    if repeats < 1:
+        raise ValueError(f"repeats must be at least 1, got {repeats}")
+
+    rng = random.Random(seed)
+    arity = len(generator(1, random.Random(seed)))
+    result = {"entry": entry or find_entry(code, arity), "sizes": [], "seconds": [], "peak_bytes": [],
+              "time": None, "space": None, "error": None}
+    if resource is None:
+        result["error"] = "profiling needs the POSIX resource module"
+        return result
+    if result["entry"] is None:
+        result["error"] = f"no function taking {arity} argument(s) to profile"
+        return result
+
+    job = {
+        "code": code,
+        "entry": result["entry"],
+        "inputs": [(n, generator(n, rng)) for n in sizes],
+        "repeats": repeats,
+        "time_cap": time_cap,
+        "min_batch": _MIN_BATCH,
+        "cpu_seconds": math.ceil(time_budget),
+        "memory_bytes": memory_limit_mb * 1024 * 1024,
+    }
+    with tempfile.TemporaryDirectory(prefix="echelon-profile-") as scratch:
+        output, returncode = _run_sandboxed(job, scratch, 2 * time_budget)
+
+    for line in output.decode("utf-8", errors="replace").splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(record, dict):
+            continue
+        if "error" in record:
+            result["error"] = str(record["error"])
+        elif {"n", "seconds", "peak_bytes"} <= record.keys():
+            result["sizes"].append(int(record["n"]))
+            result["seconds"].append(float(record["seconds"]))
+            result["peak_bytes"].append(int(record["peak_bytes"]))
+    if result["error"] is None and returncode != 0:
+        result["error"] = "time budget exceeded" if returncode in (None, -9, -24) else \
+            f"sandbox exited with code {returncode} (memory limit or crash)"
+
+    result["time"] = fit_complexity(result["sizes"], result["seconds"])
+    result["space"] = fit_complexity(result["sizes"], result["peak_bytes"], exponential=False,
+                                     noise=_SPACE_NOISE_BYTES)
+    return result
+
+
+def format_profile_for_prompt(profile: dict) -> str:
+    """Lines for the static analysis context of the evaluation prompt."""
+    if not profile.get("sizes"):
+        return f"Runtime profile: not available ({profile.get('error') or 'no measurements'})"
+    sizes, seconds = profile["sizes"], profile["seconds"]
+    parts = [
+        f"Measured time complexity (sandboxed runs of {profile['entry']}, n={sizes[0]}..{sizes[-1]}): "
+        f"{profile['time'] or 'inconclusive'} ({seconds[0] * 1e3:.3f} ms → {seconds[-1] * 1e3:.3f} ms)",
+        f"Measured space complexity (tracemalloc peak): {profile['space'] or 'inconclusive'} "
+        f"({profile['peak_bytes'][0]} → {profile['peak_bytes'][-1]} bytes)",
+    ]
+    if profile.get("error"):
+        parts.append(f"Profiling stopped early: {profile['error']}")
+    parts.append("Measured bounds come from running the code and outweigh the static estimate.")
+    return "\n".join(parts)
@@ -6,7 +6,7 @@ EVALUATION_USER_PROMPT = """Evaluate the following code submission.
 
 ## Problem Context
 {problem_statement}
-
+{reference_analysis}
 ## Programming Language
 {language}
 
@@ -102,17 +102,10 @@ Respond with ONLY valid JSON. No markdown backticks. No text before or after.
       "suggestion": "<1 concrete improvement>"
     }},
     "time_efficiency": {{
-      "score": <int 0-100>,
-      "detected_complexity": "<e.g. O(n^2)>",
-      "expected_optimal": "<e.g. O(n)>",
-      "explanation": "<why this complexity>",
-      "suggestion": "<1 concrete improvement>"
+{time_efficiency_fields}
     }},
     "space_efficiency": {{
-      "score": <int 0-100>,
-      "detected_complexity": "<e.g. O(n)>",
-      "explanation": "<why this space usage>",
-      "suggestion": "<1 concrete improvement>"
+{space_efficiency_fields}
     }},
     "readability": {{
       "score": <int 0-100>,
@@ -138,8 +131,70 @@ Respond with ONLY valid JSON. No markdown backticks. No text before or after.
     }}
   }},
   "strengths": ["<strength 1>", "<strength 2>", "<strength 3>"],
+{summary_fields}
+}}"""
+
+
+TIME_EFFICIENCY_FIELDS = """\
+      "score": <int 0-100>,
+      "detected_complexity": "<e.g. O(n^2)>",
+      "expected_optimal": "<e.g. O(n)>",
+      "explanation": "<why this complexity>",
+      "suggestion": "<1 concrete improvement>\""""
+
+SPACE_EFFICIENCY_FIELDS = """\
+      "score": <int 0-100>,
+      "detected_complexity": "<e.g. O(n)>",
+      "explanation": "<why this space usage>",
+      "suggestion": "<1 concrete improvement>\""""
+
+# With a static estimate (src.complexity) the model only confirms or corrects
+# the bound; the explanation comes from the estimator, or from the model's
+# reason when it corrects the bound
+CONFIRM_TIME_FIELDS = """\
+      "score": <int 0-100>,
+      "detected_complexity": "<'confirmed' if the static estimate {time} is right, else the correct bound>",
+      "correction_reason": "<one line: why the correct bound differs, only if you corrected it>",
+      "expected_optimal": "<e.g. O(n)>",
+      "suggestion": "<1 concrete improvement>\""""
+
+CONFIRM_SPACE_FIELDS = """\
+      "score": <int 0-100>,
+      "detected_complexity": "<'confirmed' if the static estimate {space} is right, else the correct bound>",
+      "correction_reason": "<one line: why the correct bound differs, only if you corrected it>",
+      "suggestion": "<1 concrete improvement>\""""
+
+SUMMARY_FIELDS = """\
   "improvements": ["<improvement 1>", "<improvement 2>", "<improvement 3>"],
-  "better_approach": "<describe a better approach if one exists, or 'N/A'>"
+  "better_approach": "<describe a better approach if one exists, or 'N/A'>\""""
+
+# With a reference analysis of the problem (src.problem_analysis) the optimal
+# bound and the better approach are known once per problem, not per submission
+REFERENCE_SUMMARY_FIELDS = """\
+  "improvements": ["<improvement 1>", "<improvement 2>", "<improvement 3>"]"""
+
+REFERENCE_ANALYSIS_SECTION = """
+## Reference Analysis (same for every submission to this problem)
+Optimal complexity: {optimal_time} time, {optimal_space} space
+Edge cases to check: {edge_cases}
+Reference approach: {reference_approach}
+"""
+
+PROBLEM_ANALYSIS_SYSTEM_PROMPT = """You are a senior algorithms engineer preparing the grading reference for a coding problem. \
+Be precise and brief."""
+
+PROBLEM_ANALYSIS_PROMPT = """Analyze this coding problem before any submissions are graded.
+
+## Problem
+{problem_statement}
+
+Respond with ONLY valid JSON. No markdown backticks. No text before or after.
+
+{{
+  "optimal_time": "<best achievable time complexity, e.g. O(n)>",
+  "optimal_space": "<extra space of that solution, e.g. O(n)>",
+  "edge_cases": ["<short edge case>", "<at most 8>"],
+  "reference_approach": "<the optimal approach in 1-2 sentences>"
 }}"""
 
 
@@ -148,11 +203,42 @@ def format_prompt(
     language: str,
     problem_statement: str,
     static_analysis: str = "Not available",
+    complexity: dict | None = None,
+    problem_analysis: dict | None = None,
 ) -> str:
+    """Fill in the evaluation prompt.
+
+    `complexity` is the static estimate from the analyzers ("complexity" of
+    their result); when given, the time and space dimensions ask only for a
+    confirmation or correction of it instead of a bound and an explanation.
+    `problem_analysis` is the reference analysis of the problem from
+    src.problem_analysis; when given, it is shown to the model and the
+    response leaves out "expected_optimal" and "better_approach".
+    """
+    if complexity:
+        time_fields = CONFIRM_TIME_FIELDS.format(time=complexity["time"])
+        space_fields = CONFIRM_SPACE_FIELDS.format(space=complexity["space"])
+    else:
+        time_fields, space_fields = TIME_EFFICIENCY_FIELDS, SPACE_EFFICIENCY_FIELDS
+    if problem_analysis:
+        time_fields = "\n".join(line for line in time_fields.split("\n") if '"expected_optimal"' not in line)
+        reference_analysis = REFERENCE_ANALYSIS_SECTION.format(
+            optimal_time=problem_analysis["optimal_time"],
+            optimal_space=problem_analysis["optimal_space"],
+            edge_cases="; ".join(problem_analysis["edge_cases"]) or "none listed",
+            reference_approach=problem_analysis["reference_approach"],
+        )
+        summary_fields = REFERENCE_SUMMARY_FIELDS
+    else:
+        reference_analysis, summary_fields = "", SUMMARY_FIELDS
     return EVALUATION_USER_PROMPT.format(
         problem_statement=problem_statement or "No problem context provided.",
+        reference_analysis=reference_analysis,
+        summary_fields=summary_fields,
         language=language,
         language_lower=language.lower(),
         code=code,
         static_analysis=static_analysis,
+        time_efficiency_fields=time_fields,
+        space_efficiency_fields=space_fields,
     )
@@ -194,6 +194,9 @@ def generate_single_report(result: dict, problem_statement: str = "") -> BytesIO
             ["Has Error Handling", "Yes" if sa.get("has_error_handling") else "No"],
             ["Has Tests", "Yes" if sa.get("has_tests") else "No"],
         ]
+        if sa.get("complexity"):
+            sa_data.append(["Estimated Time Complexity", sa["complexity"]["time"]])
+            sa_data.append(["Estimated Space Complexity", sa["complexity"]["space"]])
         
         sa_table = Table(sa_data, colWidths=[3.5*inch, 3.5*inch])
         sa_table.setStyle(TableStyle([
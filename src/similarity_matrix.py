@@ -0,0 +1,130 @@
+"""Vectorized all-pairs similarity for detect_plagiarism().
+
+Instead of scoring n(n-1)/2 pairs one at a time, each layer is computed for
+the whole cohort at once:
+  * set layers (winnowed fingerprints, token n-grams): every distinct feature
+    becomes a column of a sparse 0/1 submission-by-feature matrix X, and one
+    sparse product X·Xᵀ gives the overlap of every pair; Dice and Jaccard
+    follow from the overlaps and the set sizes
+  * structural layer: syntax node histograms (Python AST or tree-sitter)
+    form a dense submission-by-node-type matrix H, and H·Hᵀ divided by the
+    outer product of the row norms is the full cosine matrix
+
+The arithmetic mirrors the per-pair functions in src.plagiarism operation
+for operation, so every score is identical to the pairwise engine.
+"""
+
+import numpy as np
+from scipy import sparse
+
+
+def _incidence_matrix(feature_sets: list) -> sparse.csr_matrix:
+    """Sparse 0/1 matrix with one row per set and one column per distinct feature.
+
+    Sets are iterables of hashable features, or arrays of distinct values
+    such as Submission.ngrams(), whose columns come from one np.unique().
+    """
+    if feature_sets and all(isinstance(features, np.ndarray) for features in feature_sets):
+        indptr = np.zeros(len(feature_sets) + 1, dtype=np.int64)
+        np.cumsum([len(features) for features in feature_sets], out=indptr[1:])
+        columns, indices = np.unique(np.concatenate(feature_sets), return_inverse=True)
+        data = np.ones(len(indices), dtype=np.int32)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(feature_sets), len(columns)))
+    vocabulary = {}
+    indices = []
+    indptr = [0]
+    for features in feature_sets:
+        indices.extend(vocabulary.setdefault(feature, len(vocabulary)) for feature in features)
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.int32)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(feature_sets), len(vocabulary)))
+
+
+def _overlaps(feature_sets: list) -> tuple[np.ndarray, np.ndarray]:
+    """(|A ∩ B| for every pair as an N×N array, |A| for every set)."""
+    incidence = _incidence_matrix(feature_sets)
+    shared = (incidence @ incidence.T).toarray().astype(np.float64)
+    sizes = np.array([len(features) for features in feature_sets], dtype=np.float64)
+    return shared, sizes
+
+
+def _with_empty_sets(scores: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    """Apply the per-pair conventions: both sets empty → 1.0, one empty → 0.0."""
+    empty = sizes == 0
+    scores[empty[:, None] | empty[None, :]] = 0.0
+    scores[empty[:, None] & empty[None, :]] = 1.0
+    return scores
+
+
+def jaccard_matrix(feature_sets: list) -> np.ndarray:
+    """N×N Jaccard similarity of sets (as ngram_similarity)."""
+    shared, sizes = _overlaps(feature_sets)
+    union = sizes[:, None] + sizes[None, :] - shared
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = shared / union
+    return _with_empty_sets(scores, sizes)
+
+
+def dice_matrix(feature_sets: list) -> np.ndarray:
+    """N×N Dice overlap of sets (as winnowing.fingerprint_similarity)."""
+    shared, sizes = _overlaps(feature_sets)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = 2 * shared / (sizes[:, None] + sizes[None, :])
+    return _with_empty_sets(scores, sizes)
+
+
+def cosine_matrix(histograms: list[dict[str, int]], norms: list[float]) -> np.ndarray:
+    """N×N cosine similarity of count histograms (as structural_similarity)."""
+    keys = {}
+    for histogram in histograms:
+        for key in histogram:
+            keys.setdefault(key, len(keys))
+    counts = np.zeros((len(histograms), len(keys)), dtype=np.float64)
+    for row, histogram in enumerate(histograms):
+        for key, count in histogram.items():
+            counts[row, keys[key]] = count
+    dot = counts @ counts.T
+    norms = np.asarray(norms, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = dot / np.outer(norms, norms)
+    missing = norms == 0
+    scores[missing[:, None] | missing[None, :]] = 0.0
+    return scores
+
+
+def score_matrices(parsed: list) -> dict[str, np.ndarray]:
+    """Score every pair of precomputed Submissions with the winnowing text layer.
+
+    Pairs of different languages are tokenized as "Other", and only pairs of
+    one language with a structural layer (plagiarism.has_structure) get it,
+    exactly as in detect_plagiarism(). Returns N×N float arrays (0-1) under "text",
+    "token", "structural" (NaN where not applicable) and "overall".
+    """
+    languages = [sub.language for sub in parsed]
+    same_language = np.array(languages)[:, None] == np.array(languages)[None, :]
+    structured = np.array([sub.has_structure for sub in parsed], dtype=bool)
+    structured_pair = same_language & structured[:, None]
+
+    text = dice_matrix([sub.fingerprints for sub in parsed])
+    token = jaccard_matrix([sub.ngrams(3) for sub in parsed])
+    if not same_language.all():
+        generic = jaccard_matrix([sub.ngrams(3, "Other") for sub in parsed])
+        token = np.where(same_language, token, generic)
+
+    structural = np.full(text.shape, np.nan)
+    if structured_pair.any():
+        # One cosine matrix over every structured row; node types of
+        # different grammars never meet in the pairs that are kept
+        rows = np.flatnonzero(structured)
+        subs = [parsed[i] for i in rows]
+        cosine = cosine_matrix([sub.ast_histogram for sub in subs], [sub.ast_histogram_norm for sub in subs])
+        structural[np.ix_(rows, rows)] = cosine
+        structural[~structured_pair] = np.nan
+
+    # Same weights and operation order as compute_pair_similarity()
+    overall = np.where(
+        structured_pair,
+        text * 0.40 + token * 0.30 + np.nan_to_num(structural) * 0.30,
+        text * 0.57 + token * 0.43,
+    )
+    return {"text": text, "token": token, "structural": structural, "overall": overall}
@@ -0,0 +1,212 @@
+"""Incremental similarity checking for a growing set of submissions.
+
+A SimilaritySession keeps each file's precomputed features and every pair
+score computed so far. Adding a file scores it against the n files already
+in the session, and removing one drops its n - 1 pairs. Nothing else is
+rescored. result() assembles the same dict as detect_plagiarism() on the
+session's files, in the order they were added.
+
+Sessions serialize to JSON (files and pair scores), so an intake window
+that stays open for days can resume without rescoring. Features are rebuilt
+lazily, and only for files involved in new comparisons.
+
+    session = SimilaritySession()
+    session.add("alice.py", code, "Python")
+    session.add("bob.py", other_code, "Python")
+    session.result(threshold=60)["pairs"]
+    session.save("intake.json")
+"""
+
+import json
+import os
+
+from src.plagiarism import TEXT_METHODS, collect_results, compute_pair_similarity
+from src.submission import Submission
+
+_FORMAT_VERSION = 2
+
+
+def _numbered(name: str, k: int) -> str:
+    return name if k == 1 else f"{name} ({k})"
+
+
+def unique_names(names: list[str]) -> list[str]:
+    """`names` with repeats numbered: ["a.py", "a.py"] -> ["a.py", "a.py (2)"].
+
+    Uploads routinely share a file name (every student's solution.py), and a
+    session keys submissions by name. Numbering follows list order, so the
+    same uploads get the same names on every rerun.
+    """
+    seen = set()
+    result = []
+    for name in names:
+        k = 1
+        while _numbered(name, k) in seen:
+            k += 1
+        seen.add(_numbered(name, k))
+        result.append(_numbered(name, k))
+    return result
+
+
+class SimilaritySession:
+    """Submissions plus their cached pairwise similarity scores.
+
+    Args:
+        text_method: text layer for every comparison, see text_similarity()
+
+    File names identify submissions and must be unique within a session;
+    see unique_names() and intake() for uploads that share a name.
+    """
+
+    def __init__(self, text_method: str = "winnow"):
+        if text_method not in TEXT_METHODS:
+            raise ValueError(f"Unknown text similarity method: {text_method!r}")
+        self.text_method = text_method
+        self._submissions: dict[str, Submission] = {}
+        # (earlier name, later name) -> compute_pair_similarity() result
+        self._scores: dict[tuple[str, str], dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._submissions)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._submissions
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._submissions)
+
+    def submission(self, name: str) -> Submission:
+        """The session's parsed Submission for `name` (features cached across calls)."""
+        return self._submissions[name]
+
+    # ── Updates ──
+
+    def _score(self, a: Submission, b: Submission) -> dict:
+        # Same pair language rule as detect_plagiarism()
+        language = a.language if a.language == b.language else "Other"
+        return compute_pair_similarity(a, b, language, self.text_method)
+
+    def add(self, name: str, code: str, language: str) -> int:
+        """Add or replace a file and score it against every other file.
+
+        Returns the number of new comparisons, 0 if `name` is already in the
+        session with the same code and language. A file whose code changed
+        is replaced: its old pairs are dropped and it moves to the end.
+        """
+        existing = self._submissions.get(name)
+        if existing is not None:
+            if existing.code == code and existing.language == language:
+                return 0
+            self.remove(name)
+
+        new = Submission(code, language, name)
+        for other_name, other in self._submissions.items():
+            self._scores[other_name, name] = self._score(other, new)
+        self._submissions[name] = new
+        return len(self._submissions) - 1
+
+    def intake(self, name: str, code: str, language: str) -> str:
+        """Add an uploaded file without replacing a different file of the same name.
+
+        Returns the name the file is stored under: `name` if it is free or
+        already holds this code, otherwise "name (2)", "name (3)", ... (the
+        first that is free or holds this code, so re-uploads are no-ops).
+        """
+        k = 1
+        while True:
+            candidate = _numbered(name, k)
+            existing = self._submissions.get(candidate)
+            if existing is None or (existing.code == code and existing.language == language):
+                self.add(candidate, code, language)
+                return candidate
+            k += 1
+
+    def remove(self, name: str) -> bool:
+        """Drop a file and its pairs. Returns False if it is not in the session."""
+        if self._submissions.pop(name, None) is None:
+            return False
+        for other_name in self._submissions:
+            self._scores.pop((other_name, name), None)
+            self._scores.pop((name, other_name), None)
+        return True
+
+    def sync(self, files: list[dict]) -> tuple[int, int]:
+        """Make the session hold exactly `files` ({'name', 'code', 'language'} dicts).
+
+        Repeated names are numbered by unique_names(), so no file replaces
+        another. Files not listed are removed, new or changed ones are added.
+        Returns (files added or replaced, files removed).
+        """
+        names = unique_names([f["name"] for f in files])
+        wanted = set(names)
+        removed = sum(self.remove(name) for name in self.names if name not in wanted)
+        added = 0
+        for name, f in zip(names, files):
+            before = self._submissions.get(name)
+            self.add(name, f["code"], f["language"])
+            added += self._submissions[name] is not before
+        return added, removed
+
+    # ── Results ──
+
+    def result(self, threshold: float = 60.0, output: str = "full", top_k: int = 5,
+               matrix_format: str | None = None) -> dict:
+        """detect_plagiarism()-style result from the cached pair scores."""
+        names = self.names
+        scored = (
+            (i, j, self._scores[a, b])
+            for i, a in enumerate(names)
+            for j, b in enumerate(names[i + 1:], i + 1)
+        )
+        return collect_results(scored, names, threshold, output, top_k, matrix_format)
+
+    # ── Persistence ──
+
+    def to_dict(self) -> dict:
+        return {
+            "version": _FORMAT_VERSION,
+            "text_method": self.text_method,
+            "submissions": [
+                {"name": name, "code": sub.code, "language": sub.language}
+                for name, sub in self._submissions.items()
+            ],
+            "scores": [[a, b, result] for (a, b), result in self._scores.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SimilaritySession":
+        version = data.get("version")
+        if version not in (1, _FORMAT_VERSION):
+            raise ValueError(f"Unsupported session format version: {version!r}")
+        session = cls(data["text_method"])
+        for s in data["submissions"]:
+            session._submissions[s["name"]] = Submission(s["code"], s["language"], s["name"])
+        session._scores = {(a, b): result for a, b, result in data["scores"]}
+        if version == 1:
+            # Version 1 scored structure for Python pairs only: rescore the
+            # same-language pairs that now have a tree-sitter structural layer
+            for (a, b) in list(session._scores):
+                sub_a, sub_b = session._submissions.get(a), session._submissions.get(b)
+                if (sub_a is not None and sub_b is not None and sub_a.language == sub_b.language
+                        and not sub_a.is_python and sub_a.has_structure):
+                    session._scores[a, b] = session._score(sub_a, sub_b)
+        missing = [
+            (a, b) for i, a in enumerate(session.names) for b in session.names[i + 1:]
+            if (a, b) not in session._scores
+        ]
+        if missing:
+            raise ValueError(f"Session file is missing {len(missing)} pair scores, e.g. {missing[0]}")
+        return session
+
+    def save(self, path: str) -> None:
+        """Write the session to `path` as JSON (atomically, via a temporary file)."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "SimilaritySession":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
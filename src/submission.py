@@ -0,0 +1,211 @@
+"""Parse-once container for a single code submission.
+
+A Submission computes each derived artifact (AST / tree-sitter tree, token
+stream, normalized text, hashes) lazily and at most once, so the analyzer,
+the plagiarism layers and the evaluator can share the work.
+"""
+
+import ast
+import difflib
+import hashlib
+import math
+from array import array
+from functools import cached_property
+
+
+class Submission:
+    """One piece of source code plus lazily cached derived artifacts."""
+
+    def __init__(self, code: str, language: str, name: str = ""):
+        self.code = code
+        self.language = language
+        self.name = name
+        self._token_ids: dict[str, array] = {}
+        self._tokens: dict[str, list[str]] = {}
+        self._token_lines: dict[str, list[int]] = {}
+        self._ngrams: dict[tuple[str, int], object] = {}
+
+    def __repr__(self) -> str:
+        return f"Submission(name={self.name!r}, language={self.language!r}, lines={self.code.count(chr(10)) + 1})"
+
+    @property
+    def is_python(self) -> bool:
+        return self.language.lower() == "python"
+
+    # ── Raw forms ──
+
+    @cached_property
+    def code_bytes(self) -> bytes:
+        return self.code.encode("utf-8")
+
+    @cached_property
+    def code_hash(self) -> str:
+        """SHA-256 of the raw source."""
+        return hashlib.sha256(self.code_bytes).hexdigest()
+
+    # ── Parse trees ──
+
+    @cached_property
+    def _python_parse(self) -> tuple[ast.Module | None, str | None]:
+        try:
+            return ast.parse(self.code), None
+        except SyntaxError as e:
+            return None, str(e)
+        except (RecursionError, MemoryError):
+            # CPython itself cannot compile code nested this deeply
+            return None, "Code is nested too deeply for the Python parser"
+        except ValueError as e:
+            # e.g. source containing null bytes
+            return None, str(e)
+
+    @property
+    def python_ast(self) -> ast.Module | None:
+        """Parsed Python module, or None if the code does not parse."""
+        return self._python_parse[0]
+
+    @property
+    def python_syntax_error(self) -> str | None:
+        return self._python_parse[1]
+
+    @cached_property
+    def ts_tree(self):
+        """tree-sitter parse tree, or None if the language is unsupported."""
+        try:
+            from src.ts_analyzer import _get_parser
+            parser, _ = _get_parser(self.language)
+        except ImportError:
+            return None
+        if parser is None:
+            return None
+        return parser.parse(self.code_bytes)
+
+    # ── Plagiarism features ──
+
+    @cached_property
+    def normalized(self) -> str:
+        """Code with comments and blank lines stripped (see src.lexer.normalize)."""
+        from src.lexer import normalize
+        return normalize(self.code)
+
+    @cached_property
+    def text_matcher(self) -> difflib.SequenceMatcher:
+        """SequenceMatcher with the normalized code as its second sequence.
+
+        SequenceMatcher indexes only its second sequence, so comparing many
+        submissions against this one reuses that index via set_seq1().
+        """
+        return difflib.SequenceMatcher(None, "", self.normalized)
+
+    @cached_property
+    def fingerprints(self) -> frozenset[int]:
+        """Winnowed k-gram hashes of the normalized code with all whitespace removed."""
+        from src.winnowing import fingerprint
+        return fingerprint("".join(self.normalized.split()))
+
+    @cached_property
+    def normalized_hash(self) -> str:
+        """SHA-256 of the normalized code — equal for whitespace/comment-only edits."""
+        return hashlib.sha256(self.normalized.encode("utf-8")).hexdigest()
+
+    def token_ids(self, language: str | None = None) -> array:
+        """Normalized token ids (see src.lexer), lexed as `language` (default: own language)."""
+        from src.lexer import family, lex
+        key = family(language or self.language)
+        if key not in self._token_ids:
+            self._token_ids[key] = lex(self.code, key)[0]
+        return self._token_ids[key]
+
+    def tokens(self, language: str | None = None) -> list[str]:
+        """Normalized token stream, tokenized as `language` (default: own language)."""
+        from src.lexer import VOCABULARY, family
+        key = family(language or self.language)
+        if key not in self._tokens:
+            self._tokens[key] = VOCABULARY.decode(self.token_ids(key))
+        return self._tokens[key]
+
+    def token_lines(self, language: str | None = None) -> list[int]:
+        """Source line (1-based) of each token in tokens(language)."""
+        from src.lexer import family, lex
+        key = family(language or self.language)
+        if key not in self._token_lines:
+            self._token_ids[key], self._token_lines[key] = lex(self.code, key, lines=True)
+        return self._token_lines[key]
+
+    def ngrams(self, n: int = 3, language: str | None = None):
+        """Sorted distinct token n-gram hashes (see src.ngrams), tokenized as `language`."""
+        from src.lexer import family
+        from src.ngrams import ngram_hashes
+        key = (family(language or self.language), n)
+        if key not in self._ngrams:
+            self._ngrams[key] = ngram_hashes(self.token_ids(key[0]), n)
+        return self._ngrams[key]
+
+    @cached_property
+    def has_structure(self) -> bool:
+        """Whether the structural layer applies (see plagiarism.has_structure)."""
+        from src.plagiarism import has_structure
+        return has_structure(self.language)
+
+    @cached_property
+    def ast_histogram(self) -> dict[str, int]:
+        """Count of each syntax node type ({} without a parse tree).
+
+        Python counts AST node types. Other languages count the named
+        tree-sitter nodes of `subtrees`, which leaves out comments.
+        """
+        counter: dict[str, int] = {}
+        if self.is_python:
+            tree = self.python_ast
+            if tree is None:
+                return {}
+            for node in ast.walk(tree):
+                name = type(node).__name__
+                counter[name] = counter.get(name, 0) + 1
+            return counter
+        subtrees = self.subtrees
+        if subtrees is None:
+            return {}
+        for name in subtrees.kinds:
+            counter[name] = counter.get(name, 0) + 1
+        return counter
+
+    @cached_property
+    def ast_histogram_norm(self) -> float:
+        """Euclidean norm of ast_histogram, for cosine similarity."""
+        return math.sqrt(sum(count * count for count in self.ast_histogram.values()))
+
+    @cached_property
+    def subtrees(self):
+        """Structural hash of every syntax subtree (see src.clones), None without a parse tree."""
+        from src.clones import python_subtrees, ts_subtrees
+        if self.is_python:
+            tree = self.python_ast
+            return None if tree is None else python_subtrees(tree)
+        if not self.has_structure:
+            return None
+        from src.ts_analyzer import _get_parser
+        _, config = _get_parser(self.language)
+        return ts_subtrees(self.ts_tree, config["comment_nodes"])
+
+    def precompute(self, languages=(), text_method: str = "winnow") -> "Submission":
+        """Eagerly build every plagiarism feature, tokenized as each of `languages`.
+
+        After this, scoring a pair only combines cached features.
+        """
+        languages = languages or (self.language,)
+        if text_method == "difflib":
+            self.text_matcher
+        else:
+            self.fingerprints
+        for language in languages:
+            self.ngrams(3, language)
+        if self.has_structure:
+            self.ast_histogram_norm
+        return self
+
+
+def as_submission(code, language: str) -> Submission:
+    """Return `code` unchanged if it is already a Submission, else wrap it."""
+    if isinstance(code, Submission):
+        return code
+    return Submission(code, language)
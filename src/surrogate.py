@@ -0,0 +1,302 @@
+"""Local surrogate scorer: dimension scores predicted from static analysis.
+
+A ridge regression from the feature dict of analyze_code() (line counts,
+nesting, naming, docstrings, syntax validity, estimated complexity, ...) to
+the six dimension scores, trained on stored evaluation results. It gives an
+instant preliminary score, lets evaluate_code() skip the LLM when the
+prediction is clear-cut, and scores on its own when no LLM provider answers.
+
+    scorer = SurrogateScorer().fit(stored_results)   # evaluate_code() outputs
+    scorer.save("surrogate.json")
+    prediction = SurrogateScorer.load("surrogate.json").predict(analysis)
+    # {'overall_score': 41, 'overall_margin': 7.9, 'verdict': 'Weak', 'dimensions': {...}, ...}
+
+Every prediction carries a margin: the half-width of its prediction
+interval at the scorer's confidence level, from the residual covariance of
+the fit and the leverage of the features (analyses unlike the training set
+get wider margins). A prediction is clear-cut when the whole interval of the
+overall score lies in one verdict band. Training is closed-form and pure
+Python; the model is a few kilobytes of JSON.
+"""
+
+import json
+import math
+import re
+from statistics import NormalDist
+
+from src.scoring import WEIGHTS, compute_overall_score, get_verdict
+
+DIMENSIONS = list(WEIGHTS)
+
+FEATURES = (
+    "log_code_lines", "blank_ratio", "comment_ratio", "log_functions", "classes", "log_imports",
+    "has_docstrings", "has_type_hints", "has_error_handling", "has_main_guard", "has_tests",
+    "nested_loops", "max_nesting_depth", "log_longest_function", "single_char_ratio",
+    "naming_good", "naming_poor", "no_names", "invalid_syntax", "no_functions", "partial",
+    "time_order", "space_order", "complexity_unknown",
+)
+
+DEFAULT_ALPHA = 1.0
+DEFAULT_CONFIDENCE = 0.9
+# Fewer stored results than this leave too few degrees of freedom for the margins
+MIN_TRAINING_RESULTS = 30
+# Training spread below this (relative to the mean) counts as a constant feature
+_CONSTANT_TOLERANCE = 1e-9
+
+_FORMAT_VERSION = 1
+_EXPONENTIAL_ORDER = 6.0
+_DEGREE_RE = re.compile(r"n\^(\d+(?:\.\d+)?)")
+
+
+def _order(bound: str | None) -> float | None:
+    """Growth order of a big-O string from src.complexity: degree, plus 0.5 for a log factor."""
+    if not bound:
+        return None
+    body = bound.replace(" ", "")
+    if "^n" in body or "n!" in body:
+        return _EXPONENTIAL_ORDER
+    degree = _DEGREE_RE.search(body)
+    order = float(degree.group(1)) if degree else float("n" in body.replace("logn", ""))
+    return min(order + 0.5 * ("log" in body), _EXPONENTIAL_ORDER)
+
+
+def features(analysis: dict) -> list[float]:
+    """Feature vector (in FEATURES order) of an analyze_code() result."""
+    total_lines = analysis.get("total_lines", 0)
+    code_lines = total_lines - analysis.get("blank_lines", 0) - analysis.get("comment_lines", 0)
+    names = analysis.get("variable_names") or []
+    naming = analysis.get("naming_quality")
+    complexity = analysis.get("complexity") or {}
+    time_order, space_order = _order(complexity.get("time")), _order(complexity.get("space"))
+    return [
+        math.log1p(max(code_lines, 0)),
+        analysis.get("blank_lines", 0) / max(total_lines, 1),
+        min(analysis.get("comment_ratio", 0.0), 2.0),
+        math.log1p(len(analysis.get("functions") or [])),
+        float(len(analysis.get("classes") or [])),
+        math.log1p(len(analysis.get("imports") or [])),
+        float(bool(analysis.get("has_docstrings"))),
+        float(bool(analysis.get("has_type_hints"))),
+        float(bool(analysis.get("has_error_handling"))),
+        float(bool(analysis.get("has_main_guard"))),
+        float(bool(analysis.get("has_tests"))),
+        float(analysis.get("nested_loops", 0)),
+        float(analysis.get("max_nesting_depth", 0)),
+        math.log1p(analysis.get("longest_function_lines", 0)),
+        len(analysis.get("single_char_vars") or []) / max(len(names), 1),
+        float(naming == "good"),
+        float(naming == "poor"),
+        float(not names),
+        float(not analysis.get("is_valid_syntax", True)),
+        float(not analysis.get("functions")),
+        float(bool(analysis.get("partial"))),
+        time_order or 0.0,
+        space_order or 0.0,
+        float(time_order is None),
+    ]
+
+
+def _inverse(matrix: list[list[float]]) -> list[list[float]]:
+    """Inverse of a symmetric positive definite matrix by Gauss-Jordan elimination."""
+    size = len(matrix)
+    rows = [row[:] + [float(i == j) for j in range(size)] for i, row in enumerate(matrix)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(rows[r][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        scale = rows[col][col]
+        rows[col] = [value / scale for value in rows[col]]
+        for r in range(size):
+            factor = rows[r][col]
+            if r != col and factor:
+                pivot_row = rows[col]
+                rows[r] = [value - factor * p for value, p in zip(rows[r], pivot_row)]
+    return [row[size:] for row in rows]
+
+
+def _training_pairs(results: list[dict]) -> list[tuple[dict, list[float]]]:
+    """(analysis, six scores) of every stored result the model can learn from."""
+    pairs = []
+    for result in results:
+        analysis, dims = result.get("static_analysis"), result.get("dimensions") or {}
+        if result.get("error") or result.get("scored_by") == "surrogate" or not analysis:
+            continue
+        if all(key in dims and "score" in dims[key] for key in DIMENSIONS):
+            pairs.append((analysis, [float(dims[key]["score"]) for key in DIMENSIONS]))
+    return pairs
+
+
+class SurrogateScorer:
+    """Ridge regression from static-analysis features to the six dimension scores.
+
+    Args:
+        alpha: ridge penalty on the standardized features
+        confidence: coverage of the prediction intervals (0 < confidence < 1)
+    """
+
+    def __init__(self, alpha: float = DEFAULT_ALPHA, confidence: float = DEFAULT_CONFIDENCE):
+        if alpha <= 0:
+            raise ValueError(f"alpha must be positive, got {alpha}")
+        if not 0 < confidence < 1:
+            raise ValueError(f"confidence must be between 0 and 1, got {confidence}")
+        self.alpha = alpha
+        self.confidence = confidence
+        self.trained_on = 0
+        self._mean = self._scale = self._y_mean = None
+        self._weights = self._a_inv = self._residual_cov = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self._weights is not None
+
+    def fit(self, results: list[dict]) -> "SurrogateScorer":
+        """Train on stored evaluate_code() results; errors and surrogate-scored results are skipped.
+
+        Raises ValueError with fewer than MIN_TRAINING_RESULTS usable results.
+        """
+        pairs = _training_pairs(results)
+        if len(pairs) < MIN_TRAINING_RESULTS:
+            raise ValueError(f"need at least {MIN_TRAINING_RESULTS} scored results to train, got {len(pairs)}")
+        n, d, k = len(pairs), len(FEATURES), len(DIMENSIONS)
+        xs = [features(analysis) for analysis, _ in pairs]
+        ys = [scores for _, scores in pairs]
+
+        self._mean = [sum(column) / n for column in zip(*xs)]
+        self._scale = [math.sqrt(sum((v - m) ** 2 for v in column) / n)
+                       for column, m in zip(zip(*xs), self._mean)]
+        # A feature constant in training keeps a rounding-error spread; scaling by it
+        # would turn any new value into an astronomically large z-score
+        self._scale = [s if s > _CONSTANT_TOLERANCE * (1 + abs(m)) else 1.0
+                       for s, m in zip(self._scale, self._mean)]
+        self._y_mean = [sum(column) / n for column in zip(*ys)]
+        zs = [self._standardize(x) for x in xs]
+        centered = [[y - m for y, m in zip(row, self._y_mean)] for row in ys]
+
+        # Normal equations (ZᵀZ + αI) W = Zᵀ(Y - ȳ), one right-hand side per dimension
+        gram = [[sum(z[i] * z[j] for z in zs) + (self.alpha if i == j else 0.0) for j in range(d)]
+                for i in range(d)]
+        self._a_inv = _inverse(gram)
+        zty = [[sum(z[i] * row[c] for z, row in zip(zs, centered)) for c in range(k)] for i in range(d)]
+        self._weights = [[sum(self._a_inv[i][j] * zty[j][c] for j in range(d)) for c in range(k)]
+                         for i in range(d)]
+
+        # Residual covariance, with the ridge fit's effective degrees of freedom
+        residuals = [[y - p for y, p in zip(row, self._raw_predict(z))] for z, row in zip(zs, ys)]
+        effective_df = d - self.alpha * sum(self._a_inv[i][i] for i in range(d))
+        dof = max(n - effective_df - 1, 1.0)
+        self._residual_cov = [[sum(r[a] * r[b] for r in residuals) / dof for b in range(k)] for a in range(k)]
+        self.trained_on = n
+        return self
+
+    def _standardize(self, x: list[float]) -> list[float]:
+        return [(v - m) / s for v, m, s in zip(x, self._mean, self._scale)]
+
+    def _raw_predict(self, z: list[float]) -> list[float]:
+        return [m + sum(zi * self._weights[i][c] for i, zi in enumerate(z))
+                for c, m in enumerate(self._y_mean)]
+
+    def predict(self, analysis: dict) -> dict:
+        """Predicted scores for an analyze_code() result.
+
+        Returns:
+            dict with "dimensions" ({key: {"score", "margin"}}), "overall_score",
+            "overall_margin", "verdict", "verdict_emoji", "confidence" and
+            "partial" (the analysis was cut short, so its features are incomplete)
+        """
+        if not self.is_trained:
+            raise ValueError("surrogate scorer is not trained")
+        z = self._standardize(features(analysis))
+        raw = self._raw_predict(z)
+        # Variance of a new observation: residual variance × (1 + leverage of z)
+        leverage = 1.0 / self.trained_on + sum(
+            z[i] * sum(self._a_inv[i][j] * z[j] for j in range(len(z))) for i in range(len(z)))
+        quantile = NormalDist().inv_cdf((1 + self.confidence) / 2)
+        dims = {}
+        for c, key in enumerate(DIMENSIONS):
+            margin = quantile * math.sqrt(self._residual_cov[c][c] * (1 + leverage))
+            dims[key] = {"score": int(round(min(max(raw[c], 0.0), 100.0))), "margin": round(margin, 1)}
+        weights = [WEIGHTS[key] for key in DIMENSIONS]
+        overall_variance = sum(weights[a] * weights[b] * self._residual_cov[a][b]
+                               for a in range(len(weights)) for b in range(len(weights)))
+        overall_score = compute_overall_score(dims)
+        verdict, verdict_emoji = get_verdict(overall_score)
+        return {
+            "dimensions": dims,
+            "overall_score": overall_score,
+            "overall_margin": round(quantile * math.sqrt(max(overall_variance, 0.0) * (1 + leverage)), 1),
+            "verdict": verdict,
+            "verdict_emoji": verdict_emoji,
+            "confidence": self.confidence,
+            "partial": bool(analysis.get("partial")),
+        }
+
+    @staticmethod
+    def is_clear_cut(prediction: dict) -> bool:
+        """True if the interval of the overall score lies within one verdict band."""
+        if prediction["partial"]:
+            return False
+        low = max(prediction["overall_score"] - prediction["overall_margin"], 0)
+        high = min(prediction["overall_score"] + prediction["overall_margin"], 100)
+        return get_verdict(math.floor(low)) == get_verdict(math.ceil(high))
+
+    def to_dict(self) -> dict:
+        if not self.is_trained:
+            raise ValueError("surrogate scorer is not trained")
+        return {
+            "format_version": _FORMAT_VERSION,
+            "features": list(FEATURES),
+            "dimensions": DIMENSIONS,
+            "alpha": self.alpha,
+            "confidence": self.confidence,
+            "trained_on": self.trained_on,
+            "mean": self._mean,
+            "scale": self._scale,
+            "y_mean": self._y_mean,
+            "weights": self._weights,
+            "a_inv": self._a_inv,
+            "residual_cov": self._residual_cov,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SurrogateScorer":
+        if data.get("format_version") != _FORMAT_VERSION or data.get("features") != list(FEATURES) \
+                or data.get("dimensions") != DIMENSIONS:
+            raise ValueError("surrogate model was saved with different features; retrain it")
+        scorer = cls(data["alpha"], data["confidence"])
+        scorer.trained_on = data["trained_on"]
+        scorer._mean, scorer._scale, scorer._y_mean = data["mean"], data["scale"], data["y_mean"]
+        scorer._weights, scorer._a_inv = data["weights"], data["a_inv"]
+        scorer._residual_cov = data["residual_cov"]
+        return scorer
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: str) -> "SurrogateScorer":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def surrogate_result(prediction: dict, language: str, static_analysis: dict, reason: str) -> dict:
+    """An evaluate_code()-shaped result from a surrogate prediction."""
+    dims = {
+        key: {**scores, "suggestion": f"Predicted from static analysis (± {scores['margin']})"}
+        for key, scores in prediction["dimensions"].items()
+    }
+    return {
+        "overall_score": prediction["overall_score"],
+        "verdict": prediction["verdict"],
+        "verdict_emoji": prediction["verdict_emoji"],
+        "language": language,
+        "dimensions": dims,
+        "strengths": [],
+        "improvements": [],
+        "better_approach": None,
+        "static_analysis": static_analysis,
+        "error": None,
+        "scored_by": "surrogate",
+        "surrogate_reason": reason,
+        "preliminary": prediction,
+    }
+
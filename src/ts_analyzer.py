@@ -1,7 +1,9 @@
 """Tree-sitter-based static analysis for non-Python languages."""
 
 import re
-from src.analyzer import assess_naming
+import time
+from src.analyzer import BUDGET_CHECK_INTERVAL, assess_naming, deadline_passed, make_deadline
+from src.complexity import estimate_ts
 
 # Maps Echelon language names to tree-sitter parser names
 LANGUAGE_TO_PARSER = {
@@ -22,9 +24,11 @@ _LANGUAGE_CONFIG = {
         "class_nodes": {"class_declaration"},
         "import_nodes": {"import_statement"},
         "comment_nodes": {"comment"},
+        "string_nodes": {"string_fragment"},  # literal text only, not ${...}
         "error_handling_nodes": {"try_statement"},
         "loop_nodes": {"for_statement", "for_in_statement", "while_statement", "do_statement"},
         "conditional_nodes": {"if_statement", "switch_statement"},
+        "call_nodes": {"call_expression"},
         "assignment_nodes": {"variable_declarator"},
         "has_static_types": False,
         "main_guard_check": None,
@@ -36,9 +40,11 @@ _LANGUAGE_CONFIG = {
         "class_nodes": {"class_declaration"},
         "import_nodes": {"import_statement"},
         "comment_nodes": {"comment"},
+        "string_nodes": {"string_fragment"},  # literal text only, not ${...}
         "error_handling_nodes": {"try_statement"},
         "loop_nodes": {"for_statement", "for_in_statement", "while_statement", "do_statement"},
         "conditional_nodes": {"if_statement", "switch_statement"},
+        "call_nodes": {"call_expression"},
         "assignment_nodes": {"variable_declarator"},
         "has_static_types": True,
         "main_guard_check": None,
@@ -50,9 +56,11 @@ _LANGUAGE_CONFIG = {
         "class_nodes": {"class_declaration", "interface_declaration"},
         "import_nodes": {"import_declaration"},
         "comment_nodes": {"line_comment", "block_comment"},
+        "string_nodes": {"string_literal", "character_literal"},
         "error_handling_nodes": {"try_statement"},
         "loop_nodes": {"for_statement", "enhanced_for_statement", "while_statement", "do_statement"},
         "conditional_nodes": {"if_statement", "switch_expression"},
+        "call_nodes": {"method_invocation"},
         "assignment_nodes": {"variable_declarator"},
         "has_static_types": True,
         "main_guard_check": "public static void main",
@@ -64,9 +72,11 @@ _LANGUAGE_CONFIG = {
         "class_nodes": {"struct_specifier"},
         "import_nodes": {"preproc_include"},
         "comment_nodes": {"comment"},
+        "string_nodes": {"string_literal", "char_literal"},
         "error_handling_nodes": set(),
         "loop_nodes": {"for_statement", "while_statement", "do_statement"},
         "conditional_nodes": {"if_statement", "switch_statement"},
+        "call_nodes": {"call_expression"},
         "assignment_nodes": {"init_declarator"},
         "has_static_types": True,
         "main_guard_check": "int main",
@@ -78,9 +88,11 @@ _LANGUAGE_CONFIG = {
         "class_nodes": {"class_specifier", "struct_specifier"},
         "import_nodes": {"preproc_include"},
         "comment_nodes": {"comment"},
+        "string_nodes": {"string_literal", "raw_string_literal", "char_literal"},
         "error_handling_nodes": {"try_statement"},
         "loop_nodes": {"for_statement", "for_range_loop", "while_statement", "do_statement"},
         "conditional_nodes": {"if_statement", "switch_statement"},
+        "call_nodes": {"call_expression"},
         "assignment_nodes": {"init_declarator"},
         "has_static_types": True,
         "main_guard_check": "int main",
@@ -92,9 +104,11 @@ _LANGUAGE_CONFIG = {
         "class_nodes": {"type_declaration"},
         "import_nodes": {"import_declaration"},
         "comment_nodes": {"comment"},
+        "string_nodes": {"interpreted_string_literal", "raw_string_literal", "rune_literal"},
         "error_handling_nodes": set(),  # Go uses `if err != nil` — handled via heuristic
         "loop_nodes": {"for_statement"},
         "conditional_nodes": {"if_statement", "expression_switch_statement", "type_switch_statement"},
+        "call_nodes": {"call_expression"},
         "assignment_nodes": {"short_var_declaration", "var_declaration"},
         "has_static_types": True,
         "main_guard_check": "func main()",
@@ -107,9 +121,11 @@ _LANGUAGE_CONFIG = {
         "class_nodes": {"class", "module"},
         "import_nodes": set(),  # Ruby uses require() calls — handled via heuristic
         "comment_nodes": {"comment"},
+        "string_nodes": {"string_content", "heredoc_content"},  # not #{...}
         "error_handling_nodes": {"begin"},
         "loop_nodes": {"for", "while", "until"},
         "conditional_nodes": {"if", "unless", "case"},
+        "call_nodes": {"call"},
         "assignment_nodes": {"assignment"},
         "has_static_types": False,
         "main_guard_check": 'if __FILE__ == $0',
@@ -121,9 +137,11 @@ _LANGUAGE_CONFIG = {
         "class_nodes": {"struct_item", "enum_item", "trait_item"},
         "import_nodes": {"use_declaration"},
         "comment_nodes": {"line_comment", "block_comment"},
+        "string_nodes": {"string_literal", "raw_string_literal", "char_literal"},
         "error_handling_nodes": set(),  # Rust uses ? operator — handled via heuristic
         "loop_nodes": {"for_expression", "while_expression", "loop_expression"},
         "conditional_nodes": {"if_expression", "match_expression"},
+        "call_nodes": {"call_expression", "macro_invocation"},
         "assignment_nodes": {"let_declaration"},
         "has_static_types": True,
         "main_guard_check": "fn main()",
@@ -134,6 +152,31 @@ _LANGUAGE_CONFIG = {
 }
 
 
+# Text heuristics, collected by one compiled scanner per language (see
+# _get_scanner). Every alternative starts with a literal byte, so the regex
+# engine can skip ahead to candidate positions, and none of them rescans, so
+# matching stays linear even on huge or unterminated literals.
+_BLANK_SPACE = rb"[ \t\x0b\x0c\r\x1c-\x1f]*"
+_BLANK_LINE_PATTERN = rb"\n" + _BLANK_SPACE + rb"(?=\n|\Z)"  # a blank line after this newline
+_FIRST_LINE_BLANK_RE = re.compile(_BLANK_SPACE + rb"(?:\n|\Z)")
+_REQUIRE_PATTERNS = {
+    "ruby": rb"require\s*(?:\(\s*)?[\"']([^\"'\n]+)[\"']",
+    "javascript": rb"require\s*\(\s*[\"']([^\"'\n]+)[\"']",
+    "typescript": rb"require\s*\(\s*[\"']([^\"'\n]+)[\"']",
+}
+# Names that count as a test call when followed by "(" or "." at a word boundary
+_TEST_CALL_NAMES = (b"assert", b"expect", b"describe", b"it", b"test")
+_WORD_BYTES = frozenset(b"0123456789_ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz") | frozenset(range(128, 256))
+
+_SCANNER_CACHE = {}
+
+# Source is fed to the parser in chunks of this size when a time budget is set
+_PARSE_CHUNK_BYTES = 16 * 1024
+
+# Parsers are expensive to construct (grammar load), so keep one per language
+_PARSER_CACHE = {}
+
+
 def _get_parser(language: str):
     """Return (parser, config) for a given Echelon language name."""
     parser_name = LANGUAGE_TO_PARSER.get(language)
@@ -144,16 +187,49 @@ def _get_parser(language: str):
     if config is None:
         return None, None
 
-    from tree_sitter_language_pack import get_parser
-    parser = get_parser(parser_name)
+    parser = _PARSER_CACHE.get(parser_name)
+    if parser is None:
+        from tree_sitter_language_pack import get_parser
+        parser = get_parser(parser_name)
+        _PARSER_CACHE[parser_name] = parser
     return parser, config
 
 
-def _walk_tree(node):
-    """Depth-first generator yielding all nodes in the tree."""
-    yield node
-    for child in node.children:
-        yield from _walk_tree(child)
+def preload_parsers(languages=None) -> None:
+    """Load and cache tree-sitter grammars up front.
+
+    Args:
+        languages: Echelon language names to load, or None for all supported
+    """
+    for language in languages or LANGUAGE_TO_PARSER:
+        _get_parser(language)
+
+
+def _get_scanner(language: str, config: dict):
+    """Return (pattern, kinds): the compiled text-heuristic scanner for a language.
+
+    One finditer() pass over the source bytes yields every blank line after
+    the first, each require() import (group 1), and each error-handling
+    idiom, main guard and test call; `kinds` maps the matched literal of the
+    latter to "error", "main" or "test".
+    """
+    scanner = _SCANNER_CACHE.get(language)
+    if scanner is None:
+        alternatives = [_BLANK_LINE_PATTERN]
+        kinds = {}
+        require_pattern = _REQUIRE_PATTERNS.get(LANGUAGE_TO_PARSER[language])
+        if config.get("require_import") and require_pattern:
+            alternatives.append(require_pattern)
+        for literal, kind in ((config.get("error_heuristic"), "error"), (config["main_guard_check"], "main")):
+            if literal:
+                alternatives.append(re.escape(literal.encode()))
+                kinds[literal.encode()] = kind
+        for name in _TEST_CALL_NAMES:
+            alternatives.append(name + rb"(?=\s*[\(.])")
+            kinds[name] = "test"
+        scanner = (re.compile(b"|".join(alternatives)), kinds)
+        _SCANNER_CACHE[language] = scanner
+    return scanner
 
 
 def _get_node_text(node, code_bytes: bytes) -> str:
@@ -185,33 +261,6 @@ def _extract_class_name(node, code_bytes: bytes) -> str | None:
     return None
 
 
-def _max_nesting_depth(node, config: dict, current: int = 0) -> int:
-    """Recursively compute the maximum nesting depth of loops/conditionals."""
-    nesting_nodes = config["loop_nodes"] | config["conditional_nodes"]
-    max_depth = current
-    for child in node.children:
-        if child.type in nesting_nodes:
-            max_depth = max(max_depth, _max_nesting_depth(child, config, current + 1))
-        else:
-            max_depth = max(max_depth, _max_nesting_depth(child, config, current))
-    return max_depth
-
-
-def _count_nested_loops(node, config: dict) -> int:
-    """Count loop nodes that contain other loop nodes."""
-    count = 0
-    loop_types = config["loop_nodes"]
-
-    for child in _walk_tree(node):
-        if child.type in loop_types:
-            # Check if this loop contains another loop
-            for descendant in _walk_tree(child):
-                if descendant is not child and descendant.type in loop_types:
-                    count += 1
-                    break
-    return count
-
-
 def _function_line_count(node) -> int:
     """Return the number of lines a function spans."""
     return node.end_point[0] - node.start_point[0] + 1
@@ -225,128 +274,243 @@ def _extract_variable_name(node, code_bytes: bytes, config: dict) -> str | None:
     return None
 
 
-def analyze_code_treesitter(code: str, language: str) -> dict:
-    """
-    Analyze code using tree-sitter and return the same dict shape as analyze_python_code().
-
-    Args:
-        code: Source code string
-        language: Echelon language name (e.g. "JavaScript", "Java")
-
-    Returns:
-        dict with the same keys as analyze_python_code()
-    """
-    parser, config = _get_parser(language)
-    if parser is None:
-        return None
-
-    lines = code.split("\n")
-    total_lines = len(lines)
-    blank_lines = sum(1 for line in lines if not line.strip())
+def _new_metrics() -> dict:
+    """Empty per-subtree metrics, merged into a full analysis by _finalize_analysis()."""
+    return {
+        "functions": [],
+        "classes": [],
+        "imports": [],
+        "variable_names": [],
+        "comment_texts": [],
+        "comment_lines": 0,
+        "has_docstrings": False,
+        "has_error_handling": False,
+        "has_tests": False,
+        "longest_function_lines": 0,
+        "nested_loops": 0,
+        "max_nesting_depth": 0,
+        "loop_count": 0,
+        # (start, end) byte offsets of comments and string literals, in document order
+        "masked_spans": [],
+        "partial": False,
+    }
 
-    code_bytes = code.encode("utf-8")
-    tree = parser.parse(code_bytes)
 
-    # Syntax validity
-    is_valid_syntax = not tree.root_node.has_error
-    syntax_error = None
-    if not is_valid_syntax:
-        for node in _walk_tree(tree.root_node):
-            if node.type == "ERROR":
-                row, col = node.start_point
-                syntax_error = f"Syntax error at line {row + 1}, column {col}"
-                break
-        if syntax_error is None:
-            syntax_error = "Syntax error detected"
+def _merge_metrics(metrics: dict, partial: dict, depth: int, loop_flag: list | None,
+                   offset: int) -> None:
+    """Fold a subtree's metrics into `metrics` as if it sat at `depth` below `loop_flag`.
 
-    # Walk the tree and collect data
-    functions = []
-    classes = []
-    imports = []
-    comment_lines_count = 0
-    has_docstrings = False
-    has_error_handling = False
-    has_tests = False
-    longest_function_lines = 0
-    variable_names = []
-    comment_texts = []
-
-    for node in _walk_tree(tree.root_node):
+    The subtree's masked spans are stored relative to its start and are
+    shifted by `offset` into the coordinates of `metrics`.
+    """
+    for key in ("functions", "classes", "imports", "variable_names", "comment_texts"):
+        metrics[key].extend(partial[key])
+    metrics["masked_spans"].extend((start + offset, end + offset) for start, end in partial["masked_spans"])
+    metrics["comment_lines"] += partial["comment_lines"]
+    for key in ("has_docstrings", "has_error_handling", "has_tests", "partial"):
+        metrics[key] = metrics[key] or partial[key]
+    metrics["longest_function_lines"] = max(metrics["longest_function_lines"], partial["longest_function_lines"])
+    metrics["max_nesting_depth"] = max(metrics["max_nesting_depth"], depth + partial["max_nesting_depth"])
+    metrics["nested_loops"] += partial["nested_loops"]
+    metrics["loop_count"] += partial["loop_count"]
+    # A loop enclosing a subtree that has loops is itself a nested loop
+    if partial["loop_count"] and loop_flag is not None and not loop_flag[0]:
+        loop_flag[0] = True
+        metrics["nested_loops"] += 1
+
+
+def _collect_metrics(roots, code_bytes: bytes, config: dict, function_cache: dict | None = None,
+                     deadline: float | None = None, base: int = 0) -> dict:
+    """Walk the subtrees under `roots` once and collect position-independent metrics.
+
+    Byte offsets in "masked_spans" are relative to `base`. When `function_cache` is given, the bodies of outermost functions are looked
+    up by (node type, source text) and only walked on a cache miss, so unchanged
+    functions cost nothing on re-analysis. The walk uses an explicit stack, and
+    stops with "partial": True once the thread CPU-time `deadline` passes.
+    """
+    metrics = _new_metrics()
+    nesting_nodes = config["loop_nodes"] | config["conditional_nodes"]
+    loop_nodes = config["loop_nodes"]
+    string_nodes = config["string_nodes"]
+    masked_spans = metrics["masked_spans"]
+
+    # (node, nesting depth, flag of nearest enclosing loop, inside a function)
+    stack = [(node, 0, None, False) for node in reversed(roots)]
+    visited = 0
+    while stack:
+        visited += 1
+        if visited % BUDGET_CHECK_INTERVAL == 0 and deadline_passed(deadline):
+            metrics["partial"] = True
+            break
+
+        node, depth, loop_flag, in_function = stack.pop()
         node_type = node.type
 
+        if node_type in nesting_nodes:
+            depth += 1
+            if depth > metrics["max_nesting_depth"]:
+                metrics["max_nesting_depth"] = depth
+        if node_type in loop_nodes:
+            metrics["loop_count"] += 1
+            if loop_flag is not None and not loop_flag[0]:
+                loop_flag[0] = True
+                metrics["nested_loops"] += 1
+            loop_flag = [False]
+
         # Functions
         if node_type in config["function_nodes"]:
             name = _extract_function_name(node, code_bytes, config)
             if name:
-                functions.append(name)
+                metrics["functions"].append(name)
                 # Check for test functions
                 if name.startswith("test") or name.startswith("Test"):
-                    has_tests = True
+                    metrics["has_tests"] = True
 
             # Track longest function
             fl = _function_line_count(node)
-            if fl > longest_function_lines:
-                longest_function_lines = fl
+            if fl > metrics["longest_function_lines"]:
+                metrics["longest_function_lines"] = fl
+
+            if function_cache is not None and not in_function:
+                key = (node_type, code_bytes[node.start_byte:node.end_byte])
+                partial = function_cache.get(key)
+                if partial is None:
+                    partial = _collect_metrics(node.children, code_bytes, config, deadline=deadline,
+                                               base=node.start_byte)
+                    # Never cache metrics cut short by the time budget
+                    if not partial["partial"]:
+                        function_cache[key] = partial
+                _merge_metrics(metrics, partial, depth, loop_flag, node.start_byte - base)
+                continue
+            in_function = True
 
         # Classes
         elif node_type in config["class_nodes"]:
             name = _extract_class_name(node, code_bytes)
             if name:
-                classes.append(name)
+                metrics["classes"].append(name)
 
         # Imports
         elif node_type in config["import_nodes"]:
-            imports.append(_get_node_text(node, code_bytes).strip())
+            metrics["imports"].append(_get_node_text(node, code_bytes).strip())
 
         # Comments
         elif node_type in config["comment_nodes"]:
+            masked_spans.append((node.start_byte - base, node.end_byte - base))
             text = _get_node_text(node, code_bytes)
-            comment_texts.append(text)
+            metrics["comment_texts"].append(text)
             # Count comment lines (multi-line comments span multiple lines)
-            comment_lines_count += text.count("\n") + 1
+            metrics["comment_lines"] += text.count("\n") + 1
             # Check for docstring patterns
             if config["docstring_pattern"] and text.startswith(config["docstring_pattern"]):
-                has_docstrings = True
+                metrics["has_docstrings"] = True
+
+        # String literals
+        elif node_type in string_nodes:
+            masked_spans.append((node.start_byte - base, node.end_byte - base))
 
         # Error handling
         elif config["error_handling_nodes"] and node_type in config["error_handling_nodes"]:
-            has_error_handling = True
+            metrics["has_error_handling"] = True
 
         # Assignments / variable declarations
         elif node_type in config["assignment_nodes"]:
             var_name = _extract_variable_name(node, code_bytes, config)
             if var_name:
-                variable_names.append(var_name)
+                metrics["variable_names"].append(var_name)
 
-    # Ruby: detect require() calls as imports
-    if config.get("require_import") and language == "Ruby":
-        for match in re.finditer(r'require\s*[\(]?\s*["\']([^"\']+)["\']', code):
-            imports.append(match.group(1))
+        children = node.children
+        for child in reversed(children):
+            stack.append((child, depth, loop_flag, in_function))
 
-    # JS/TS: detect require() calls as additional imports
-    if config.get("require_import") and language in ("JavaScript", "TypeScript"):
-        for match in re.finditer(r'require\s*\(\s*["\']([^"\']+)["\']', code):
-            imports.append(match.group(1))
+    return metrics
 
-    # Go error handling heuristic: if err != nil
-    if config.get("error_heuristic") and not has_error_handling:
-        if config["error_heuristic"] in code:
-            has_error_handling = True
 
-    # Rust error handling heuristic: ? operator
-    if language == "Rust" and not has_error_handling:
-        # Look for ? operator usage (not in comments)
-        if re.search(r'[a-zA-Z_]\w*\?\s*[;,)]', code):
-            has_error_handling = True
+def _find_syntax_error(root) -> str:
+    """Describe the first ERROR node in document order, searching only erroneous subtrees."""
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node.type == "ERROR":
+            row, col = node.start_point
+            return f"Syntax error at line {row + 1}, column {col}"
+        stack.extend(child for child in reversed(node.children) if child.has_error)
+    return "Syntax error detected"
 
-    # Main guard detection
-    has_main_guard = False
-    if config["main_guard_check"]:
-        has_main_guard = config["main_guard_check"] in code
 
-    # Test detection via assert patterns
-    if not has_tests:
-        if re.search(r'\b(assert|expect|describe|it|test)\s*[\(.]', code):
+def _parse(parser, code_bytes: bytes, deadline: float | None = None, old_tree=None):
+    """Parse `code_bytes`, cutting the input off once `deadline` passes.
+
+    tree-sitter's error recovery can be super-linear on adversarial input,
+    so with a deadline the source is fed in chunks and the parser sees end of
+    input as soon as the budget is spent. Returns (tree, truncated).
+    """
+    if deadline is None:
+        if old_tree is None:
+            return parser.parse(code_bytes), False
+        return parser.parse(code_bytes, old_tree), False
+
+    truncated = False
+
+    def read(offset, _point):
+        nonlocal truncated
+        if offset >= len(code_bytes):
+            return b""
+        if time.thread_time() > deadline:
+            truncated = True
+            return b""
+        return code_bytes[offset:offset + _PARSE_CHUNK_BYTES]
+
+    tree = parser.parse(read) if old_tree is None else parser.parse(read, old_tree)
+    return tree, truncated
+
+
+def _analyze_tree(code: str, code_bytes: bytes, tree, language: str, config: dict,
+                  function_cache: dict | None = None, deadline: float | None = None) -> dict:
+    """Build the analysis dict for an already-parsed tree."""
+    total_lines = code.count("\n") + 1
+
+    # Syntax validity
+    is_valid_syntax = not tree.root_node.has_error
+    syntax_error = None if is_valid_syntax else _find_syntax_error(tree.root_node)
+
+    # Walk the tree and collect data
+    metrics = _collect_metrics([tree.root_node], code_bytes, config, function_cache, deadline)
+    imports = metrics["imports"]
+    has_error_handling = metrics["has_error_handling"]
+    has_tests = metrics["has_tests"]
+    comment_lines_count = metrics["comment_lines"]
+    variable_names = metrics["variable_names"]
+
+    # One pass over the bytes for blank lines and the text heuristics
+    # (require() imports, `if err != nil`, Rust `?`, main guard, test calls).
+    # Hits that start inside a comment or string literal are skipped.
+    pattern, kinds = _get_scanner(language, config)
+    blank_lines = 1 if _FIRST_LINE_BLANK_RE.match(code_bytes) else 0
+    has_main_guard = False
+    spans = metrics["masked_spans"]
+    span_index = 0
+    masked_until = 0
+    for match in pattern.finditer(code_bytes):
+        position = match.start()
+        if code_bytes[position] == 0x0A:
+            blank_lines += 1
+            continue
+        # Spans arrive in document order and may nest (template strings)
+        while span_index < len(spans) and spans[span_index][0] <= position:
+            masked_until = max(masked_until, spans[span_index][1])
+            span_index += 1
+        if position < masked_until:
+            continue
+        if match.lastindex:
+            imports.append(match.group(1).decode("utf-8", errors="replace"))
+            continue
+        kind = kinds[match.group()]
+        if kind == "error":
+            has_error_handling = True
+        elif kind == "main":
+            has_main_guard = True
+        elif position == 0 or code_bytes[position - 1] not in _WORD_BYTES:
             has_tests = True
 
     # Type hints: statically typed languages always have type hints
@@ -356,7 +520,7 @@ def analyze_code_treesitter(code: str, language: str) -> dict:
         has_type_hints = True
     elif language == "JavaScript":
         # Check for JSDoc type annotations
-        has_type_hints = any("@type" in c or "@param" in c or "@returns" in c for c in comment_texts)
+        has_type_hints = any("@type" in c or "@param" in c or "@returns" in c for c in metrics["comment_texts"])
 
     # Compute derived metrics
     code_lines = total_lines - blank_lines - comment_lines_count
@@ -364,25 +528,68 @@ def analyze_code_treesitter(code: str, language: str) -> dict:
     single_char_vars = [v for v in variable_names if len(v) == 1]
     naming_quality = assess_naming(variable_names)
 
+    # Static big-O estimate, skipped once the time budget is spent
+    partial = metrics["partial"]
+    complexity = None
+    if not partial:
+        complexity = estimate_ts(tree.root_node, code_bytes, language, config, deadline)
+        partial = complexity is None
+
     return {
         "total_lines": total_lines,
         "blank_lines": blank_lines,
         "comment_lines": comment_lines_count,
         "comment_ratio": comment_ratio,
-        "functions": functions,
-        "classes": classes,
+        "functions": metrics["functions"],
+        "classes": metrics["classes"],
         "imports": imports,
-        "has_docstrings": has_docstrings,
+        "has_docstrings": metrics["has_docstrings"],
         "has_type_hints": has_type_hints,
         "has_error_handling": has_error_handling,
         "has_main_guard": has_main_guard,
         "has_tests": has_tests,
-        "nested_loops": _count_nested_loops(tree.root_node, config),
-        "max_nesting_depth": _max_nesting_depth(tree.root_node, config),
-        "longest_function_lines": longest_function_lines,
+        "nested_loops": metrics["nested_loops"],
+        "max_nesting_depth": metrics["max_nesting_depth"],
+        "longest_function_lines": metrics["longest_function_lines"],
         "variable_names": variable_names,
         "single_char_vars": single_char_vars,
         "naming_quality": naming_quality,
         "is_valid_syntax": is_valid_syntax,
         "syntax_error": syntax_error,
+        "complexity": complexity,
+        "partial": partial,
     }
+
+
+def analyze_code_treesitter(code: str, language: str, submission=None,
+                            time_budget: float | None = None) -> dict:
+    """
+    Analyze code using tree-sitter and return the same dict shape as analyze_python_code().
+
+    Args:
+        code: Source code string
+        language: Echelon language name (e.g. "JavaScript", "Java")
+        submission: Optional Submission for `code` whose cached parse tree is reused
+        time_budget: Optional CPU-seconds budget for parsing and walking; if
+            exceeded, the result covers part of the code and has "partial": True
+
+    Returns:
+        dict with the same keys as analyze_python_code()
+    """
+    parser, config = _get_parser(language)
+    if parser is None:
+        return None
+
+    deadline = make_deadline(time_budget)
+    truncated = False
+    # An unparsed Submission would parse without the deadline, so only a cached tree is reused
+    if submission is not None and (deadline is None or "ts_tree" in submission.__dict__):
+        code_bytes = submission.code_bytes
+        tree = submission.ts_tree
+    else:
+        code_bytes = code.encode("utf-8")
+        tree, truncated = _parse(parser, code_bytes, deadline)
+
+    result = _analyze_tree(code, code_bytes, tree, language, config, deadline=deadline)
+    result["partial"] = result["partial"] or truncated
+    return result
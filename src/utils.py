@@ -25,6 +25,26 @@ def detect_language(filename: str) -> str:
     return "Unknown"
 
 
+def extract_json(text: str) -> dict:
+    """JSON object in LLM response text: markdown fences stripped, from the first { to the last }.
+
+    Raises ValueError (json.JSONDecodeError included) if there is none.
+    """
+    cleaned = text.strip()
+    # Strip markdown code fences
+    cleaned = re.sub(r"^```(?:json)?\s*\n?", "", cleaned)
+    cleaned = re.sub(r"\n?\s*```\s*$", "", cleaned)
+    cleaned = cleaned.strip()
+
+    # Extract JSON between first { and last }
+    first_brace = cleaned.index("{")
+    last_brace = cleaned.rindex("}")
+    data = json.loads(cleaned[first_brace : last_brace + 1])
+    if not isinstance(data, dict):
+        raise ValueError("LLM response is not a JSON object")
+    return data
+
+
 def parse_llm_response(text: str) -> dict:
     """Parse LLM response text into a dict.
 
@@ -33,18 +53,7 @@ def parse_llm_response(text: str) -> dict:
     so the app never crashes on bad LLM output.
     """
     try:
-        cleaned = text.strip()
-        # Strip markdown code fences
-        cleaned = re.sub(r"^```(?:json)?\s*\n?", "", cleaned)
-        cleaned = re.sub(r"\n?\s*```\s*$", "", cleaned)
-        cleaned = cleaned.strip()
-
-        # Extract JSON between first { and last }
-        first_brace = cleaned.index("{")
-        last_brace = cleaned.rindex("}")
-        json_str = cleaned[first_brace : last_brace + 1]
-
-        data = json.loads(json_str)
+        data = extract_json(text)
 
         # Validate that dimensions exist
         if "dimensions" not in data or not isinstance(data["dimensions"], dict):
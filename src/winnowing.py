@@ -0,0 +1,82 @@
+"""Karp-Rabin k-gram hashing and winnowing (Schleimer, Wilkerson & Aiken, 2003).
+
+Winnowing picks the minimum hash in every window of `window` consecutive
+k-gram hashes. Any shared substring of at least window + k - 1 characters is
+guaranteed to produce a shared fingerprint, while each document keeps only
+about 2 / (window + 1) of its k-gram hashes. The selection depends only on
+the text, so fingerprint sets can be compared by plain set overlap.
+
+Hashes are deterministic (unlike Python's salted str hash) and fit in 61
+bits, so fingerprints can be stored and compared across processes and runs.
+"""
+
+from collections import deque
+
+# Mersenne prime modulus and base for the rolling hash
+_MODULUS = (1 << 61) - 1
+_BASE = 257
+
+DEFAULT_K = 8
+DEFAULT_WINDOW = 4
+
+
+def kgram_hashes(sequence, k: int) -> list[int]:
+    """Karp-Rabin hash of every length-`k` window of `sequence`.
+
+    `sequence` is a str or a sequence of non-negative ints (e.g. token ids).
+    A non-empty sequence shorter than `k` hashes as a single k-gram.
+    """
+    values = [ord(ch) for ch in sequence] if isinstance(sequence, str) else list(sequence)
+    k = min(k, len(values))
+    if k <= 0:
+        return []
+    top = pow(_BASE, k - 1, _MODULUS)
+    h = 0
+    for value in values[:k]:
+        h = (h * _BASE + value) % _MODULUS
+    hashes = [h]
+    for i in range(k, len(values)):
+        h = ((h - values[i - k] * top) * _BASE + values[i]) % _MODULUS
+        hashes.append(h)
+    return hashes
+
+
+def winnow(hashes: list[int], window: int = DEFAULT_WINDOW) -> list[tuple[int, int]]:
+    """Select (hash, position) fingerprints: the rightmost minimum of every window.
+
+    Runs in O(len(hashes)) with a monotonic deque. Consecutive windows that
+    share their minimum record it once.
+    """
+    if not hashes:
+        return []
+    if len(hashes) <= window:
+        position = min(range(len(hashes)), key=lambda i: (hashes[i], -i))
+        return [(hashes[position], position)]
+
+    fingerprints = []
+    candidates = deque()  # positions with increasing hashes
+    last = -1
+    for i, h in enumerate(hashes):
+        while candidates and hashes[candidates[-1]] >= h:
+            candidates.pop()
+        candidates.append(i)
+        if candidates[0] <= i - window:
+            candidates.popleft()
+        if i >= window - 1 and candidates[0] != last:
+            last = candidates[0]
+            fingerprints.append((hashes[last], last))
+    return fingerprints
+
+
+def fingerprint(sequence, k: int = DEFAULT_K, window: int = DEFAULT_WINDOW) -> frozenset[int]:
+    """Set of winnowed k-gram hashes of `sequence`."""
+    return frozenset(h for h, _ in winnow(kgram_hashes(sequence, k), window))
+
+
+def fingerprint_similarity(fp_a: frozenset[int], fp_b: frozenset[int]) -> float:
+    """Dice overlap of two fingerprint sets. Returns 0.0-1.0."""
+    if not fp_a and not fp_b:
+        return 1.0
+    if not fp_a or not fp_b:
+        return 0.0
+    return 2 * len(fp_a & fp_b) / (len(fp_a) + len(fp_b))
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""Test script for the single-pass lexers (src/lexer.py).
+
+The Python lexer must give exactly the tokens of the stdlib tokenize module,
+and the generic lexer must differ from the splitter it replaced only in the
+documented ways. Both references live in benchmarks/lexer.py.
+"""
+
+import glob
+import io
+import re
+import sys
+import tokenize
+
+from benchmarks.lexer import reference_generic, reference_python
+from benchmarks.obfuscation import generate_cohort
+from src import lexer
+
+
+def _python_corpus() -> list[str]:
+    """This repository's Python files, a generated cohort, and mangled copies."""
+    codes = []
+    for path in sorted(glob.glob("*.py") + glob.glob("src/*.py") + glob.glob("benchmarks/*.py")
+                       + glob.glob("test_samples/*.py")):
+        with open(path, encoding="utf-8") as f:
+            codes.append(f.read())
+    submissions, _ = generate_cohort(60, seed=0)
+    codes.extend(s["code"] for s in submissions if s["language"] == "Python")
+    # Cut files short (unclosed brackets and strings, bad dedents) and add
+    # stray characters: tokenize rejects many of these, so the generic path runs
+    mangled = []
+    for code in codes:
+        mangled.append(code[:len(code) // 3])
+        mangled.append(code[:2 * len(code) // 3])
+        mangled.append(code.replace("(", "$(", 1))
+    return codes + mangled
+
+
+def _tokenize_accepts(code: str) -> bool:
+    try:
+        readline = io.BytesIO(code.encode("utf-8")).readline
+        return all(tok.type != tokenize.ERRORTOKEN for tok in tokenize.tokenize(readline))
+    except (tokenize.TokenError, SyntaxError):
+        return False
+
+
+def _split_literals(tokens: list[str]) -> list[str]:
+    # The old splitter glued a literal to an adjacent word or literal
+    # ("f__str__", "__str____str__", "__str__2025"): split those up again
+    return [part for token in tokens for piece in re.split(r"(__str__)", token) if piece
+            for part in ([piece] if piece == "__str__" else re.findall(r"[a-zA-Z_]\w*|\S", piece))]
+
+
+def test_python_parity():
+    """Python tokens equal tokenize's on real and mangled files."""
+    print("🐍 Testing tokenize parity on the Python path...")
+
+    corpus = _python_corpus()
+    accepted = [code for code in corpus if _tokenize_accepts(code)]
+    mismatches = [code for code in accepted if lexer.tokens(code, "Python") != reference_python(code)]
+    if mismatches:
+        print(f"  ❌ {len(mismatches)}/{len(accepted)} files differ from tokenize, e.g.:")
+        print("     " + repr(mismatches[0][:200]))
+        return False
+    print(f"  ✅ {len(accepted)} files tokenize identically")
+
+    # Code tokenize rejects goes to the generic lexer (see test_generic_deltas)
+    rejected = [code for code in corpus if not _tokenize_accepts(code)]
+    if any(lexer.tokens(code, "Python") != lexer.tokens(code, "Other") for code in rejected):
+        print("  ❌ Code tokenize rejects did not fall back to the generic lexer")
+        return False
+    print(f"  ✅ {len(rejected)} files tokenize rejects fall back to the generic lexer")
+    return True
+
+
+def test_token_lines():
+    """Token line numbers point at the line each token starts on."""
+    print("\n📍 Testing token lines...")
+
+    for language, code, expected in (
+        ("Python", 'def f(x):\n    s = """a\nb"""\n    return x  # done\n',
+         [1, 1, 1, 1, 1, 1, 2, 2, 2, 4, 4]),
+        ("Java", 'int f(int x) {\n    String s = "a\\\nb";\n    /* c\n    */ return x;\n}\n',
+         [1, 1, 1, 1, 1, 1, 1, 2, 2, 2, 2, 3, 5, 5, 5, 6]),
+    ):
+        _, lines = lexer.lex(code, language, lines=True)
+        if lines != expected:
+            print(f"  ❌ {language}: expected {expected}, got {lines}")
+            return False
+        print(f"  ✅ {language}: {lines}")
+    return True
+
+
+def test_generic_deltas():
+    """The generic lexer differs from the old splitter only in the documented ways."""
+    print("\n📜 Testing the generic lexer against the old splitter...")
+
+    # (code, old splitter, generic lexer)
+    cases = [
+        # Unchanged: literals and comments that don't interact
+        ('printf("%d", \'a\'); /* c */', ["printf", "(", "__str__", ",", "__str__", ")", ";"],
+         ["printf", "(", "__str__", ",", "__str__", ")", ";"]),
+        # A literal is its own token, never glued to an adjacent literal or word
+        ('x = """"', ["x", "=", "__str____str__"], ["x", "=", "__str__", "__str__"]),
+        ('name = f"{x}"', ["name", "=", "f__str__"], ["name", "=", "f", "__str__"]),
+        # Quotes pair up left to right: a quote in a comment opens nothing...
+        ("int a; // don't\nint b = 'c';", ["int", "a", ";"],
+         ["int", "a", ";", "int", "b", "=", "__str__", ";"]),
+        # ...and neither does a quote inside a literal of the other kind
+        ("a = 'it\"s'; b = \"x\"", ["a", "=", "'", "it__str__x", '"'],
+         ["a", "=", "__str__", ";", "b", "=", "__str__"]),
+    ]
+    for code, old, new in cases:
+        if reference_generic(code) != old or lexer.tokens(code, "Java") != new:
+            print(f"  ❌ {code!r}: old {reference_generic(code)}, new {lexer.tokens(code, 'Java')}")
+            return False
+    print(f"  ✅ {len(cases)} documented cases")
+
+    # Files without quote/comment interplay differ only by glued literals
+    submissions, _ = generate_cohort(60, seed=0)
+    codes = [s["code"] for s in submissions]
+    for path in sorted(glob.glob("test_samples/*")):
+        if not path.endswith((".py", ".txt")):
+            with open(path, encoding="utf-8") as f:
+                codes.append(f.read())
+    mismatches = sum(_split_literals(reference_generic(code)) != lexer.tokens(code, "Other") for code in codes)
+    if mismatches:
+        print(f"  ❌ {mismatches}/{len(codes)} files differ beyond glued literals")
+        return False
+    print(f"  ✅ {len(codes)} files match once glued literals are split")
+    return True
+
+
+def test_normalize_parity():
+    """normalize() keeps the old per-line output byte for byte."""
+    print("\n🧹 Testing normalized text...")
+
+    from benchmarks.lexer import reference_normalize
+
+    corpus = _python_corpus()
+    mismatches = sum(lexer.normalize(code) != reference_normalize(code) for code in corpus)
+    if mismatches:
+        print(f"  ❌ {mismatches}/{len(corpus)} files normalize differently")
+        return False
+    print(f"  ✅ {len(corpus)} files normalize identically")
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("🔤 Lexer Test Suite")
+    print("=" * 60)
+
+    tests = [
+        ("Python Parity", test_python_parity),
+        ("Token Lines", test_token_lines),
+        ("Generic Deltas", test_generic_deltas),
+        ("Normalize Parity", test_normalize_parity),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            passed = test_func()
+            results.append((name, passed))
+        except Exception as e:
+            print(f"\n  ❌ Test '{name}' crashed: {e}")
+            results.append((name, False))
+
+    print("\n" + "=" * 60)
+    print("📊 Test Results")
+    print("=" * 60)
+
+    for name, passed in results:
+        status = "✅ PASS" if passed else "❌ FAIL"
+        print(f"  {status}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    total_count = len(results)
+
+    print(f"\n🎯 Score: {passed_count}/{total_count} tests passed")
+
+    if passed_count == total_count:
+        print("\n🎉 All tests passed! Implementation is working correctly.")
+        return 0
+    else:
+        print("\n⚠️  Some tests failed. Check the output above.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""Test script for the similarity building blocks' invariants.
+
+Winnowing, token n-grams, MinHash/LSH, Greedy String Tiling and clustering
+each promise something their callers rely on (a guaranteed shared
+fingerprint, agreeing hash paths, a recall target, non-overlapping tiles,
+cuts that match connected components). Each test checks one promise on
+seeded random inputs.
+"""
+
+import random
+import sys
+import time
+
+
+def _random_text(rng: random.Random, n: int) -> str:
+    return "".join(rng.choice("abcdefgh(){};= \n") for _ in range(n))
+
+
+def test_winnowing():
+    """Shared substrings of window + k - 1 characters always share a fingerprint."""
+    print("🧂 Testing winnowing...")
+
+    from src.winnowing import DEFAULT_K, DEFAULT_WINDOW, fingerprint, kgram_hashes, winnow
+
+    rng = random.Random(0)
+    guarantee = DEFAULT_WINDOW + DEFAULT_K - 1
+    for _ in range(200):
+        shared = _random_text(rng, guarantee)
+        a = _random_text(rng, rng.randint(0, 80)) + shared + _random_text(rng, rng.randint(0, 80))
+        b = _random_text(rng, rng.randint(0, 80)) + shared + _random_text(rng, rng.randint(0, 80))
+        if not fingerprint(a) & fingerprint(b):
+            print(f"  ❌ No shared fingerprint for a shared substring of {guarantee} characters")
+            return False
+    print(f"  ✅ Shared substrings of {guarantee} characters always share a fingerprint")
+
+    # Every window's rightmost minimum is selected
+    for _ in range(50):
+        hashes = kgram_hashes(_random_text(rng, rng.randint(1, 300)), DEFAULT_K)
+        positions = {position for _, position in winnow(hashes, DEFAULT_WINDOW)}
+        for start in range(max(1, len(hashes) - DEFAULT_WINDOW + 1)):
+            window = hashes[start:start + DEFAULT_WINDOW]
+            rightmost = start + max(i for i, h in enumerate(window) if h == min(window))
+            if rightmost not in positions:
+                print(f"  ❌ Window at {start} lost its minimum")
+                return False
+    print("  ✅ Every window keeps its rightmost minimum")
+
+    hashes = kgram_hashes(_random_text(rng, 20000), DEFAULT_K)
+    density = len(winnow(hashes, DEFAULT_WINDOW)) / len(hashes)
+    expected = 2 / (DEFAULT_WINDOW + 1)
+    if not 0.8 * expected < density < 1.2 * expected:
+        print(f"  ❌ Density {density:.3f}, expected about {expected:.3f}")
+        return False
+    print(f"  ✅ Density {density:.3f} (expected about {expected:.3f})")
+    return True
+
+
+def test_ngrams():
+    """N-gram hashes agree with and without NumPy and give exact Jaccard scores."""
+    print("\n🔢 Testing token n-grams...")
+
+    import src.ngrams as ngrams
+    from src.lexer import lex
+
+    rng = random.Random(1)
+    words = ["x", "=", "(", ")", "for", "in", "range", ":", "return", "+", "1"]
+    for _ in range(50):
+        code_a = " ".join(rng.choice(words) for _ in range(rng.randint(0, 60)))
+        code_b = " ".join(rng.choice(words) for _ in range(rng.randint(0, 60)))
+        ids_a, ids_b = lex(code_a, "Other")[0], lex(code_b, "Other")[0]
+        grams_a, grams_b = ngrams.ngram_hashes(ids_a, 3), ngrams.ngram_hashes(ids_b, 3)
+
+        numpy, ngrams.np = ngrams.np, None
+        try:
+            plain_a, plain_b = ngrams.ngram_hashes(ids_a, 3), ngrams.ngram_hashes(ids_b, 3)
+            plain_score = ngrams.jaccard(plain_a, plain_b)
+        finally:
+            ngrams.np = numpy
+        if numpy is not None and frozenset(int(h) for h in grams_a) != plain_a:
+            print("  ❌ NumPy and pure-Python n-gram hashes differ")
+            return False
+
+        tuples_a = {tuple(ids_a[i:i + 3]) for i in range(len(ids_a) - 2)}
+        tuples_b = {tuple(ids_b[i:i + 3]) for i in range(len(ids_b) - 2)}
+        union = tuples_a | tuples_b
+        exact = len(tuples_a & tuples_b) / len(union) if union else 1.0
+        score = ngrams.jaccard(grams_a, grams_b)
+        if abs(score - exact) > 1e-9 or abs(plain_score - exact) > 1e-9:
+            print(f"  ❌ Jaccard {score} / {plain_score}, exact {exact}")
+            return False
+    print("  ✅ NumPy and pure-Python hashes agree, Jaccard is exact")
+    return True
+
+
+def test_lsh():
+    """MinHash estimates Jaccard, and similar pairs become LSH candidates."""
+    print("\n🪣 Testing MinHash / LSH...")
+
+    try:
+        from src.lsh import candidate_pairs, estimate_jaccard, minhash_signatures, optimal_bands
+    except ImportError:
+        print("  ⚠️  Skipping (NumPy not installed)")
+        return True
+
+    rng = random.Random(2)
+    errors = []
+    for _ in range(50):
+        base = rng.sample(range(1, 1 << 32), 300)
+        keep = rng.randint(0, 300)
+        other = base[:keep] + rng.sample(range(1, 1 << 32), 300 - keep)
+        exact = len(set(base) & set(other)) / len(set(base) | set(other))
+        signatures = minhash_signatures([base, other])
+        errors.append(abs(estimate_jaccard(signatures[0], signatures[1]) - exact))
+    if max(errors) > 0.2 or sum(errors) / len(errors) > 0.06:
+        print(f"  ❌ Estimate errors too large: mean {sum(errors) / len(errors):.3f}, max {max(errors):.3f}")
+        return False
+    print(f"  ✅ Jaccard estimate error: mean {sum(errors) / len(errors):.3f}, max {max(errors):.3f}")
+
+    for threshold in (0.2, 0.3, 0.5, 0.8):
+        bands, rows = optimal_bands(threshold)
+        if bands * rows > 128:
+            print(f"  ❌ {bands} bands x {rows} rows exceed the signature")
+            return False
+
+    # Near-copies (Jaccard >= 0.8) of unrelated sets must always be candidates
+    sets = [rng.sample(range(1, 1 << 32), 200) for _ in range(30)]
+    copies = [s[:180] + rng.sample(range(1, 1 << 32), 10) for s in sets]
+    pairs = candidate_pairs(sets + copies, threshold=0.3)
+    missed = [i for i in range(30) if (i, 30 + i) not in pairs]
+    unrelated = [(i, j) for i, j in pairs if j != i + 30]
+    if missed or any(i >= j for i, j in pairs):
+        print(f"  ❌ Missed near-copies {missed}")
+        return False
+    print(f"  ✅ All 30 near-copies found, {len(unrelated)} unrelated candidates")
+    return True
+
+
+def test_gst():
+    """Tiles never overlap, match exactly, and cover moved blocks."""
+    print("\n🧩 Testing Greedy String Tiling...")
+
+    from src.gst import greedy_string_tiling, tiling_coverage
+
+    rng = random.Random(3)
+    for _ in range(200):
+        alphabet = rng.choice([2, 4, 20])
+        a = [rng.randrange(alphabet) for _ in range(rng.randint(0, 300))]
+        blocks = [a[i:i + 25] for i in range(0, len(a), 25)]
+        rng.shuffle(blocks)
+        b = [token for block in blocks for token in block]
+        for _ in range(rng.randint(0, 10)):
+            b.insert(rng.randint(0, len(b)), rng.randrange(alphabet))
+        min_match = rng.choice([3, 5, 9])
+        tiles = greedy_string_tiling(a, b, min_match)
+
+        covered_a, covered_b = set(), set()
+        for i, j, length in tiles:
+            span_a, span_b = set(range(i, i + length)), set(range(j, j + length))
+            if length < min_match or a[i:i + length] != b[j:j + length] or covered_a & span_a or covered_b & span_b:
+                print(f"  ❌ Bad tile {(i, j, length)} for min_match {min_match}")
+                return False
+            covered_a |= span_a
+            covered_b |= span_b
+        if not 0.0 <= tiling_coverage(tiles, len(a), len(b)) <= 1.0:
+            print("  ❌ Coverage outside 0-1")
+            return False
+    print("  ✅ 200 random pairs: tiles are long enough, exact and disjoint")
+
+    a = [rng.randrange(1000) for _ in range(400)]
+    b = a[200:] + a[:200]
+    if tiling_coverage(greedy_string_tiling(a, b), len(a), len(b)) != 1.0:
+        print("  ❌ Swapped halves are not fully covered")
+        return False
+    print("  ✅ Swapped halves are fully covered")
+
+    # Repetitive streams put every window in one hash bucket
+    stream = [0, 1, 2] * 2000
+    start = time.perf_counter()
+    tiles = greedy_string_tiling(stream, stream + [3])
+    seconds = time.perf_counter() - start
+    if tiling_coverage(tiles, len(stream), len(stream) + 1) < 0.99 or seconds > 2.0:
+        print(f"  ❌ Repetitive stream of {len(stream)} tokens took {seconds:.2f}s")
+        return False
+    print(f"  ✅ Repetitive stream of {len(stream)} tokens tiled in {seconds:.2f}s")
+    return True
+
+
+def test_clustering():
+    """Components, linkage cuts and ranked clusters agree with brute force."""
+    print("\n🕸️  Testing clustering...")
+
+    from src.clustering import connected_components, cut_linkage, rank_clusters, single_linkage
+
+    rng = random.Random(4)
+    for _ in range(100):
+        n = rng.randint(1, 25)
+        edges = [(i, j, rng.uniform(0, 100)) for i in range(n) for j in range(i + 1, n) if rng.random() < 0.15]
+        rows, cols, weights = ([e[k] for e in edges] for k in range(3))
+        merges = single_linkage(n, rows, cols, weights)
+        for threshold in (20.0, 50.0, 80.0):
+            # Brute force: grow each group by repeated passes over the edges
+            label = list(range(n))
+            changed = True
+            while changed:
+                changed = False
+                for i, j, w in edges:
+                    if w >= threshold and label[i] != label[j]:
+                        label[i] = label[j] = min(label[i], label[j])
+                        changed = True
+            groups = {}
+            for item in range(n):
+                groups.setdefault(label[item], []).append(item)
+            expected = sorted((g for g in groups.values() if len(g) > 1), key=lambda g: (-len(g), g[0]))
+            if connected_components(n, rows, cols, weights, threshold) != expected:
+                print(f"  ❌ connected_components differs from brute force at {threshold}")
+                return False
+
+            cut = cut_linkage(merges, n, threshold)
+            if sorted(expected) != sorted(
+                    g for g in ([i for i in range(n) if cut[i] == c] for c in set(cut)) if len(g) > 1):
+                print(f"  ❌ cut_linkage differs from connected_components at {threshold}")
+                return False
+
+            for cluster in rank_clusters(n, rows, cols, weights, threshold):
+                inside = [w for i, j, w in edges if w >= threshold and i in cluster["members"]]
+                link_weights = [w for _, _, w in cluster["links"]]
+                if (cluster["edges"] != len(inside) or cluster["max_link"] != max(inside)
+                        or link_weights != sorted(link_weights, reverse=True)
+                        or link_weights[0] != cluster["max_link"]):
+                    print(f"  ❌ rank_clusters statistics wrong at {threshold}")
+                    return False
+    print("  ✅ 100 random graphs: components, linkage cuts and cluster statistics agree")
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("🧪 Similarity Invariants Test Suite")
+    print("=" * 60)
+
+    tests = [
+        ("Winnowing", test_winnowing),
+        ("Token N-grams", test_ngrams),
+        ("MinHash / LSH", test_lsh),
+        ("Greedy String Tiling", test_gst),
+        ("Clustering", test_clustering),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            passed = test_func()
+            results.append((name, passed))
+        except Exception as e:
+            print(f"\n  ❌ Test '{name}' crashed: {e}")
+            results.append((name, False))
+
+    print("\n" + "=" * 60)
+    print("📊 Test Results")
+    print("=" * 60)
+
+    for name, passed in results:
+        status = "✅ PASS" if passed else "❌ FAIL"
+        print(f"  {status}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    total_count = len(results)
+
+    print(f"\n🎯 Score: {passed_count}/{total_count} tests passed")
+
+    if passed_count == total_count:
+        print("\n🎉 All tests passed! Implementation is working correctly.")
+        return 0
+    else:
+        print("\n⚠️  Some tests failed. Check the output above.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())